@@ -1,11 +1,13 @@
-from flask import Flask
+from flask import Flask, Response
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 
+from app.utils.db_routing import RoutingSession
+
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 
@@ -16,11 +18,28 @@ def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(get_config())
     
+    # Pool sizing and replica binds
+    from app.utils import db_routing
+    db_routing.configure_engines(app)
+    
     # Initialize extensions
     db.init_app(app)
+    db_routing.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     
+    # Token revocation (logout and refresh rotation)
+    from app.auth import revocation
+    revocation.init_app(app)
+    
+    # Request stage timing (Server-Timing header and metrics)
+    from app.utils import timing
+    timing.init_app(app)
+    
+    # Query budget / N+1 guard
+    from app.utils import query_budget
+    query_budget.init_app(app)
+    
     # Configure CORS
     CORS(app, 
          origins=app.config['CORS_ORIGINS'],
@@ -33,18 +52,34 @@ def create_app(config_name='default'):
     from app.calendar import calendar_bp
     from app.users import users_bp
     from app.recommendations import recommendations_bp
+    from app.analytics import analytics_bp
+    from app.progress import progress_bp
+    from app.dashboard import dashboard_bp
+    from app.events import events_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/v1/auth')
     app.register_blueprint(breaks_bp, url_prefix='/api/v1/breaks')
     app.register_blueprint(calendar_bp, url_prefix='/api/v1/calendar')
     app.register_blueprint(users_bp, url_prefix='/api/v1/users')
     app.register_blueprint(recommendations_bp, url_prefix='/api/v1/recommendations')
+    app.register_blueprint(analytics_bp, url_prefix='/api/v1/analytics')
+    app.register_blueprint(progress_bp, url_prefix='/api/v1/progress')
+    app.register_blueprint(dashboard_bp, url_prefix='/api/v1/dashboard')
+    app.register_blueprint(events_bp, url_prefix='/api/v1/events')
     
     # Health check endpoint
     @app.route('/health')
     def health_check():
         return {'status': 'healthy', 'service': 'takeabreak-api'}, 200
     
+    # Prometheus metrics endpoint
+    if app.config.get('METRICS_ENABLED', True):
+        from app.utils.metrics import registry
+        
+        @app.route('/metrics')
+        def metrics():
+            return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
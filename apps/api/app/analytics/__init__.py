@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+analytics_bp = Blueprint('analytics', __name__)
+
+from . import routes
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Analytics API routes for enterprise dashboards.
+Reads only the pre-aggregated company_analytics rollup.
+"""
+import logging
+from datetime import date, timedelta
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.analytics import analytics_bp
+from app.models import User
+from app.services.analytics_service import AnalyticsRollupService
+from app.utils.db_routing import read_replica
+
+logger = logging.getLogger(__name__)
+
+
+@analytics_bp.route('/company', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_company_analytics():
+    """
+    Get daily break analytics for the current user's company.
+    Query parameters: days (default 30, max 365).
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        
+        user = User.query.get(current_user_id)
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        if not user.company_domain:
+            return jsonify({'error': 'No company associated with this account'}), 404
+        
+        days = min(max(request.args.get('days', 30, type=int), 1), 365)
+        end = date.today()
+        start = end - timedelta(days=days - 1)
+        
+        rows = AnalyticsRollupService().get_company_analytics(user.company_domain, start, end)
+        
+        return jsonify({
+            'company_domain': user.company_domain,
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'days': [row.to_dict() for row in rows]
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Failed to get company analytics for user {current_user_id}: {e}")
+        return jsonify({'error': 'Failed to get company analytics'}), 500
\ No newline at end of file
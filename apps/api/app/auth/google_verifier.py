@@ -0,0 +1,149 @@
+"""
+Process-wide Google sign-in verifier
+Caches Google's signing certificates for their Cache-Control lifetime and reuses one HTTP pool.
+"""
+import logging
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from google.auth import jwt
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/oauth2/v1/certs'
+GOOGLE_TOKEN_URI = 'https://oauth2.googleapis.com/token'
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+# Used when Google omits Cache-Control; its certs rotate daily at most
+DEFAULT_CERTS_MAX_AGE = 3600
+
+# Unknown key ids force a refetch at most this often; tokens naming one in between are rejected
+FORCED_REFRESH_INTERVAL = 60
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+def cache_lifetime(headers) -> int:
+    """Seconds a response may be reused, from Cache-Control max-age minus Age"""
+    match = _MAX_AGE.search(headers.get('Cache-Control', ''))
+    if not match:
+        return DEFAULT_CERTS_MAX_AGE
+    try:
+        age = int(headers.get('Age', 0))
+    except ValueError:
+        age = 0
+    return max(int(match.group(1)) - age, 0)
+
+
+class GoogleTokenVerifier:
+    """
+    Verifies Google ID tokens against cached signing certificates.
+    Certificates are refetched only when expired or when a token names an unknown key,
+    and unknown keys refetch at most once per FORCED_REFRESH_INTERVAL, so unsigned
+    tokens with made-up key ids can't queue sign-ins behind fetches to Google.
+    """
+
+    def __init__(self, client_id: str, client_secret: str = None, redirect_uri: str = None,
+                 session: requests.Session = None):
+        self.client_id = client_id
+        # Prebuilt authorization-code exchange payload; only the code varies per login
+        self._exchange_params = {
+            'client_id': client_id,
+            'client_secret': client_secret,
+            'redirect_uri': redirect_uri,
+            'grant_type': 'authorization_code',
+        }
+        self.session = session or self._build_session()
+        self._certs: Dict[str, str] = {}
+        self._certs_expire_at = 0.0
+        self._last_forced_at = float('-inf')
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_session() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+        session.mount('https://', adapter)
+        return session
+
+    def _is_fresh(self, force: bool) -> bool:
+        now = time.monotonic()
+        if force:
+            return bool(self._certs) and now - self._last_forced_at < FORCED_REFRESH_INTERVAL
+        return bool(self._certs) and now < self._certs_expire_at
+
+    def get_certs(self, force: bool = False) -> Dict[str, str]:
+        """
+        Signing certificates keyed by key id, fetched at most once per lifetime.
+        Forced refreshes are limited to one per FORCED_REFRESH_INTERVAL.
+        """
+        if self._is_fresh(force):
+            return self._certs
+
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if self._is_fresh(force):
+                return self._certs
+
+            if force:
+                self._last_forced_at = time.monotonic()
+            response = self.session.get(GOOGLE_CERTS_URL, timeout=5)
+            response.raise_for_status()
+            self._certs = response.json()
+            self._certs_expire_at = time.monotonic() + cache_lifetime(response.headers)
+            logger.info(f"Fetched {len(self._certs)} Google signing certificates")
+            return self._certs
+
+    def verify(self, token: str) -> Dict:
+        """
+        Verify signature, audience, expiry and issuer of an ID token.
+        Raises ValueError when the token is invalid.
+        """
+        kid = jwt.decode_header(token).get('kid')
+        certs = self.get_certs()
+        if kid and kid not in certs:
+            # Google rotated keys before our cached copy expired
+            certs = self.get_certs(force=True)
+            if kid not in certs:
+                raise ValueError(f"Unknown signing key: {kid}")
+
+        idinfo = jwt.decode(token, certs=certs, audience=self.client_id)
+        if idinfo.get('iss') not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+        return idinfo
+
+    def exchange_code(self, auth_code: str) -> Dict:
+        """Exchange an authorization code for tokens; the one unavoidable call per login"""
+        response = self.session.post(
+            GOOGLE_TOKEN_URI,
+            data={**self._exchange_params, 'code': auth_code},
+            timeout=10
+        )
+        if response.status_code != 200:
+            raise ValueError(f"Authorization code exchange failed: {response.status_code}")
+        return response.json()
+
+
+_verifier: Optional[GoogleTokenVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_google_verifier(config) -> GoogleTokenVerifier:
+    """Process-wide verifier for the configured OAuth client"""
+    global _verifier
+    verifier = _verifier
+    if verifier is not None and verifier.client_id == config['GOOGLE_CLIENT_ID']:
+        return verifier
+
+    with _verifier_lock:
+        if _verifier is None or _verifier.client_id != config['GOOGLE_CLIENT_ID']:
+            _verifier = GoogleTokenVerifier(
+                config['GOOGLE_CLIENT_ID'],
+                config.get('GOOGLE_CLIENT_SECRET'),
+                config.get('GOOGLE_REDIRECT_URI'),
+            )
+        return _verifier
@@ -0,0 +1,140 @@
+"""
+JWT revocation store
+Revoked JTIs live in Redis with TTLs; each process mirrors them locally so checks stay in memory.
+"""
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import redis
+
+from app.utils.metrics import registry
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'revoked:jti:'
+# Sorted set of revoked JTIs scored by revocation time, read incrementally by each process
+INDEX_KEY = 'revoked:index'
+
+# Re-read this many seconds behind the last sync to tolerate clock skew between writers
+SYNC_OVERLAP = 30
+
+REVOCATION_SYNCS = registry.counter(
+    'auth_revocation_syncs_total',
+    'Revocation index syncs from Redis, by outcome',
+    ['outcome'],
+)
+
+
+class RevocationStore:
+    """
+    Token blocklist with O(1) local checks.
+
+    Revoking writes a TTL'd key and an index entry. Checks consult an in-process
+    mirror of the index that is refreshed at most every sync_interval seconds, so
+    a revocation made by another process takes effect within that window.
+    """
+
+    def __init__(self, client_factory=get_redis, sync_interval: float = 5.0,
+                 max_token_lifetime: float = 30 * 86400):
+        self._client_factory = client_factory
+        self.sync_interval = sync_interval
+        self.max_token_lifetime = max_token_lifetime
+        self._revoked: Dict[str, float] = {}  # jti -> revocation time
+        self._synced_until = 0.0  # Highest revocation time seen in the index
+        self._next_sync = 0.0
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: Optional[float]) -> bool:
+        """
+        Revoke a token until it would have expired anyway.
+        Returns False when it was already revoked, so exactly one caller claims
+        a token; refresh rotation relies on this rather than the mirror.
+        """
+        now = time.time()
+        ttl = int((expires_at or now + self.max_token_lifetime) - now) + 1
+        if ttl <= 0:
+            return True
+
+        pipe = self._client_factory().pipeline()
+        pipe.set(f'{KEY_PREFIX}{jti}', 1, ex=ttl, nx=True)
+        pipe.zadd(INDEX_KEY, {jti: now}, nx=True)
+        # Entries older than any live token can no longer matter
+        pipe.zremrangebyscore(INDEX_KEY, '-inf', now - self.max_token_lifetime)
+        claimed = bool(pipe.execute()[0])
+
+        self._revoked.setdefault(jti, now)
+        return claimed
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check the local mirror, syncing it first if it is due"""
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        return jti in self._revoked
+
+    def is_revoked_strict(self, jti: str) -> bool:
+        """Authoritative check against Redis, for rare high-value operations"""
+        return jti in self._revoked or bool(self._client_factory().exists(f'{KEY_PREFIX}{jti}'))
+
+    def sync(self) -> None:
+        """Pull revocations newer than the last sync into the local mirror"""
+        # Requests arriving mid-sync keep serving from the mirror instead of queueing
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() < self._next_sync:
+                return
+            self._next_sync = time.monotonic() + self.sync_interval
+
+            try:
+                entries = self._client_factory().zrangebyscore(
+                    INDEX_KEY, max(self._synced_until - SYNC_OVERLAP, 0), '+inf', withscores=True
+                )
+            except redis.RedisError as e:
+                # Revocations already mirrored still apply
+                REVOCATION_SYNCS.inc(outcome='error')
+                logger.warning(f"Revocation sync failed: {e}")
+                return
+
+            for jti, revoked_at in entries:
+                self._revoked[jti] = revoked_at
+                self._synced_until = max(self._synced_until, revoked_at)
+
+            if time.monotonic() >= self._next_prune:
+                self._prune()
+
+            REVOCATION_SYNCS.inc(outcome='success')
+        finally:
+            self._lock.release()
+
+    def _prune(self) -> None:
+        """Forget JTIs whose tokens have expired everywhere"""
+        self._next_prune = time.monotonic() + 3600
+        cutoff = time.time() - self.max_token_lifetime
+        self._revoked = {jti: at for jti, at in self._revoked.items() if at >= cutoff}
+
+
+revocation_store = RevocationStore()
+
+
+def revoke_token(jwt_payload: dict) -> bool:
+    """Revoke a decoded token until its own expiry; False if it already was"""
+    exp = jwt_payload.get('exp')
+    return revocation_store.revoke(jwt_payload['jti'], float(exp) if exp else None)
+
+
+def init_app(app) -> None:
+    """Configure the store from app config and register the JWT blocklist loader"""
+    from app import jwt
+
+    revocation_store.sync_interval = app.config.get('REVOCATION_SYNC_SECONDS', 5.0)
+    refresh_lifetime = app.config.get('JWT_REFRESH_TOKEN_EXPIRES')
+    if refresh_lifetime:
+        revocation_store.max_token_lifetime = refresh_lifetime.total_seconds()
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return revocation_store.is_revoked(jwt_payload['jti'])
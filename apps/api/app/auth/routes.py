@@ -1,8 +1,10 @@
 from flask import jsonify, request, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, decode_token
 from . import auth_bp
+from .revocation import revoke_token
 from .service import AuthService
 from app.models.user import User
+from app.utils.db_routing import mark_recent_write
 
 
 auth_service = AuthService()
@@ -26,6 +28,8 @@ def google_auth():
         
         # Create or get user
         user = auth_service.create_or_get_user(google_profile)
+        # The token has no identity yet, so pin the new session to the primary here
+        mark_recent_write(user.id)
         
         # Generate JWT tokens
         tokens = auth_service.generate_tokens(user)
@@ -46,7 +50,7 @@ def google_auth():
 @auth_bp.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
 def refresh_token():
-    """Refresh JWT token endpoint"""
+    """Refresh JWT token endpoint; rotates the refresh token"""
     try:
         # Get current user from refresh token
         current_user_id = get_jwt_identity()
@@ -55,6 +59,11 @@ def refresh_token():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
+        # Rotation: the presented refresh token can't be used again. The claim is
+        # atomic in Redis, so a replay racing this request gets no tokens
+        if not revoke_token(get_jwt()):
+            return jsonify({'error': 'Refresh token already used'}), 401
+        
         # Generate new tokens
         tokens = auth_service.generate_tokens(user)
         
@@ -73,7 +82,23 @@ def refresh_token():
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    """Logout endpoint"""
-    # For now, we'll implement a simple logout
-    # In production, you might want to blacklist tokens in Redis
-    return '', 204
\ No newline at end of file
+    """Logout endpoint; revokes the access token and, if sent, the refresh token"""
+    try:
+        revoke_token(get_jwt())
+        
+        data = request.get_json(silent=True) or {}
+        if data.get('refresh_token'):
+            try:
+                refresh_claims = decode_token(data['refresh_token'])
+            except Exception:
+                refresh_claims = None
+            
+            # Only revoke refresh tokens belonging to the caller
+            if refresh_claims and refresh_claims.get('sub') == get_jwt().get('sub'):
+                revoke_token(refresh_claims)
+        
+        return '', 204
+        
+    except Exception as e:
+        current_app.logger.error(f"Logout error: {str(e)}")
+        return jsonify({'error': 'Logout failed'}), 500
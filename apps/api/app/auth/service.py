@@ -3,10 +3,9 @@ Authentication service for handling Google OAuth and JWT tokens
 """
 import re
 from typing import Dict, Optional
-from google.auth.transport import requests
-from google.oauth2 import id_token
 from flask import current_app
 from flask_jwt_extended import create_access_token, create_refresh_token
+from app.auth.google_verifier import get_google_verifier
 from app.models.user import User
 from app import db
 
@@ -25,32 +24,13 @@ class AuthService:
             Dict with user profile data or None if invalid
         """
         try:
-            # Exchange authorization code for tokens using Google OAuth2 flow
-            from google_auth_oauthlib.flow import Flow
+            # Exchange authorization code for tokens with the pooled client
+            token = get_google_verifier(current_app.config).exchange_code(auth_code)
             
-            flow = Flow.from_client_config(
-                {
-                    "web": {
-                        "client_id": current_app.config['GOOGLE_CLIENT_ID'],
-                        "client_secret": current_app.config['GOOGLE_CLIENT_SECRET'],
-                        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                        "token_uri": "https://oauth2.googleapis.com/token",
-                        "redirect_uris": [current_app.config['GOOGLE_REDIRECT_URI']]
-                    }
-                },
-                scopes=['openid', 'email', 'profile']
-            )
-            flow.redirect_uri = current_app.config['GOOGLE_REDIRECT_URI']
-            
-            # Fetch token using the authorization code
-            token = flow.fetch_token(code=auth_code)
-            
-            # Verify the ID token
-            idinfo = id_token.verify_oauth2_token(
-                token['id_token'], 
-                requests.Request(), 
-                current_app.config['GOOGLE_CLIENT_ID']
-            )
+            # Verify the ID token against cached signing certificates
+            idinfo = verify_google_token(token['id_token'])
+            if not idinfo:
+                return None
             
             return {
                 'email': idinfo.get('email'),
@@ -152,9 +132,6 @@ def verify_google_token(token: str) -> Optional[Dict]:
     Used for easier mocking in tests
     """
     try:
-        idinfo = id_token.verify_oauth2_token(
-            token, requests.Request(), current_app.config['GOOGLE_CLIENT_ID']
-        )
-        return idinfo
+        return get_google_verifier(current_app.config).verify(token)
     except ValueError:
         return None
\ No newline at end of file
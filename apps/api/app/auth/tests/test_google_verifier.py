@@ -0,0 +1,120 @@
+"""
+Unit tests for the cached Google ID token verifier
+"""
+import time
+from unittest.mock import Mock
+
+import pytest
+import rsa
+from google.auth import crypt, jwt
+
+from app.auth.google_verifier import FORCED_REFRESH_INTERVAL, GoogleTokenVerifier, cache_lifetime
+
+CLIENT_ID = 'client-123.apps.googleusercontent.com'
+
+
+@pytest.fixture(scope='module')
+def key_pair():
+    """RSA key pair standing in for one of Google's signing keys"""
+    public_key, private_key = rsa.newkeys(1024)
+    return private_key.save_pkcs1().decode(), public_key.save_pkcs1().decode()
+
+
+def make_token(private_pem, kid='key-1', **claims):
+    now = int(time.time())
+    payload = {
+        'iss': 'https://accounts.google.com',
+        'aud': CLIENT_ID,
+        'sub': 'google-user-1',
+        'email': 'user@example.com',
+        'iat': now,
+        'exp': now + 300,
+        **claims,
+    }
+    signer = crypt.RSASigner.from_string(private_pem, key_id=kid)
+    return jwt.encode(signer, payload).decode()
+
+
+def certs_session(certs, cache_control='public, max-age=3600'):
+    """Session stub returning the given certs with caching headers"""
+    response = Mock(status_code=200, headers={'Cache-Control': cache_control})
+    response.json.return_value = certs
+    session = Mock()
+    session.get.return_value = response
+    return session
+
+
+class TestCacheLifetime:
+    """Test Cache-Control parsing"""
+
+    def test_max_age_minus_age(self):
+        assert cache_lifetime({'Cache-Control': 'public, max-age=20000', 'Age': '100'}) == 19900
+
+    def test_missing_header_uses_default(self):
+        assert cache_lifetime({}) == 3600
+
+
+class TestGoogleTokenVerifier:
+    """Test verification against cached certificates"""
+
+    def test_certs_fetched_once_for_many_logins(self, key_pair):
+        """Certificates are reused until their max-age expires"""
+        private_pem, public_pem = key_pair
+        session = certs_session({'key-1': public_pem})
+        verifier = GoogleTokenVerifier(CLIENT_ID, session=session)
+
+        for _ in range(5):
+            assert verifier.verify(make_token(private_pem))['email'] == 'user@example.com'
+
+        assert session.get.call_count == 1
+
+    def test_unknown_key_forces_refresh(self, key_pair):
+        """A rotated key id triggers one refetch"""
+        private_pem, public_pem = key_pair
+        session = certs_session({'old-key': public_pem})
+        verifier = GoogleTokenVerifier(CLIENT_ID, session=session)
+        verifier.get_certs()
+
+        session.get.return_value.json.return_value = {'key-2': public_pem}
+        assert verifier.verify(make_token(private_pem, kid='key-2'))['sub'] == 'google-user-1'
+        assert session.get.call_count == 2
+
+    def test_unknown_keys_refresh_at_most_once_per_interval(self, key_pair):
+        """Tokens with made-up key ids can't trigger a fetch each"""
+        private_pem, public_pem = key_pair
+        session = certs_session({'key-1': public_pem})
+        verifier = GoogleTokenVerifier(CLIENT_ID, session=session)
+        verifier.get_certs()
+
+        for attempt in range(5):
+            with pytest.raises(ValueError):
+                verifier.verify(make_token(private_pem, kid=f'made-up-{attempt}'))
+        assert session.get.call_count == 2
+
+        # Once the interval has passed a new key can be picked up again
+        verifier._last_forced_at -= FORCED_REFRESH_INTERVAL
+        session.get.return_value.json.return_value = {'key-2': public_pem}
+        assert verifier.verify(make_token(private_pem, kid='key-2'))['sub'] == 'google-user-1'
+        assert session.get.call_count == 3
+
+    def test_wrong_audience_and_issuer_rejected(self, key_pair):
+        """Tokens for other clients or issuers raise ValueError"""
+        private_pem, public_pem = key_pair
+        verifier = GoogleTokenVerifier(CLIENT_ID, session=certs_session({'key-1': public_pem}))
+
+        with pytest.raises(ValueError):
+            verifier.verify(make_token(private_pem, aud='someone-else'))
+        with pytest.raises(ValueError):
+            verifier.verify(make_token(private_pem, iss='https://evil.example.com'))
+
+    def test_exchange_code_uses_prebuilt_params(self):
+        """Code exchange posts the prebuilt client parameters plus the code"""
+        session = Mock()
+        session.post.return_value = Mock(status_code=200, json=Mock(return_value={'id_token': 'abc'}))
+        verifier = GoogleTokenVerifier(CLIENT_ID, 'secret', 'https://app.example.com/callback', session=session)
+
+        assert verifier.exchange_code('auth-code') == {'id_token': 'abc'}
+        data = session.post.call_args.kwargs['data']
+        assert data['code'] == 'auth-code'
+        assert data['grant_type'] == 'authorization_code'
+        assert data['redirect_uri'] == 'https://app.example.com/callback'
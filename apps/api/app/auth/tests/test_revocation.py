@@ -0,0 +1,134 @@
+"""
+Unit tests for the JWT revocation store
+"""
+import time
+
+import pytest
+import redis
+
+from app.auth.revocation import RevocationStore, KEY_PREFIX, INDEX_KEY
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis commands the store uses"""
+
+    def __init__(self):
+        self.values = {}
+        self.zsets = {}
+        self.range_calls = 0
+        self.down = False
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def zrangebyscore(self, key, low, high, withscores=False):
+        if self.down:
+            raise redis.ConnectionError('down')
+        self.range_calls += 1
+        low = float(low)
+        return [(m, s) for m, s in self.zsets.get(key, {}).items() if s >= low]
+
+
+class FakePipeline:
+
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    def set(self, key, value, ex=None, nx=False):
+        def store():
+            if nx and key in self.client.values:
+                return None
+            self.client.values[key] = (value, ex)
+            return True
+        self.ops.append(store)
+
+    def zadd(self, key, mapping, nx=False):
+        def add():
+            zset = self.client.zsets.setdefault(key, {})
+            zset.update({m: s for m, s in mapping.items() if not (nx and m in zset)})
+        self.ops.append(add)
+
+    def zremrangebyscore(self, key, low, high):
+        def remove():
+            zset = self.client.zsets.get(key, {})
+            for member in [m for m, s in zset.items() if s <= high]:
+                del zset[member]
+        self.ops.append(remove)
+
+    def execute(self):
+        return [op() for op in self.ops]
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+def make_store(client, sync_interval=60.0):
+    return RevocationStore(client_factory=lambda: client, sync_interval=sync_interval)
+
+
+class TestRevocationStore:
+    """Test revocation writes and local checks"""
+
+    def test_revoke_sets_ttl_matching_token_expiry(self, fake_redis):
+        """The Redis key lives as long as the token would have"""
+        store = make_store(fake_redis)
+        store.revoke('jti-1', time.time() + 900)
+
+        _, ttl = fake_redis.values[f'{KEY_PREFIX}jti-1']
+        assert 899 <= ttl <= 901
+        assert 'jti-1' in fake_redis.zsets[INDEX_KEY]
+
+    def test_expired_token_is_not_stored(self, fake_redis):
+        store = make_store(fake_redis)
+        store.revoke('jti-1', time.time() - 10)
+
+        assert fake_redis.values == {}
+
+    def test_checks_stay_local_between_syncs(self, fake_redis):
+        """Many checks cost a single Redis round trip per sync interval"""
+        store = make_store(fake_redis)
+        store.revoke('jti-1', time.time() + 900)
+
+        for _ in range(100):
+            assert store.is_revoked('jti-1')
+            assert not store.is_revoked('jti-2')
+
+        assert fake_redis.range_calls == 1
+
+    def test_revocation_from_other_process_seen_after_sync(self, fake_redis):
+        """Another worker's revocation reaches this mirror on the next sync"""
+        local = make_store(fake_redis, sync_interval=0)
+        other = make_store(fake_redis)
+
+        assert not local.is_revoked('jti-1')
+        other.revoke('jti-1', time.time() + 900)
+        assert local.is_revoked('jti-1')
+
+    def test_redis_outage_fails_open_but_keeps_mirror(self, fake_redis):
+        store = make_store(fake_redis, sync_interval=0)
+        store.revoke('jti-1', time.time() + 900)
+        fake_redis.down = True
+
+        assert store.is_revoked('jti-1')
+        assert not store.is_revoked('jti-2')
+
+    def test_strict_check_reads_redis(self, fake_redis):
+        store = make_store(fake_redis)
+        make_store(fake_redis).revoke('jti-1', time.time() + 900)
+
+        assert store.is_revoked_strict('jti-1')
+        assert not store.is_revoked_strict('jti-2')
+
+    def test_only_one_revoke_claims_a_token(self, fake_redis):
+        """A replayed refresh token loses the claim even on a process with a stale mirror"""
+        first, second = make_store(fake_redis), make_store(fake_redis)
+
+        assert first.revoke('jti-1', time.time() + 900) is True
+        assert second.revoke('jti-1', time.time() + 900) is False
+        assert second.is_revoked_strict('jti-1')
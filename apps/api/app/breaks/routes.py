@@ -1,20 +1,193 @@
-from flask import jsonify, request
+import logging
+import uuid
+from datetime import datetime
+
+import pytz
+from flask import current_app, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from redis.exceptions import RedisError
 from . import breaks_bp
+from app.services.break_buffer import break_buffer
+from app.services.break_service import BreakService
+from app.services.catalog_service import catalog_service
+from app.utils.http_cache import cached_json_response
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _write_behind_enabled():
+    return current_app.config.get('BREAK_WRITE_BEHIND_ENABLED', False)
+
+
+def _epoch_isoformat(value):
+    return datetime.fromtimestamp(float(value), pytz.UTC).isoformat()
+
 
 @breaks_bp.route('/sessions', methods=['GET'])
 def get_sessions():
-    """Get available break sessions"""
-    # TODO: Implement session retrieval
-    return jsonify({'sessions': []}), 200
+    """
+    Get available break sessions.
+    Query parameters: category, min_duration, max_duration (minutes).
+    """
+    try:
+        snapshot = catalog_service.get_snapshot()
+        body = snapshot.query(
+            category=request.args.get('category') or None,
+            min_duration=request.args.get('min_duration', type=int),
+            max_duration=request.args.get('max_duration', type=int)
+        )
+        return cached_json_response(request, body, current_app.config.get('CATALOG_MAX_AGE', 300))
+
+    except Exception as e:
+        logger.error(f"Failed to get break sessions: {e}")
+        return jsonify({'error': 'Failed to get break sessions'}), 500
+
+
+@breaks_bp.route('/sessions/<uuid:session_id>', methods=['GET'])
+def get_session(session_id):
+    """Get one break session"""
+    try:
+        body = catalog_service.get_snapshot().by_id.get(str(session_id))
+        if body is None:
+            return jsonify({'error': 'Session not found'}), 404
+        return cached_json_response(request, body, current_app.config.get('CATALOG_MAX_AGE', 300))
+
+    except Exception as e:
+        logger.error(f"Failed to get break session {session_id}: {e}")
+        return jsonify({'error': 'Failed to get break session'}), 500
 
 @breaks_bp.route('/start', methods=['POST'])
+@jwt_required()
 def start_break():
     """Start a break session"""
-    # TODO: Implement break start logic
-    return jsonify({'message': 'Break start endpoint - to be implemented'}), 501
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json() or {}
+
+        session_id = _parse_uuid(data.get('session_id'))
+        if not session_id:
+            return jsonify({'error': 'session_id is required'}), 400
+
+        recommendation_id = _parse_uuid(data.get('recommendation_id')) if data.get('recommendation_id') else None
+
+        if _write_behind_enabled():
+            try:
+                state = break_buffer.start(current_user_id, session_id, recommendation_id)
+                return jsonify({
+                    'id': state['id'],
+                    'session_id': state['session_id'],
+                    'started_at': _epoch_isoformat(state['started_at'])
+                }), 201
+            except RedisError as e:
+                logger.warning(f"Break buffer unavailable, starting break in the database: {e}")
+
+        completed_break = BreakService().start_break(current_user_id, session_id, recommendation_id)
+
+        return jsonify({
+            'id': str(completed_break.id),
+            'session_id': str(completed_break.session_id),
+            'started_at': completed_break.started_at.isoformat()
+        }), 201
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Failed to start break for user {current_user_id}: {e}")
+        return jsonify({'error': 'Failed to start break'}), 500
+
+@breaks_bp.route('/<break_id>/progress', methods=['POST'])
+@jwt_required()
+def record_progress(break_id):
+    """
+    Record a playback heartbeat for a break in progress.
+    Body: duration_seconds, completion_percentage. Only buffered breaks accept heartbeats.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json(silent=True) or {}
+
+        parsed_id = _parse_uuid(break_id)
+        if not parsed_id or not _write_behind_enabled():
+            return jsonify({'error': 'Break not found'}), 404
+
+        state = break_buffer.progress(
+            current_user_id,
+            parsed_id,
+            duration_seconds=int(data.get('duration_seconds', 0)),
+            completion_percentage=int(data.get('completion_percentage', 0))
+        )
+        if state is None:
+            return jsonify({'error': 'Break not found'}), 404
+
+        return jsonify({
+            'id': state['id'],
+            'status': state['status'],
+            'duration_seconds': int(state['duration_seconds']),
+            'completion_percentage': int(state['completion_percentage'])
+        }), 200
+
+    except (TypeError, ValueError):
+        return jsonify({'error': 'duration_seconds and completion_percentage must be integers'}), 400
+    except Exception as e:
+        logger.error(f"Failed to record progress for break {break_id}: {e}")
+        return jsonify({'error': 'Failed to record progress'}), 500
 
 @breaks_bp.route('/<break_id>/complete', methods=['POST'])
+@jwt_required()
 def complete_break(break_id):
     """Complete a break session"""
-    # TODO: Implement break completion logic
-    return jsonify({'message': 'Break completion endpoint - to be implemented'}), 501
\ No newline at end of file
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json(silent=True) or {}
+
+        parsed_id = _parse_uuid(break_id)
+        if not parsed_id:
+            return jsonify({'error': 'Break not found'}), 404
+
+        try:
+            completion_percentage = int(data.get('completion_percentage', 100))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'completion_percentage must be an integer'}), 400
+
+        if _write_behind_enabled():
+            try:
+                state = break_buffer.complete(
+                    current_user_id, parsed_id, completion_percentage, data.get('felt_better')
+                )
+                # Breaks started before buffering was enabled are completed in the database
+                if state is not None:
+                    return jsonify({
+                        'id': state['id'],
+                        'completed_at': _epoch_isoformat(state['completed_at']),
+                        'duration_seconds': int(state['duration_seconds']),
+                        'completion_percentage': int(state['completion_percentage'])
+                    }), 200
+            except RedisError as e:
+                logger.warning(f"Break buffer unavailable, completing break in the database: {e}")
+
+        completed_break = BreakService().complete_break(
+            current_user_id,
+            parsed_id,
+            completion_percentage=completion_percentage,
+            felt_better=data.get('felt_better')
+        )
+
+        return jsonify({
+            'id': str(completed_break.id),
+            'completed_at': completed_break.completed_at.isoformat(),
+            'duration_seconds': completed_break.duration_seconds,
+            'completion_percentage': completed_break.completion_percentage
+        }), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Failed to complete break {break_id} for user {current_user_id}: {e}")
+        return jsonify({'error': 'Failed to complete break'}), 500
@@ -2,22 +2,32 @@
 Calendar API routes for calendar connection and synchronization.
 """
 import logging
-from flask import request, jsonify
+from flask import current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from app.calendar import calendar_bp
-from app.models import User, CalendarConnection
+from app.services.calendar_providers import PROVIDERS
 from app.services.calendar_service import CalendarService
-from app.tasks.calendar_tasks import sync_user_calendar
+from app.services.user_context import get_user_context
+from app.services.sync_coordinator import sync_coordinator
+from app.utils.db_routing import read_replica
+from app.utils.outbound import Deadline, UpstreamUnavailable
 
 logger = logging.getLogger(__name__)
 
 
+def _upstream_unavailable():
+    response = jsonify({'error': 'Calendar provider is not responding, please try again'})
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
+
 @calendar_bp.route('/connect', methods=['POST'])
 @jwt_required()
 def connect_calendar():
     """
-    Connect user's Google Calendar using OAuth tokens.
+    Connect user's Google or Microsoft 365 calendar using OAuth tokens.
+    Body: provider ('google' or 'microsoft', default 'google'), access_token, refresh_token.
     Triggers asynchronous calendar sync.
     """
     try:
@@ -29,6 +39,10 @@ def connect_calendar():
         
         access_token = data['access_token']
         refresh_token = data.get('refresh_token')
+        provider = data.get('provider', 'google')
+        
+        if provider not in PROVIDERS:
+            return jsonify({'error': f'Unsupported calendar provider: {provider}'}), 400
         
         if not refresh_token:
             return jsonify({'error': 'Refresh token required for calendar access'}), 400
@@ -38,19 +52,24 @@ def connect_calendar():
         connection = calendar_service.connect_calendar(
             user_id=current_user_id,
             access_token=access_token,
-            refresh_token=refresh_token
+            refresh_token=refresh_token,
+            provider=provider,
+            deadline=Deadline(current_app.config.get('CALENDAR_CONNECT_DEADLINE', 5))
         )
         
         # Trigger async calendar sync
-        task = sync_user_calendar.delay(current_user_id)
+        sync_task_id = sync_coordinator.request_sync(current_user_id)
         
         return jsonify({
             'message': 'Calendar connected successfully',
             'calendar_id': connection.calendar_id,
-            'sync_task_id': task.id,
+            'sync_task_id': sync_task_id,
             'status': 'syncing'
         }), 201
         
+    except UpstreamUnavailable as e:
+        logger.warning(f"Calendar connection timed out for user {current_user_id}: {e}")
+        return _upstream_unavailable()
     except ValueError as e:
         logger.warning(f"Calendar connection failed for user {current_user_id}: {e}")
         return jsonify({'error': str(e)}), 400
@@ -69,19 +88,21 @@ def sync_calendar():
         current_user_id = get_jwt_identity()
         
         # Check if user has calendar connection
-        connection = CalendarConnection.query.filter_by(user_id=current_user_id).first()
+        connection = get_user_context(current_user_id).connection
         if not connection:
             return jsonify({'error': 'No calendar connection found'}), 404
         
-        # Trigger async sync
-        task = sync_user_calendar.delay(current_user_id)
+        # Trigger async sync, or join the one already queued or running
+        task_id = sync_coordinator.request_sync(current_user_id)
         
         return jsonify({
             'message': 'Calendar sync initiated',
-            'task_id': task.id,
+            'task_id': task_id,
             'status': 'syncing'
         }), 202
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         logger.error(f"Calendar sync error for user {current_user_id}: {e}")
         return jsonify({'error': 'Calendar sync failed'}), 500
@@ -89,6 +110,7 @@ def sync_calendar():
 
 @calendar_bp.route('/status', methods=['GET'])
 @jwt_required()
+@read_replica
 def calendar_status():
     """
     Get calendar connection status and sync information.
@@ -96,7 +118,7 @@ def calendar_status():
     try:
         current_user_id = get_jwt_identity()
         
-        connection = CalendarConnection.query.filter_by(user_id=current_user_id).first()
+        connection = get_user_context(current_user_id).connection
         
         if not connection:
             return jsonify({
@@ -116,6 +138,8 @@ def calendar_status():
             'needs_sync': needs_sync
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         logger.error(f"Calendar status error for user {current_user_id}: {e}")
         return jsonify({'error': 'Failed to get calendar status'}), 500
@@ -160,9 +184,12 @@ def get_calendar_events():
         # Check if sync is needed
         if calendar_service.is_sync_needed(current_user_id):
             # Trigger sync but return current data
-            sync_user_calendar.delay(current_user_id)
+            sync_coordinator.request_sync(current_user_id)
         
-        events = calendar_service.fetch_calendar_events(current_user_id, days_ahead)
+        events = calendar_service.fetch_calendar_events(
+            current_user_id, days_ahead,
+            deadline=Deadline(current_app.config.get('CALENDAR_EVENTS_DEADLINE', 8))
+        )
         
         return jsonify({
             'events': events[:50],  # Limit response size
@@ -170,6 +197,9 @@ def get_calendar_events():
             'days_ahead': days_ahead
         }), 200
         
+    except UpstreamUnavailable as e:
+        logger.warning(f"Fetching events timed out for user {current_user_id}: {e}")
+        return _upstream_unavailable()
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
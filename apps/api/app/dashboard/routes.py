@@ -0,0 +1,31 @@
+"""
+Dashboard API route: the home screen in a single request.
+"""
+import logging
+from flask import jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.dashboard import dashboard_bp
+from app.services.dashboard_service import DashboardService
+from app.utils.query_budget import endpoint_budget
+
+logger = logging.getLogger(__name__)
+
+
+@dashboard_bp.route('', methods=['GET'])
+@jwt_required()
+@endpoint_budget(25)
+def get_dashboard():
+    """
+    Get the profile, calendar status, streak, weekly stats, recent breaks and
+    today's recommendation that the home screen otherwise fetches separately.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        return jsonify(DashboardService().get_dashboard(current_user_id)), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Failed to get dashboard for user {current_user_id}: {e}")
+        return jsonify({'error': 'Failed to get dashboard'}), 500
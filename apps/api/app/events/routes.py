@@ -0,0 +1,41 @@
+"""
+Event stream route: live updates for the signed-in user over server-sent events.
+"""
+import logging
+from flask import Response, current_app, jsonify
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+
+from app.events import events_bp
+from app.utils.event_stream import event_hub
+
+logger = logging.getLogger(__name__)
+
+
+@events_bp.route('/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_events():
+    """
+    Stream sync_completed, sync_failed, recommendations_updated and
+    recommendation_dismissed events. EventSource can't set headers, so the
+    access token may be passed as ?jwt=. The stream ends when the token expires
+    and the client reconnects with a fresh one.
+    Needs a cooperative worker (see gunicorn.conf.py): each open stream holds a request.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        expires_at = get_jwt()['exp']
+        keepalive = current_app.config.get('EVENT_STREAM_KEEPALIVE_SECONDS', 15)
+
+        # The generator runs after the request context is gone and holds no database connection
+        return Response(
+            event_hub.stream(current_user_id, expires_at, keepalive),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no',  # Stop nginx from buffering events
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Failed to open event stream for user {current_user_id}: {e}")
+        return jsonify({'error': 'Failed to open event stream'}), 500
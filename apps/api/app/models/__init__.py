@@ -1,15 +1,19 @@
 from .user import User
-from .calendar import CalendarConnection, CalendarEvent
+from .calendar import CalendarConnection, CalendarEvent, RecurringSeries
 from .breaks import BreakSession, BreakRecommendation, CompletedBreak
-from .analytics import UserStreak, CompanyAnalytics
+from .analytics import UserStreak, UserDailyActivity, UserAcceptanceStats, CompanyAnalytics, RollupWatermark
 
 __all__ = [
     'User',
     'CalendarConnection',
     'CalendarEvent',
+    'RecurringSeries',
     'BreakSession',
     'BreakRecommendation',
     'CompletedBreak',
     'UserStreak',
-    'CompanyAnalytics'
+    'UserDailyActivity',
+    'UserAcceptanceStats',
+    'CompanyAnalytics',
+    'RollupWatermark',
 ]
\ No newline at end of file
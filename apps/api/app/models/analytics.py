@@ -1,5 +1,5 @@
-from datetime import datetime, date
-from sqlalchemy import Column, String, DateTime, Integer, Float, ForeignKey, Date, UniqueConstraint
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, Float, ForeignKey, Date, UniqueConstraint, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -33,6 +33,56 @@ class UserStreak(db.Model):
         }
 
 
+class UserDailyActivity(db.Model):
+    """Per-user daily break rollup, keyed by the user's local date"""
+    __tablename__ = 'user_daily_activity'
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    date = Column(Date, nullable=False)
+    break_count = Column(Integer, default=0)
+    total_seconds = Column(Integer, default=0)
+    category_counts = Column(JSON, default=dict)  # {'mindfulness': 2, 'movement': 1}
+    hour_counts = Column(JSON, default=list)  # 24 local-hour buckets
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('user_id', 'date', name='_user_activity_date_uc'),
+    )
+    
+    def __repr__(self):
+        return f'<UserDailyActivity {self.user_id} on {self.date}: {self.break_count} breaks>'
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'date': self.date.isoformat(),
+            'break_count': self.break_count or 0,
+            'minutes': round((self.total_seconds or 0) / 60, 1),
+        }
+
+
+class UserAcceptanceStats(db.Model):
+    """Per-user recommendation outcome counts in fixed-size arrays"""
+    __tablename__ = 'user_acceptance_stats'
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), unique=True, nullable=False)
+    hour_accepted = Column(JSON)  # 168 hour-of-week buckets, Monday 00:00 first
+    hour_dismissed = Column(JSON)
+    gap_accepted = Column(JSON)  # One bucket per gap type
+    gap_dismissed = Column(JSON)
+    category_accepted = Column(JSON)  # One bucket per break category
+    category_dismissed = Column(JSON)
+    acted_count = Column(Integer, default=0)  # Recommendations accepted, dismissed or completed
+    expired_count = Column(Integer, default=0)  # Recommendations that expired untouched
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<UserAcceptanceStats {self.user_id}>'
+
+
 class CompanyAnalytics(db.Model):
     """Aggregated company-level analytics model"""
     __tablename__ = 'company_analytics'
@@ -54,4 +104,28 @@ class CompanyAnalytics(db.Model):
     )
     
     def __repr__(self):
-        return f'<CompanyAnalytics {self.company_domain} on {self.date}>'
\ No newline at end of file
+        return f'<CompanyAnalytics {self.company_domain} on {self.date}>'
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'date': self.date.isoformat(),
+            'total_users': self.total_users,
+            'active_users': self.active_users,
+            'total_breaks': self.total_breaks,
+            'avg_breaks_per_user': self.avg_breaks_per_user,
+            'popular_category': self.popular_category,
+            'popular_time_slot': self.popular_time_slot,
+        }
+
+
+class RollupWatermark(db.Model):
+    """High-water mark of an incremental rollup job"""
+    __tablename__ = 'rollup_watermarks'
+    
+    name = Column(String(100), primary_key=True)
+    watermark = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<RollupWatermark {self.name} at {self.watermark}>'
\ No newline at end of file
@@ -52,14 +52,18 @@ class BreakRecommendation(db.Model):
     recommended_time = Column(DateTime(timezone=True), nullable=False)
     reason = Column(Text)  # "After your 2-hour meeting block"
     score = Column(Float, nullable=False)  # Algorithm confidence score
-    status = Column(String(20), default='pending')  # 'pending', 'accepted', 'dismissed', 'completed'
+    status = Column(String(20), default='pending')  # 'pending', 'accepted', 'dismissed', 'completed', 'expired'
+    gap_type = Column(String(20))  # 'between_meetings', 'before_first', 'after_last', 'empty_day'
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     
     # Relationships
     user = relationship('User', back_populates='recommendations')
     session = relationship('BreakSession', back_populates='recommendations')
-    completed_break = relationship('CompletedBreak', back_populates='recommendation', uselist=False)
+    completed_break = relationship(
+        'CompletedBreak', back_populates='recommendation', uselist=False,
+        primaryjoin='BreakRecommendation.id == foreign(CompletedBreak.recommendation_id)'
+    )
     
     def __repr__(self):
         return f'<BreakRecommendation for {self.user_id} at {self.recommended_time}>'
@@ -82,7 +86,8 @@ class CompletedBreak(db.Model):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     session_id = Column(UUID(as_uuid=True), ForeignKey('break_sessions.id'), nullable=False)
-    recommendation_id = Column(UUID(as_uuid=True), ForeignKey('break_recommendations.id'), nullable=True)
+    # No foreign key: break_recommendations is partitioned and old partitions are dropped
+    recommendation_id = Column(UUID(as_uuid=True), nullable=True)
     started_at = Column(DateTime(timezone=True), nullable=False)
     completed_at = Column(DateTime(timezone=True))
     duration_seconds = Column(Integer)  # Actual time spent
@@ -93,7 +98,10 @@ class CompletedBreak(db.Model):
     # Relationships
     user = relationship('User', back_populates='completed_breaks')
     session = relationship('BreakSession', back_populates='completed_breaks')
-    recommendation = relationship('BreakRecommendation', back_populates='completed_break')
+    recommendation = relationship(
+        'BreakRecommendation', back_populates='completed_break',
+        primaryjoin='foreign(CompletedBreak.recommendation_id) == BreakRecommendation.id'
+    )
     
     def __repr__(self):
         return f'<CompletedBreak {self.session_id} by {self.user_id}>'
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, ForeignKey, UniqueConstraint, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -18,6 +18,9 @@ class CalendarConnection(db.Model):
     token_expires_at = Column(DateTime(timezone=True), nullable=False)
     calendar_id = Column(String(255))
     last_sync_at = Column(DateTime(timezone=True))
+    # Provider state for incremental sync (Graph deltaLink) and the window it covers
+    delta_token = Column(Text)
+    delta_window_end = Column(DateTime(timezone=True))
     sync_enabled = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -57,9 +60,9 @@ class CalendarEvent(db.Model):
     # Relationships
     user = relationship('User', back_populates='calendar_events')
     
-    # Constraints
+    # Constraints; unique keys on the partitioned table must include start_time
     __table_args__ = (
-        UniqueConstraint('user_id', 'external_id', name='_user_event_uc'),
+        UniqueConstraint('user_id', 'external_id', 'start_time', name='_user_event_uc'),
     )
     
     def __repr__(self):
@@ -69,4 +72,39 @@ class CalendarEvent(db.Model):
     def duration_minutes(self):
         """Calculate event duration in minutes"""
         delta = self.end_time - self.start_time
-        return int(delta.total_seconds() / 60)
\ No newline at end of file
+        return int(delta.total_seconds() / 60)
+
+
+class RecurringSeries(db.Model):
+    """
+    A recurring meeting stored once with its recurrence rules.
+    Instances are expanded on read (app.services.recurrence); moved instances
+    are stored as CalendarEvent rows and excluded here.
+    """
+    __tablename__ = 'recurring_series'
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    external_id = Column(String(255), nullable=False)
+    title = Column(String(500))
+    start_time = Column(DateTime(timezone=True), nullable=False)  # First instance
+    duration_minutes = Column(Integer, nullable=False)
+    timezone = Column(String(64), nullable=False)  # Rules repeat in this zone's wall time
+    recurrence = Column(Text, nullable=False)  # RRULE/EXDATE/RDATE lines
+    excluded_starts = Column(JSON, default=list)  # ISO start times of cancelled or moved instances
+    attendee_count = Column(Integer, default=1)
+    meeting_type = Column(String(50))
+    
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    user = relationship('User', back_populates='recurring_series')
+    
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('user_id', 'external_id', name='_user_series_uc'),
+    )
+    
+    def __repr__(self):
+        return f'<RecurringSeries {self.title} from {self.start_time}>'
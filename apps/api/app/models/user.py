@@ -30,6 +30,7 @@ class User(db.Model):
     # Relationships
     calendar_connections = relationship('CalendarConnection', back_populates='user', cascade='all, delete-orphan')
     calendar_events = relationship('CalendarEvent', back_populates='user', cascade='all, delete-orphan')
+    recurring_series = relationship('RecurringSeries', back_populates='user', cascade='all, delete-orphan')
     recommendations = relationship('BreakRecommendation', back_populates='user', cascade='all, delete-orphan')
     completed_breaks = relationship('CompletedBreak', back_populates='user', cascade='all, delete-orphan')
     streak = relationship('UserStreak', back_populates='user', uselist=False, cascade='all, delete-orphan')
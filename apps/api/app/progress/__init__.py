@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+progress_bp = Blueprint('progress', __name__)
+
+from . import routes
\ No newline at end of file
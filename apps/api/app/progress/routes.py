@@ -0,0 +1,75 @@
+"""
+Progress API routes for streaks and the progress dashboard.
+Reads maintained aggregates only; never scans break history.
+"""
+import logging
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.progress import progress_bp
+from app.services.progress_service import ProgressService
+from app.services.streak_service import StreakService, effective_current_streak
+from app.utils.db_routing import read_replica
+
+logger = logging.getLogger(__name__)
+
+
+@progress_bp.route('/streak', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_streak():
+    """
+    Get the current user's break streak.
+    A streak without a break yesterday or today is reported as 0.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+
+        streak_service = StreakService()
+        row = streak_service.get_streak(current_user_id)
+
+        if not row:
+            return jsonify({
+                'current_streak': 0,
+                'longest_streak': 0,
+                'last_break_date': None,
+                'streak_started_at': None
+            }), 200
+
+        streak, timezone = row
+        current = effective_current_streak(streak, streak_service.local_today(timezone))
+
+        return jsonify({
+            'current_streak': current,
+            'longest_streak': streak.longest_streak or 0,
+            'last_break_date': streak.last_break_date.isoformat() if streak.last_break_date else None,
+            'streak_started_at': streak.streak_started_at.isoformat() if current and streak.streak_started_at else None
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Failed to get streak for user {current_user_id}: {e}")
+        return jsonify({'error': 'Failed to get streak'}), 500
+
+
+@progress_bp.route('/overview', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_progress_overview():
+    """
+    Get the progress dashboard: wellness score, trend, categories and active time.
+    Query parameters: days (default 30, max 30).
+    """
+    try:
+        current_user_id = get_jwt_identity()
+
+        days = min(max(request.args.get('days', 30, type=int), 7), 30)
+        overview = ProgressService().get_overview(current_user_id, days)
+
+        if overview is None:
+            return jsonify({'error': 'User not found'}), 404
+
+        return jsonify(overview), 200
+
+    except Exception as e:
+        logger.error(f"Failed to get progress overview for user {current_user_id}: {e}")
+        return jsonify({'error': 'Failed to get progress overview'}), 500
@@ -5,16 +5,24 @@ import logging
 from datetime import datetime
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import joinedload
 
+from app import db
 from app.recommendations import recommendations_bp
 from app.models import BreakRecommendation, BreakSession
+from app.services.acceptance_service import AcceptanceService
+from app.services.dashboard_service import RECOMMENDATION, invalidate_dashboard
 from app.services.recommendation_service import RecommendationService
+from app.utils.db_routing import read_replica
+from app.utils.event_stream import publish_user_event
+from app.utils.query_budget import endpoint_budget
 
 logger = logging.getLogger(__name__)
 
 
 @recommendations_bp.route('/today', methods=['GET'])
 @jwt_required()
+@endpoint_budget(20)
 def get_today_recommendation():
     """
     Get the single best break recommendation for today.
@@ -108,31 +116,74 @@ def generate_recommendations():
         return jsonify({'error': 'Failed to generate recommendations'}), 500
 
 
-@recommendations_bp.route('/<int:recommendation_id>/dismiss', methods=['POST'])
+@recommendations_bp.route('/<uuid:recommendation_id>/accept', methods=['POST'])
 @jwt_required()
-def dismiss_recommendation(recommendation_id: int):
+def accept_recommendation(recommendation_id):
+    """
+    Accept a recommendation (user plans to take this break).
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        
+        # Locked so an expiry batch holding the row is waited for and its status re-read
+        recommendation = BreakRecommendation.query.filter_by(
+            id=recommendation_id,
+            user_id=current_user_id
+        ).with_for_update().first()
+        
+        if not recommendation:
+            return jsonify({'error': 'Recommendation not found'}), 404
+        
+        if recommendation.status == 'pending':
+            AcceptanceService().record_recommendation(recommendation, accepted=True)
+            recommendation.status = 'accepted'
+            db.session.commit()
+            invalidate_dashboard(current_user_id, RECOMMENDATION)
+        
+        return jsonify({
+            'message': 'Recommendation accepted',
+            'status': recommendation.status
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Failed to accept recommendation {recommendation_id} for user {current_user_id}: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to accept recommendation'}), 500
+
+
+@recommendations_bp.route('/<uuid:recommendation_id>/dismiss', methods=['POST'])
+@jwt_required()
+def dismiss_recommendation(recommendation_id):
     """
     Dismiss a recommendation (user doesn't want this break).
     """
     try:
         current_user_id = get_jwt_identity()
         
+        # Locked so an expiry batch holding the row is waited for and its status re-read
         recommendation = BreakRecommendation.query.filter_by(
             id=recommendation_id,
             user_id=current_user_id
-        ).first()
+        ).with_for_update().first()
         
         if not recommendation:
             return jsonify({'error': 'Recommendation not found'}), 404
         
+        # An accepted recommendation was already counted once
+        if recommendation.status == 'pending':
+            AcceptanceService().record_recommendation(recommendation, accepted=False)
         recommendation.status = 'dismissed'
         
         # Generate a new recommendation to replace the dismissed one
         recommendation_service = RecommendationService()
         new_recommendations = recommendation_service.generate_and_store_recommendations(current_user_id)
         
-        from app import db
         db.session.commit()
+        invalidate_dashboard(current_user_id, RECOMMENDATION)
+        publish_user_event(current_user_id, 'recommendation_dismissed', {
+            'id': str(recommendation_id),
+            'new_recommendations_generated': len(new_recommendations)
+        })
         
         return jsonify({
             'message': 'Recommendation dismissed',
@@ -146,6 +197,8 @@ def dismiss_recommendation(recommendation_id: int):
 
 @recommendations_bp.route('/history', methods=['GET'])
 @jwt_required()
+@read_replica
+@endpoint_budget(2, max_repeats=1)
 def get_recommendation_history():
     """
     Get user's recommendation history.
@@ -157,7 +210,9 @@ def get_recommendation_history():
         limit = min(request.args.get('limit', 10, type=int), 50)  # Max 50
         offset = request.args.get('offset', 0, type=int)
         
-        recommendations = BreakRecommendation.query.filter_by(
+        recommendations = BreakRecommendation.query.options(
+            joinedload(BreakRecommendation.session)
+        ).filter_by(
             user_id=current_user_id
         ).order_by(
             BreakRecommendation.recommended_time.desc()
@@ -168,7 +223,7 @@ def get_recommendation_history():
         }
         
         for rec in recommendations:
-            break_session = BreakSession.query.get(rec.session_id)
+            break_session = rec.session
             
             response_data['recommendations'].append({
                 'id': rec.id,
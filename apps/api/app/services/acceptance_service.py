@@ -0,0 +1,151 @@
+"""
+Acceptance Service
+Learns when and how each user takes recommended breaks from accept, dismiss and complete outcomes.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+import pytz
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models import User, BreakSession, BreakRecommendation, UserAcceptanceStats
+
+logger = logging.getLogger(__name__)
+
+HOURS_OF_WEEK = 168
+GAP_TYPES = ('before_first', 'between_meetings', 'after_last', 'empty_day')
+CATEGORIES = ('mindfulness', 'movement', 'rest')  # Anything else shares a trailing bucket
+
+# Score points a fully confident preference adds or removes
+ACCEPTANCE_WEIGHT = 2.0
+
+# Observations in a bucket before its learned rate outweighs the neutral prior
+PRIOR_STRENGTH = 5
+
+
+def hour_of_week(moment: datetime, timezone: str = 'UTC') -> int:
+    """Bucket index for a moment in the user's local week, Monday 00:00 first"""
+    if moment.tzinfo is None:
+        moment = pytz.utc.localize(moment)
+    local = moment.astimezone(pytz.timezone(timezone or 'UTC'))
+    return local.weekday() * 24 + local.hour
+
+
+def gap_index(gap_type: Optional[str]) -> Optional[int]:
+    return GAP_TYPES.index(gap_type) if gap_type in GAP_TYPES else None
+
+
+def category_index(category: Optional[str]) -> int:
+    return CATEGORIES.index(category) if category in CATEGORIES else len(CATEGORIES)
+
+
+def empty_stats_values(user_id=None) -> Dict:
+    """Column values of zeroed stats, every array at its fixed size"""
+    return {
+        'user_id': user_id,
+        'hour_accepted': [0] * HOURS_OF_WEEK,
+        'hour_dismissed': [0] * HOURS_OF_WEEK,
+        'gap_accepted': [0] * len(GAP_TYPES),
+        'gap_dismissed': [0] * len(GAP_TYPES),
+        'category_accepted': [0] * (len(CATEGORIES) + 1),
+        'category_dismissed': [0] * (len(CATEGORIES) + 1),
+        'acted_count': 0,
+        'expired_count': 0,
+    }
+
+
+def empty_stats(user_id=None) -> UserAcceptanceStats:
+    """Zeroed stats with every array at its fixed size"""
+    return UserAcceptanceStats(**empty_stats_values(user_id))
+
+
+def preference(accepted: int, dismissed: int) -> float:
+    """
+    Signal in [-1, 1] from one bucket's counts.
+    Laplace-smoothed acceptance rate, shrunk towards neutral while evidence is thin.
+    """
+    observed = accepted + dismissed
+    rate = (accepted + 1) / (observed + 2)
+    confidence = observed / (observed + PRIOR_STRENGTH)
+    return (rate - 0.5) * 2 * confidence
+
+
+def _bucket(stats: UserAcceptanceStats, dimension: str, index: Optional[int]) -> float:
+    if index is None:
+        return 0.0
+    accepted = getattr(stats, f'{dimension}_accepted') or []
+    dismissed = getattr(stats, f'{dimension}_dismissed') or []
+    if index >= len(accepted) or index >= len(dismissed):
+        return 0.0
+    return preference(accepted[index], dismissed[index])
+
+
+def acceptance_adjustment(stats: Optional[UserAcceptanceStats], moment: datetime,
+                          gap_type: Optional[str], timezone: str = 'UTC') -> float:
+    """Score points for an opportunity from the user's history; O(1) array lookups"""
+    if stats is None:
+        return 0.0
+    signal = (0.6 * _bucket(stats, 'hour', hour_of_week(moment, timezone))
+              + 0.4 * _bucket(stats, 'gap', gap_index(gap_type)))
+    return ACCEPTANCE_WEIGHT * signal
+
+
+def category_preference(stats: Optional[UserAcceptanceStats], category: Optional[str]) -> float:
+    """Signal in [-1, 1] for a break category"""
+    if stats is None:
+        return 0.0
+    return _bucket(stats, 'category', category_index(category))
+
+
+class AcceptanceService:
+    """
+    Maintains UserAcceptanceStats incrementally.
+    Each outcome increments three array buckets on a single row.
+    """
+
+    def get_stats(self, user_id) -> Optional[UserAcceptanceStats]:
+        return UserAcceptanceStats.query.filter_by(user_id=user_id).first()
+
+    def record_outcome(self, user_id, accepted: bool, recommended_time: datetime,
+                       gap_type: Optional[str], category: Optional[str],
+                       timezone: str = 'UTC') -> UserAcceptanceStats:
+        """Count one accepted or dismissed recommendation; the caller commits"""
+        # Create the row first so racing first outcomes both lock it
+        # instead of one failing on the unique user_id
+        db.session.execute(
+            insert(UserAcceptanceStats.__table__).values(
+                **empty_stats_values(user_id)
+            ).on_conflict_do_nothing(index_elements=['user_id'])
+        )
+        stats = UserAcceptanceStats.query.filter_by(user_id=user_id).with_for_update().one()
+
+        stats.acted_count = (stats.acted_count or 0) + 1
+        suffix = 'accepted' if accepted else 'dismissed'
+        self._increment(stats, f'hour_{suffix}', hour_of_week(recommended_time, timezone), HOURS_OF_WEEK)
+        self._increment(stats, f'gap_{suffix}', gap_index(gap_type), len(GAP_TYPES))
+        self._increment(stats, f'category_{suffix}', category_index(category), len(CATEGORIES) + 1)
+        return stats
+
+    def record_recommendation(self, recommendation: BreakRecommendation, accepted: bool) -> UserAcceptanceStats:
+        """Count an outcome for a stored recommendation, resolving timezone and category in one query"""
+        row = db.session.query(User.timezone, BreakSession.category).join(
+            BreakSession, BreakSession.id == recommendation.session_id
+        ).filter(User.id == recommendation.user_id).first()
+        timezone, category = row if row else ('UTC', None)
+
+        return self.record_outcome(
+            recommendation.user_id, accepted, recommendation.recommended_time,
+            recommendation.gap_type, category, timezone
+        )
+
+    @staticmethod
+    def _increment(stats: UserAcceptanceStats, column: str, index: Optional[int], size: int) -> None:
+        if index is None:
+            return
+        # JSON columns only track reassignment, so build a new list
+        values = list(getattr(stats, column) or [])
+        values += [0] * (size - len(values))
+        values[index] += 1
+        setattr(stats, column, values)
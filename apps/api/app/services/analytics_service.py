@@ -0,0 +1,186 @@
+"""
+Company Analytics Rollup Service
+Maintains the company_analytics table from completed breaks incrementally.
+"""
+import logging
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import text
+
+from app import db
+from app.models import CompanyAnalytics, RollupWatermark
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = 'company_analytics'
+
+# Breaks completed shortly before the previous run may have committed after it
+LOOKBACK = timedelta(minutes=10)
+
+# Recomputes every (company, day) group listed in the `changed` CTE.
+# Groups are recomputed in full, so re-running a range is idempotent.
+_UPSERT_SQL = """
+WITH changed AS (
+    {changed}
+),
+day_breaks AS (
+    SELECT c.company_domain,
+           c.day,
+           cb.user_id,
+           bs.category,
+           EXTRACT(HOUR FROM cb.started_at AT TIME ZONE COALESCE(u.timezone, 'UTC')) AS local_hour
+    FROM changed c
+    JOIN users u ON u.company_domain = c.company_domain
+    JOIN completed_breaks cb ON cb.user_id = u.id
+        AND cb.started_at >= c.day::timestamp AT TIME ZONE 'UTC'
+        AND cb.started_at < (c.day + 1)::timestamp AT TIME ZONE 'UTC'
+        AND cb.completed_at IS NOT NULL
+    JOIN break_sessions bs ON bs.id = cb.session_id
+),
+per_day AS (
+    SELECT company_domain,
+           day,
+           COUNT(*) AS total_breaks,
+           COUNT(DISTINCT user_id) AS active_users,
+           mode() WITHIN GROUP (ORDER BY category) AS popular_category,
+           mode() WITHIN GROUP (ORDER BY CASE
+               WHEN local_hour < 12 THEN 'morning'
+               WHEN local_hour < 17 THEN 'afternoon'
+               ELSE 'evening'
+           END) AS popular_time_slot
+    FROM day_breaks
+    GROUP BY company_domain, day
+),
+company_users AS (
+    SELECT company_domain, COUNT(*) AS total_users
+    FROM users
+    WHERE is_active AND company_domain IN (SELECT DISTINCT company_domain FROM changed)
+    GROUP BY company_domain
+)
+INSERT INTO company_analytics (
+    id, company_domain, date, total_users, active_users, total_breaks,
+    avg_breaks_per_user, popular_category, popular_time_slot, created_at
+)
+SELECT uuid_generate_v4(),
+       c.company_domain,
+       c.day,
+       COALESCE(cu.total_users, 0),
+       COALESCE(p.active_users, 0),
+       COALESCE(p.total_breaks, 0),
+       COALESCE(p.total_breaks::float / NULLIF(p.active_users, 0), 0),
+       p.popular_category,
+       p.popular_time_slot,
+       NOW()
+FROM (SELECT DISTINCT company_domain, day FROM changed) c
+LEFT JOIN per_day p ON p.company_domain = c.company_domain AND p.day = c.day
+LEFT JOIN company_users cu ON cu.company_domain = c.company_domain
+ON CONFLICT (company_domain, date) DO UPDATE SET
+    total_users = EXCLUDED.total_users,
+    active_users = EXCLUDED.active_users,
+    total_breaks = EXCLUDED.total_breaks,
+    avg_breaks_per_user = EXCLUDED.avg_breaks_per_user,
+    popular_category = EXCLUDED.popular_category,
+    popular_time_slot = EXCLUDED.popular_time_slot
+"""
+
+# Days touched by breaks completed inside the watermark window
+_CHANGED_SINCE_WATERMARK = """
+    SELECT DISTINCT u.company_domain, (cb.started_at AT TIME ZONE 'UTC')::date AS day
+    FROM completed_breaks cb
+    JOIN users u ON u.id = cb.user_id
+    WHERE cb.completed_at > :since AND cb.completed_at <= :until
+      AND u.company_domain IS NOT NULL
+"""
+
+# Every day with breaks inside a historical date range
+_CHANGED_IN_RANGE = """
+    SELECT DISTINCT u.company_domain, (cb.started_at AT TIME ZONE 'UTC')::date AS day
+    FROM completed_breaks cb
+    JOIN users u ON u.id = cb.user_id
+    WHERE cb.started_at >= CAST(:start_day AS date)::timestamp AT TIME ZONE 'UTC'
+      AND cb.started_at < CAST(:end_day AS date)::timestamp AT TIME ZONE 'UTC'
+      AND cb.completed_at IS NOT NULL
+      AND u.company_domain IS NOT NULL
+"""
+
+
+def date_batches(start: date, end: date, batch_days: int) -> Iterator[Tuple[date, date]]:
+    """Split [start, end) into consecutive half-open ranges of at most batch_days"""
+    if batch_days < 1:
+        raise ValueError("batch_days must be positive")
+    cursor = start
+    while cursor < end:
+        batch_end = min(cursor + timedelta(days=batch_days), end)
+        yield cursor, batch_end
+        cursor = batch_end
+
+
+class AnalyticsRollupService:
+    """
+    Aggregates completed breaks into company_analytics with set-based upserts.
+    Only (company, day) groups touched since the last watermark are recomputed.
+    """
+
+    def rollup_changed(self, now: datetime = None) -> int:
+        """
+        Recompute the days changed since the last run and advance the watermark.
+        Returns the number of (company, day) rows upserted.
+        """
+        until = now or datetime.utcnow()
+
+        try:
+            # Row lock serializes concurrent runs
+            watermark = db.session.query(RollupWatermark).filter_by(
+                name=WATERMARK_NAME
+            ).with_for_update().first()
+
+            if watermark is None:
+                # First run only covers the last day; older history is loaded with backfill()
+                watermark = RollupWatermark(name=WATERMARK_NAME, watermark=until - timedelta(days=1))
+                db.session.add(watermark)
+
+            since = watermark.watermark - LOOKBACK
+            result = db.session.execute(
+                text(_UPSERT_SQL.format(changed=_CHANGED_SINCE_WATERMARK)),
+                {'since': since, 'until': until}
+            )
+            watermark.watermark = until
+            db.session.commit()
+
+            logger.info(f"Company analytics rollup upserted {result.rowcount} rows up to {until.isoformat()}")
+            return result.rowcount
+
+        except Exception as e:
+            logger.error(f"Company analytics rollup failed: {e}")
+            db.session.rollback()
+            raise
+
+    def backfill(self, start: date, end: date, batch_days: int = 7) -> int:
+        """
+        Recompute every day in [start, end) in bounded batches.
+        Each batch commits separately so long backfills don't hold locks.
+        """
+        total = 0
+        for batch_start, batch_end in date_batches(start, end, batch_days):
+            try:
+                result = db.session.execute(
+                    text(_UPSERT_SQL.format(changed=_CHANGED_IN_RANGE)),
+                    {'start_day': batch_start.isoformat(), 'end_day': batch_end.isoformat()}
+                )
+                db.session.commit()
+                total += result.rowcount
+                logger.info(f"Backfilled company analytics {batch_start} to {batch_end}: {result.rowcount} rows")
+            except Exception as e:
+                logger.error(f"Company analytics backfill failed for {batch_start} to {batch_end}: {e}")
+                db.session.rollback()
+                raise
+        return total
+
+    def get_company_analytics(self, company_domain: str, start: date, end: date) -> List[CompanyAnalytics]:
+        """Read pre-aggregated rows for a dashboard; never touches completed_breaks"""
+        return CompanyAnalytics.query.filter(
+            CompanyAnalytics.company_domain == company_domain,
+            CompanyAnalytics.date >= start,
+            CompanyAnalytics.date <= end
+        ).order_by(CompanyAnalytics.date).all()
@@ -0,0 +1,278 @@
+"""
+Break Write-Behind Buffer
+In-progress breaks live in Redis while the player sends heartbeats; a flusher
+batches them into completed_breaks and applies completion aggregates.
+"""
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pytz
+
+from app import db
+from app.models import BreakRecommendation, CompletedBreak
+from app.services.catalog_service import catalog_service
+from app.services.dashboard_service import invalidate_dashboard
+from app.utils.metrics import registry
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'breaks:state:'
+# Ids of breaks with changes not yet written to Postgres
+DIRTY_KEY = 'breaks:dirty'
+# Long enough for any session plus late completion retries
+STATE_TTL = 86400
+# Failed flush attempts per break, and states that kept failing, kept for repair
+FAILURES_KEY = 'breaks:flush_failures'
+DEAD_LETTER_KEY = 'breaks:dead'
+MAX_FLUSH_ATTEMPTS = 5
+
+BREAKS_FLUSHED = registry.counter(
+    'break_buffer_flushed_total', 'Buffered break states written to the database, by state', ('state',)
+)
+BREAKS_DEAD_LETTERED = registry.counter(
+    'break_buffer_dead_lettered_total', 'Buffered breaks moved to the dead-letter hash after repeated flush failures'
+)
+
+# Atomically checks ownership, applies a heartbeat or completion and marks the
+# break dirty. Returns the updated state, or nil for an unknown or foreign break.
+_UPDATE_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'user_id', 'status', 'started_at')
+if not state[1] or state[1] ~= ARGV[1] then
+    return nil
+end
+if state[2] ~= 'completed' then
+    if ARGV[3] == 'complete' then
+        redis.call('HSET', KEYS[1],
+            'status', 'completed',
+            'completed_at', ARGV[4],
+            'duration_seconds', math.floor(tonumber(ARGV[4]) - tonumber(state[3])),
+            'completion_percentage', ARGV[6],
+            'felt_better', ARGV[7])
+    else
+        redis.call('HSET', KEYS[1], 'duration_seconds', ARGV[5], 'completion_percentage', ARGV[6])
+    end
+    redis.call('SADD', KEYS[2], ARGV[2])
+    redis.call('EXPIRE', KEYS[1], ARGV[8])
+end
+return redis.call('HGETALL', KEYS[1])
+"""
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromtimestamp(float(value), pytz.UTC) if value else None
+
+
+def _encode_bool(value: Optional[bool]) -> str:
+    return '' if value is None else str(int(bool(value)))
+
+
+def _decode_bool(value: Optional[str]) -> Optional[bool]:
+    return None if value in (None, '') else value == '1'
+
+
+def _clamp_percentage(value) -> int:
+    return max(0, min(int(value), 100))
+
+
+class BreakBuffer:
+    """
+    Redis-backed state for breaks in progress.
+    Start, heartbeat and completion are single Redis round trips; Postgres sees
+    one batched write per flush interval regardless of heartbeat frequency.
+    """
+
+    def __init__(self, client_factory=get_redis):
+        self._client_factory = client_factory
+        self._update_script = None
+
+    @property
+    def client(self):
+        return self._client_factory()
+
+    def _update(self, user_id, break_id, mode: str, duration_seconds: int = 0,
+                completion_percentage: int = 0, felt_better: Optional[bool] = None) -> Optional[Dict]:
+        if self._update_script is None:
+            self._update_script = self.client.register_script(_UPDATE_SCRIPT)
+        result = self._update_script(
+            keys=[f'{KEY_PREFIX}{break_id}', DIRTY_KEY],
+            args=[str(user_id), str(break_id), mode, time.time(), max(int(duration_seconds), 0),
+                  _clamp_percentage(completion_percentage), _encode_bool(felt_better), STATE_TTL],
+            client=self.client,
+        )
+        if not result:
+            return None
+        return dict(zip(result[::2], result[1::2]))
+
+    def start(self, user_id, session_id, recommendation_id=None) -> Dict:
+        """Record a started break; the row is inserted by the next flush"""
+        # The catalog snapshot answers this without a database read
+        if str(session_id) not in catalog_service.get_snapshot().by_id:
+            raise ValueError(f"Break session {session_id} not found")
+        # Same contract as the database path; one primary-key lookup
+        if recommendation_id and db.session.query(BreakRecommendation.id).filter_by(
+            id=recommendation_id, user_id=user_id
+        ).first() is None:
+            raise ValueError(f"Recommendation {recommendation_id} not found")
+
+        break_id = str(uuid.uuid4())
+        state = {
+            'id': break_id,
+            'user_id': str(user_id),
+            'session_id': str(session_id),
+            'recommendation_id': str(recommendation_id) if recommendation_id else '',
+            'status': 'active',
+            'started_at': time.time(),
+            'duration_seconds': 0,
+            'completion_percentage': 0,
+        }
+        pipe = self.client.pipeline()
+        pipe.hset(f'{KEY_PREFIX}{break_id}', mapping=state)
+        pipe.expire(f'{KEY_PREFIX}{break_id}', STATE_TTL)
+        pipe.sadd(DIRTY_KEY, break_id)
+        pipe.execute()
+        return state
+
+    def progress(self, user_id, break_id, duration_seconds: int, completion_percentage: int) -> Optional[Dict]:
+        """Apply a player heartbeat; None when the break isn't buffered for this user"""
+        return self._update(user_id, break_id, 'progress', duration_seconds, completion_percentage)
+
+    def complete(self, user_id, break_id, completion_percentage: int = 100,
+                 felt_better: Optional[bool] = None) -> Optional[Dict]:
+        """Complete a buffered break; repeated calls return the first completion"""
+        return self._update(user_id, break_id, 'complete', 0, completion_percentage, felt_better)
+
+    def flush(self, batch_size: int = 500) -> int:
+        """
+        Write up to batch_size dirty breaks in one transaction, each in its own savepoint.
+        Breaks updated mid-flush are marked dirty again and picked up next time.
+        A break that fails is retried by later flushes, then dead-lettered.
+        """
+        break_ids = self.client.spop(DIRTY_KEY, batch_size)
+        if not break_ids:
+            return 0
+
+        try:
+            pipe = self.client.pipeline()
+            for break_id in break_ids:
+                pipe.hgetall(f'{KEY_PREFIX}{break_id}')
+            states = [state for state in pipe.execute() if state]
+            failed = self._persist(states)
+        except Exception:
+            db.session.rollback()
+            # Nothing was written; hand the ids to the next flush
+            self.client.sadd(DIRTY_KEY, *break_ids)
+            raise
+
+        self._record_failures(states, failed)
+        return len(states) - len(failed)
+
+    def _record_failures(self, states: List[Dict], failed: List[str]) -> None:
+        """Requeue failed breaks, dead-lettering those out of attempts; reset the count of the rest"""
+        succeeded = [state['id'] for state in states if state['id'] not in failed]
+        if succeeded:
+            self.client.hdel(FAILURES_KEY, *succeeded)
+        if not failed:
+            return
+
+        pipe = self.client.pipeline()
+        for break_id in failed:
+            pipe.hincrby(FAILURES_KEY, break_id, 1)
+        attempts = dict(zip(failed, pipe.execute()))
+
+        pipe = self.client.pipeline()
+        for state in states:
+            break_id = state['id']
+            if break_id not in attempts:
+                continue
+            if attempts[break_id] < MAX_FLUSH_ATTEMPTS:
+                pipe.sadd(DIRTY_KEY, break_id)
+                continue
+            logger.error(f"Dead-lettering buffered break {break_id} after {MAX_FLUSH_ATTEMPTS} failed flushes")
+            pipe.hset(DEAD_LETTER_KEY, mapping={break_id: json.dumps(state)})
+            pipe.hdel(FAILURES_KEY, break_id)
+            BREAKS_DEAD_LETTERED.inc()
+        pipe.execute()
+
+    def _persist(self, states: List[Dict]) -> List[str]:
+        """Write the states and commit; returns the ids whose savepoint failed"""
+        from app.services.break_service import BreakService
+
+        if not states:
+            return []
+
+        ids = [uuid.UUID(state['id']) for state in states]
+        rows = {row.id: row for row in CompletedBreak.query.filter(CompletedBreak.id.in_(ids)).all()}
+        # Needed to check the owner of new rows and to complete recommendations
+        recommendation_ids = {uuid.UUID(s['recommendation_id']) for s in states if s.get('recommendation_id')
+                              and (s.get('status') == 'completed' or uuid.UUID(s['id']) not in rows)}
+        recommendations = {
+            rec.id: rec for rec in BreakRecommendation.query.filter(
+                BreakRecommendation.id.in_(recommendation_ids)
+            ).with_for_update().all()
+        } if recommendation_ids else {}
+
+        break_service = BreakService()
+        completed_users = set()
+        failed = []
+        for state in states:
+            try:
+                with db.session.begin_nested():
+                    newly_completed = self._persist_state(state, rows, recommendations, break_service)
+            except Exception as e:
+                logger.warning(f"Failed to flush buffered break {state['id']}: {e}")
+                failed.append(state['id'])
+                continue
+
+            if newly_completed:
+                completed_users.add(uuid.UUID(state['user_id']))
+            BREAKS_FLUSHED.inc(state='completed' if newly_completed else 'progress')
+
+        db.session.commit()
+        for user_id in completed_users:
+            invalidate_dashboard(user_id)
+        return failed
+
+    @staticmethod
+    def _persist_state(state: Dict, rows: Dict, recommendations: Dict, break_service) -> bool:
+        """Upsert one break; True when this flush completed it"""
+        break_id = uuid.UUID(state['id'])
+        row = rows.get(break_id)
+        if row is None:
+            user_id = uuid.UUID(state['user_id'])
+            recommendation = recommendations.get(
+                uuid.UUID(state['recommendation_id']) if state.get('recommendation_id') else None
+            )
+            row = CompletedBreak(
+                id=break_id,
+                user_id=user_id,
+                session_id=uuid.UUID(state['session_id']),
+                # Never store another user's (or a since-deleted) recommendation
+                recommendation_id=recommendation.id if recommendation and recommendation.user_id == user_id else None,
+                started_at=_timestamp(state['started_at']),
+            )
+            db.session.add(row)
+
+        newly_completed = state.get('status') == 'completed' and row.completed_at is None
+        row.duration_seconds = int(state.get('duration_seconds') or 0)
+        row.completion_percentage = int(state.get('completion_percentage') or 0)
+
+        if newly_completed:
+            row.completed_at = _timestamp(state['completed_at'])
+            row.felt_better = _decode_bool(state.get('felt_better'))
+            recommendation = recommendations.get(row.recommendation_id)
+            # Only the break's owner can complete a recommendation
+            if recommendation and recommendation.user_id != row.user_id:
+                recommendation = None
+            break_service.record_completion(row, recommendation)
+            if recommendation:
+                recommendation.status = 'completed'
+
+        return newly_completed
+
+
+break_buffer = BreakBuffer()
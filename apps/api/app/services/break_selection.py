@@ -0,0 +1,58 @@
+"""
+Break Selection
+Chooses up to K break opportunities that maximise total score while staying spaced apart.
+"""
+from bisect import bisect_right
+from datetime import timedelta
+from typing import Dict, List
+
+
+def select_spaced_breaks(opportunities: List[Dict], max_breaks: int,
+                         min_spacing_minutes: float) -> List[Dict]:
+    """
+    Weighted interval scheduling with a cardinality limit.
+
+    Each opportunity occupies [start, end + spacing), so two picks are compatible
+    when one ends at least min_spacing_minutes before the other starts. Sorting by
+    occupied end and finding each predecessor by bisection is O(n log n); the DP
+    over (picks, opportunities) adds O(K * n). Returns picks by descending score.
+    """
+    candidates = [o for o in opportunities if o['score'] > 0]
+    if max_breaks <= 0 or not candidates:
+        return []
+    if max_breaks == 1:
+        return [max(candidates, key=lambda o: o['score'])]
+
+    spacing = timedelta(minutes=min_spacing_minutes)
+    ordered = sorted(
+        candidates,
+        key=lambda o: o['start_time'] + timedelta(minutes=o['duration_minutes']) + spacing
+    )
+    ends = [o['start_time'] + timedelta(minutes=o['duration_minutes']) + spacing for o in ordered]
+
+    # predecessor[i]: number of opportunities that finish (with spacing) before i starts
+    predecessor = [bisect_right(ends, o['start_time']) for o in ordered]
+
+    n = len(ordered)
+    k_max = min(max_breaks, n)
+
+    # best[k][i]: best total using at most k picks among the first i opportunities
+    best = [[0.0] * (n + 1) for _ in range(k_max + 1)]
+    for k in range(1, k_max + 1):
+        row, previous = best[k], best[k - 1]
+        for i in range(1, n + 1):
+            take = previous[predecessor[i - 1]] + ordered[i - 1]['score']
+            row[i] = take if take > row[i - 1] else row[i - 1]
+
+    # Walk back through the table to recover the picks
+    selected = []
+    k, i = k_max, n
+    while k > 0 and i > 0:
+        if best[k][i] == best[k][i - 1]:
+            i -= 1
+        else:
+            selected.append(ordered[i - 1])
+            i = predecessor[i - 1]
+            k -= 1
+
+    return sorted(selected, key=lambda o: o['score'], reverse=True)
@@ -0,0 +1,117 @@
+"""
+Break Service
+Records break sessions as users start and complete them.
+"""
+import logging
+from datetime import datetime
+from typing import Optional
+
+import pytz
+
+from app import db
+from app.models import User, BreakSession, BreakRecommendation, CompletedBreak
+from app.services.acceptance_service import AcceptanceService
+from app.services.dashboard_service import invalidate_dashboard
+from app.services.progress_service import ProgressService
+from app.services.streak_service import StreakService
+
+logger = logging.getLogger(__name__)
+
+
+class BreakService:
+    """
+    Service for the break lifecycle.
+    Completion folds the break into per-user aggregates in the same transaction.
+    """
+
+    def __init__(self):
+        self.streak_service = StreakService()
+        self.progress_service = ProgressService()
+        self.acceptance_service = AcceptanceService()
+
+    def start_break(self, user_id, session_id, recommendation_id=None) -> CompletedBreak:
+        """Create an in-progress break for a session"""
+        session = BreakSession.query.get(session_id)
+        if not session or not session.is_active:
+            raise ValueError(f"Break session {session_id} not found")
+
+        if recommendation_id and not BreakRecommendation.query.filter_by(
+            id=recommendation_id, user_id=user_id
+        ).first():
+            raise ValueError(f"Recommendation {recommendation_id} not found")
+
+        completed_break = CompletedBreak(
+            user_id=user_id,
+            session_id=session.id,
+            recommendation_id=recommendation_id,
+            started_at=datetime.now(pytz.UTC),
+        )
+        db.session.add(completed_break)
+        db.session.commit()
+        return completed_break
+
+    def complete_break(self, user_id, break_id, completion_percentage: int = 100,
+                       felt_better: Optional[bool] = None) -> CompletedBreak:
+        """Mark a started break as completed and update the user's streak and daily activity"""
+        completed_break = CompletedBreak.query.filter_by(id=break_id, user_id=user_id).first()
+        if not completed_break:
+            raise ValueError(f"Break {break_id} not found")
+
+        if completed_break.completed_at is not None:
+            return completed_break
+
+        now = datetime.now(pytz.UTC)
+        started_at = completed_break.started_at
+        if started_at.tzinfo is None:
+            started_at = pytz.utc.localize(started_at)
+
+        completed_break.completed_at = now
+        completed_break.duration_seconds = int((now - started_at).total_seconds())
+        completed_break.completion_percentage = max(0, min(completion_percentage, 100))
+        completed_break.felt_better = felt_better
+
+        recommendation = None
+        if completed_break.recommendation_id:
+            recommendation = BreakRecommendation.query.filter_by(
+                id=completed_break.recommendation_id, user_id=user_id
+            ).with_for_update().first()
+
+        self.record_completion(completed_break, recommendation)
+        if recommendation:
+            recommendation.status = 'completed'
+        db.session.commit()
+        invalidate_dashboard(user_id)
+        return completed_break
+
+    def record_completion(self, completed_break: CompletedBreak,
+                          recommendation: Optional[BreakRecommendation] = None) -> None:
+        """Apply O(1) aggregate updates for a newly completed break; the caller commits"""
+        # Two primary-key lookups in a single round trip
+        row = db.session.query(User.timezone, BreakSession.category).join(
+            BreakSession, BreakSession.id == completed_break.session_id
+        ).filter(User.id == completed_break.user_id).first()
+        timezone, category = row if row else ('UTC', None)
+        timezone = timezone or 'UTC'
+        tz = pytz.timezone(timezone)
+
+        completed_at = completed_break.completed_at
+        started_at = completed_break.started_at
+        if started_at.tzinfo is None:
+            started_at = pytz.utc.localize(started_at)
+
+        self.streak_service.record_break(completed_break.user_id, completed_at, timezone)
+        self.progress_service.record_break(
+            completed_break.user_id,
+            StreakService.local_date(completed_at, timezone),
+            started_at.astimezone(tz).hour,
+            category,
+            completed_break.duration_seconds
+        )
+
+        # Completing a recommendation counts as accepting it, unless it already was or
+        # the expiry sweeper already counted it as expired
+        if recommendation and recommendation.status not in ('accepted', 'expired'):
+            self.acceptance_service.record_outcome(
+                completed_break.user_id, True, recommendation.recommended_time,
+                recommendation.gap_type, category, timezone
+            )
@@ -7,7 +7,8 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional
 import pytz
 
-from app.models import CalendarEvent, User
+from app.models import CalendarEvent, User, UserAcceptanceStats
+from app.services.acceptance_service import acceptance_adjustment
 
 
 class CalendarAnalyzer:
@@ -199,10 +200,12 @@ class CalendarAnalyzer:
         return opportunities
     
     def calculate_opportunity_score(self, opportunity: Dict, user: User, 
-                                  recent_breaks: List[datetime]) -> float:
+                                  recent_breaks: List[datetime],
+                                  acceptance: Optional[UserAcceptanceStats] = None) -> float:
         """
         Calculate score for a break opportunity.
         Implementation of PRD algorithm Step 3 scoring logic.
+        Acceptance stats, when given, add the userHistoricalAcceptance term.
         """
         score = 1.0
         
@@ -256,6 +259,11 @@ class CalendarAnalyzer:
         elif 16 <= hour <= 17:  # Late afternoon recharge
             score += 1.5
         
+        # Historical acceptance at this hour of the week and gap type
+        score += acceptance_adjustment(
+            acceptance, opportunity['start_time'], opportunity.get('gap_type'), user.timezone
+        )
+        
         return score
     
     def get_meeting_context(self, meeting: Optional[CalendarEvent]) -> Dict:
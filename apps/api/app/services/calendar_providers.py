@@ -0,0 +1,657 @@
+"""
+Calendar Providers
+Provider-specific OAuth, HTTP and payload handling behind one interface, so
+CalendarService syncs Google and Microsoft 365 calendars the same way.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pytz
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.services.recurrence import expand
+from app.utils.outbound import BoundedExecutor, Deadline, UpstreamUnavailable
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Shorter events can't affect gap finding
+MIN_EVENT_MINUTES = 5
+
+# Neutral title and type stored for busy blocks in free/busy mode
+BUSY_TITLE = 'Busy'
+BUSY_MEETING_TYPE = 'busy'
+
+_executors: Dict[str, BoundedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _executor(provider: str) -> BoundedExecutor:
+    """Per-provider pool for calls made while serving a request"""
+    with _executors_lock:
+        if provider not in _executors:
+            config = get_config()
+            _executors[provider] = BoundedExecutor(
+                provider, config.CALENDAR_EXECUTOR_WORKERS, config.CALENDAR_EXECUTOR_QUEUE
+            )
+        return _executors[provider]
+
+
+def _retrying_session() -> requests.Session:
+    session = requests.Session()
+    retry_strategy = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504]
+    )
+    adapter = HTTPAdapter(max_retries=retry_strategy)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+@dataclass
+class ProviderEvent:
+    """A timed, non-cancelled event normalized across providers"""
+    external_id: str
+    title: str
+    start_time: datetime
+    end_time: datetime
+    attendee_count: int = 1
+    is_recurring: bool = False
+    ical_uid: Optional[str] = None  # Shared by copies of one meeting across calendars
+    meeting_type: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['start_time'] = self.start_time.isoformat()
+        data['end_time'] = self.end_time.isoformat()
+        return data
+
+
+@dataclass
+class ProviderSeries:
+    """A recurring meeting as its first instance plus RRULE/EXDATE/RDATE lines"""
+    external_id: str
+    title: str
+    start_time: datetime
+    end_time: datetime
+    timezone: str
+    recurrence: List[str]
+    attendee_count: int = 1
+    ical_uid: Optional[str] = None
+    excluded_starts: List[datetime] = field(default_factory=list)  # Cancelled or moved instances
+
+    @property
+    def duration_minutes(self) -> int:
+        return int((self.end_time - self.start_time).total_seconds() / 60)
+
+    def instances(self, start: datetime, end: datetime) -> List[ProviderEvent]:
+        occurrences = expand('\n'.join(self.recurrence), self.start_time, self.timezone,
+                             self.duration_minutes, self.excluded_starts, start, end)
+        return [
+            ProviderEvent(
+                external_id=f"{self.external_id}_{occurrence_start.astimezone(pytz.UTC).strftime('%Y%m%dT%H%M%SZ')}",
+                title=self.title, start_time=occurrence_start, end_time=occurrence_end,
+                attendee_count=self.attendee_count, is_recurring=True, ical_uid=self.ical_uid
+            )
+            for occurrence_start, occurrence_end in occurrences
+        ]
+
+
+@dataclass
+class EventPage:
+    """One provider response page, applied to the event store before the next is fetched"""
+    events: List[ProviderEvent]
+    removed_ids: List[str] = field(default_factory=list)
+    fetched: int = 0  # Raw items received, including skipped ones
+    incremental: bool = False  # Changes since the delta token rather than the whole window
+    delta_token: Optional[str] = None  # On the last page, when the provider supports delta sync
+    series: List[ProviderSeries] = field(default_factory=list)  # Stored once, expanded on read
+    # (series id, original start) of instances cancelled or moved to a one-off event
+    overrides: List[Tuple[str, datetime]] = field(default_factory=list)
+
+    def expanded_events(self, start: datetime, end: datetime) -> List[ProviderEvent]:
+        """One-off events plus series instances within the window"""
+        instances = [event for series in self.series for event in series.instances(start, end)]
+        return sorted(self.events + instances, key=lambda event: event.start_time)
+
+
+@dataclass
+class TokenGrant:
+    access_token: str
+    expires_at: datetime
+    refresh_token: Optional[str] = None  # Set when the provider rotates refresh tokens
+
+
+def merge_events(per_calendar: List[List[ProviderEvent]]) -> List[ProviderEvent]:
+    """
+    Merge events from several calendars, keeping one copy of each meeting.
+    Copies share an iCalUID; instances of a recurring meeting also share it, so
+    the start time is part of the key. Earlier calendars win.
+    """
+    merged = {}
+    for events in per_calendar:
+        for event in events:
+            key = (event.ical_uid or event.external_id, event.start_time)
+            merged.setdefault(key, event)
+    return sorted(merged.values(), key=lambda event: event.start_time)
+
+
+def merge_intervals(intervals: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """Union of possibly overlapping (start, end) intervals, in start order"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def busy_event(start_time: datetime, end_time: datetime,
+               external_id: Optional[str] = None) -> Optional[ProviderEvent]:
+    """A busy block with nothing from the event body but its times"""
+    event = build_event(
+        external_id or f'busy:{start_time.astimezone(pytz.UTC).isoformat()}',
+        BUSY_TITLE, start_time, end_time, attendee_count=1, is_recurring=False
+    )
+    if event:
+        event.meeting_type = BUSY_MEETING_TYPE
+    return event
+
+
+def merge_series(per_calendar: List[EventPage]) -> List[ProviderSeries]:
+    """Apply each calendar's overrides to its series, then keep one copy per iCalUID"""
+    merged = {}
+    for page in per_calendar:
+        excluded = {}
+        for series_id, original_start in page.overrides:
+            excluded.setdefault(series_id, []).append(original_start)
+        for series in page.series:
+            series.excluded_starts = series.excluded_starts + excluded.get(series.external_id, [])
+            merged.setdefault(series.ical_uid or series.external_id, series)
+    return list(merged.values())
+
+
+def build_event(external_id: str, title: Optional[str], start_time: datetime, end_time: datetime,
+                attendee_count: int, is_recurring: bool, ical_uid: Optional[str] = None) -> Optional[ProviderEvent]:
+    if (end_time - start_time).total_seconds() / 60 < MIN_EVENT_MINUTES:
+        return None
+    return ProviderEvent(
+        external_id=external_id,
+        title=title or 'Untitled Event',
+        start_time=start_time,
+        end_time=end_time,
+        attendee_count=max(attendee_count, 1),  # At least 1 (the user)
+        is_recurring=is_recurring,
+        ical_uid=ical_uid
+    )
+
+
+class CalendarProvider:
+    """
+    Base class for calendar providers.
+    Every call takes an optional Deadline: with one, the HTTP request runs on the
+    provider's bounded executor and raises UpstreamUnavailable when time runs out.
+    """
+    name = ''
+    supports_delta = False
+    supports_free_busy = False
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.config = get_config()
+        self.session = session or _retrying_session()
+
+    def request(self, method: str, url: str, deadline: Optional[Deadline] = None,
+                timeout: float = 10, **kwargs) -> requests.Response:
+        if deadline is None:
+            return self.session.request(method, url, timeout=timeout, **kwargs)
+
+        # The socket timeout lets the pool thread finish soon after the caller gives up
+        timeout = min(timeout, max(deadline.remaining(), 0.1))
+        try:
+            return _executor(self.name).call(
+                partial(self.session.request, method, url, timeout=timeout, **kwargs),
+                deadline=deadline
+            )
+        except requests.RequestException as e:
+            raise UpstreamUnavailable(f"{self.name} request failed: {e}") from e
+
+    def validate_token(self, access_token: str, deadline: Optional[Deadline] = None) -> str:
+        """Check a freshly granted token; returns the id of the user's default calendar"""
+        raise NotImplementedError
+
+    def token_is_valid(self, access_token: str, deadline: Optional[Deadline] = None) -> bool:
+        raise NotImplementedError
+
+    def refresh(self, refresh_token: str, deadline: Optional[Deadline] = None) -> TokenGrant:
+        raise NotImplementedError
+
+    def list_calendars(self, access_token: str, deadline: Optional[Deadline] = None) -> List[str]:
+        """Ids of the calendars to sync, the user's own calendar first"""
+        raise NotImplementedError
+
+    def fetch(self, access_token: str, calendar_id: Optional[str], start: datetime, end: datetime,
+              delta_token: Optional[str] = None, deadline: Optional[Deadline] = None) -> Iterator[EventPage]:
+        """Yield the window's events page by page, or only changes when given a delta token"""
+        raise NotImplementedError
+
+    def fetch_busy(self, access_token: str, calendar_ids: List[str], start: datetime, end: datetime,
+                   deadline: Optional[Deadline] = None) -> EventPage:
+        """Busy intervals across the calendars, merged into neutral busy blocks"""
+        raise NotImplementedError
+
+    def fetch_calendars(self, access_token: str, calendar_ids: List[str], start: datetime, end: datetime,
+                        deadline: Optional[Deadline] = None) -> EventPage:
+        """
+        Fetch the window from several calendars at once and merge them into one page.
+        Calendars are fetched concurrently, so this takes about as long as the slowest one.
+        A failing secondary calendar is skipped; the first calendar must succeed.
+        """
+        def fetch_one(calendar_id: str) -> List[EventPage]:
+            return list(self.fetch(access_token, calendar_id, start, end, deadline=deadline))
+
+        workers = max(min(len(calendar_ids), self.config.CALENDAR_FETCH_CONCURRENCY), 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'fetch-{self.name}') as pool:
+            futures = [pool.submit(fetch_one, calendar_id) for calendar_id in calendar_ids]
+
+        per_calendar = []
+        fetched = 0
+        for index, (calendar_id, future) in enumerate(zip(calendar_ids, futures)):
+            try:
+                pages = future.result()
+            except (ValueError, UpstreamUnavailable, requests.RequestException) as e:
+                if index == 0:
+                    raise
+                logger.warning(f"Skipping {self.name} calendar {calendar_id}: {e}")
+                continue
+            per_calendar.append(EventPage(
+                [event for page in pages for event in page.events],
+                series=[series for page in pages for series in page.series],
+                overrides=[override for page in pages for override in page.overrides]
+            ))
+            fetched += sum(page.fetched for page in pages)
+
+        return EventPage(
+            merge_events([page.events for page in per_calendar]),
+            fetched=fetched, series=merge_series(per_calendar)
+        )
+
+    def _grant(self, response: requests.Response) -> TokenGrant:
+        if response.status_code != 200:
+            raise ValueError(f"Token refresh failed: {response.status_code}")
+        token_data = response.json()
+        return TokenGrant(
+            access_token=token_data['access_token'],
+            expires_at=datetime.now(pytz.UTC) + timedelta(seconds=token_data.get('expires_in', 3600)),
+            refresh_token=token_data.get('refresh_token')
+        )
+
+
+class GoogleCalendarProvider(CalendarProvider):
+    """Google Calendar API v3"""
+    name = 'google'
+    supports_free_busy = True
+
+    # Only what gap finding reads
+    EVENT_FIELDS = ('items(id,iCalUID,summary,status,start,end,recurrence,recurringEventId,originalStartTime,'
+                    'attendees(responseStatus)),nextPageToken')
+    CALENDAR_FIELDS = 'items(id,primary,selected,hidden),nextPageToken'
+    FREE_BUSY_BATCH = 50  # Calendars per freeBusy request
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__(session)
+        self.base_url = self.config.GOOGLE_CALENDAR_URL
+
+    def _auth(self, access_token: str) -> Dict:
+        return {'Authorization': f'Bearer {access_token}'}
+
+    def validate_token(self, access_token: str, deadline: Optional[Deadline] = None) -> str:
+        response = self.request(
+            'GET', f'{self.base_url}/users/me/calendarList/primary',
+            deadline=deadline, headers=self._auth(access_token), timeout=10
+        )
+        if response.status_code != 200:
+            raise ValueError(f"Invalid access token: {response.status_code}")
+        return response.json().get('id', 'primary')
+
+    def token_is_valid(self, access_token: str, deadline: Optional[Deadline] = None) -> bool:
+        response = self.request(
+            'GET', f'{self.base_url}/users/me/settings/timezone',
+            deadline=deadline, headers=self._auth(access_token), timeout=5
+        )
+        if response.status_code == 200:
+            return True
+        if response.status_code == 401:
+            return False
+        raise ValueError("Unable to obtain valid access token")
+
+    def refresh(self, refresh_token: str, deadline: Optional[Deadline] = None) -> TokenGrant:
+        response = self.request(
+            'POST', 'https://oauth2.googleapis.com/token',
+            deadline=deadline,
+            data={
+                'client_id': self.config.GOOGLE_CLIENT_ID,
+                'client_secret': self.config.GOOGLE_CLIENT_SECRET,
+                'refresh_token': refresh_token,
+                'grant_type': 'refresh_token'
+            },
+            timeout=10
+        )
+        return self._grant(response)
+
+    def list_calendars(self, access_token: str, deadline: Optional[Deadline] = None) -> List[str]:
+        """The primary calendar first, then every other calendar the user shows in Google Calendar"""
+        params = {'fields': self.CALENDAR_FIELDS, 'minAccessRole': 'freeBusyReader'}
+        calendars = []
+        while True:
+            response = self.request(
+                'GET', f'{self.base_url}/users/me/calendarList',
+                deadline=deadline, headers=self._auth(access_token), params=params, timeout=10
+            )
+            if response.status_code != 200:
+                raise ValueError(f"Calendar list error: {response.status_code}")
+            body = response.json()
+            calendars.extend(body.get('items', []))
+            if not body.get('nextPageToken'):
+                break
+            params = {**params, 'pageToken': body['nextPageToken']}
+
+        primary = [c['id'] for c in calendars if c.get('primary')]
+        others = [c['id'] for c in calendars if not c.get('primary') and c.get('selected') and not c.get('hidden')]
+        return (primary or ['primary']) + others
+
+    def fetch(self, access_token: str, calendar_id: Optional[str], start: datetime, end: datetime,
+              delta_token: Optional[str] = None, deadline: Optional[Deadline] = None) -> Iterator[EventPage]:
+        calendar_id = calendar_id or 'primary'
+        params = {
+            'timeMin': start.isoformat(),
+            'timeMax': end.isoformat(),
+            # Series arrive once with their rules, plus their cancelled and moved instances
+            'singleEvents': False,
+            'maxResults': 250,
+            'fields': self.EVENT_FIELDS,
+        }
+        while True:
+            response = self.request(
+                'GET', f'{self.base_url}/calendars/{calendar_id}/events',
+                deadline=deadline, headers=self._auth(access_token), params=params, timeout=30
+            )
+            if response.status_code != 200:
+                raise ValueError(f"Calendar API error: {response.status_code}")
+
+            body = response.json()
+            items = body.get('items', [])
+            page = EventPage([], fetched=len(items))
+            for item in items:
+                self._add_item(page, item)
+            page_token = body.get('nextPageToken')
+            yield page
+
+            if not page_token:
+                return
+            params = {**params, 'pageToken': page_token}
+
+    def fetch_busy(self, access_token: str, calendar_ids: List[str], start: datetime, end: datetime,
+                   deadline: Optional[Deadline] = None) -> EventPage:
+        intervals = []
+        for offset in range(0, len(calendar_ids), self.FREE_BUSY_BATCH):
+            batch = calendar_ids[offset:offset + self.FREE_BUSY_BATCH]
+            response = self.request(
+                'POST', f'{self.base_url}/freeBusy',
+                deadline=deadline, headers=self._auth(access_token), timeout=10,
+                json={
+                    'timeMin': start.isoformat(),
+                    'timeMax': end.isoformat(),
+                    'items': [{'id': calendar_id} for calendar_id in batch],
+                }
+            )
+            if response.status_code != 200:
+                raise ValueError(f"FreeBusy API error: {response.status_code}")
+
+            for calendar_id, calendar in response.json().get('calendars', {}).items():
+                if calendar.get('errors'):
+                    logger.warning(f"Skipping google calendar {calendar_id}: {calendar['errors']}")
+                    continue
+                intervals.extend(
+                    (self._parse_time(busy['start']), self._parse_time(busy['end']))
+                    for busy in calendar.get('busy', [])
+                )
+
+        events = [busy_event(start_time, end_time) for start_time, end_time in merge_intervals(intervals)]
+        return EventPage([event for event in events if event], fetched=len(intervals))
+
+    def _add_item(self, page: EventPage, item: Dict) -> None:
+        if item.get('recurrence'):
+            series = self.parse_series(item)
+            if series:
+                page.series.append(series)
+            return
+
+        original_start = item.get('originalStartTime', {}).get('dateTime')
+        if item.get('recurringEventId') and original_start:
+            page.overrides.append((item['recurringEventId'], self._parse_time(original_start)))
+
+        event = self.parse_event(item)
+        if event:
+            page.events.append(event)
+
+    @staticmethod
+    def parse_series(item: Dict) -> Optional[ProviderSeries]:
+        try:
+            start_data = item.get('start', {})
+            if 'dateTime' not in start_data or item.get('status') == 'cancelled':
+                return None
+
+            start_time = GoogleCalendarProvider._parse_time(start_data['dateTime'])
+            end_time = GoogleCalendarProvider._parse_time(item['end']['dateTime'])
+            if (end_time - start_time).total_seconds() / 60 < MIN_EVENT_MINUTES:
+                return None
+
+            attendees = item.get('attendees', [])
+            return ProviderSeries(
+                external_id=item['id'],
+                title=item.get('summary') or 'Untitled Event',
+                start_time=start_time,
+                end_time=end_time,
+                timezone=start_data.get('timeZone') or 'UTC',
+                recurrence=item['recurrence'],
+                attendee_count=max(len([a for a in attendees if a.get('responseStatus') != 'declined']), 1),
+                ical_uid=item.get('iCalUID')
+            )
+        except Exception as e:
+            logger.warning(f"Failed to parse Google series {item.get('id', 'unknown')}: {e}")
+            return None
+
+    @staticmethod
+    def _parse_time(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+    @staticmethod
+    def parse_event(item: Dict) -> Optional[ProviderEvent]:
+        try:
+            start_data = item.get('start', {})
+            end_data = item.get('end', {})
+            # All-day events don't block time for break recommendations
+            if 'dateTime' not in start_data or item.get('status') == 'cancelled':
+                return None
+
+            attendees = item.get('attendees', [])
+            return build_event(
+                external_id=item.get('id'),
+                title=item.get('summary'),
+                start_time=GoogleCalendarProvider._parse_time(start_data['dateTime']),
+                end_time=GoogleCalendarProvider._parse_time(end_data['dateTime']),
+                attendee_count=len([a for a in attendees if a.get('responseStatus') != 'declined']),
+                is_recurring=bool(item.get('recurringEventId')),
+                ical_uid=item.get('iCalUID')
+            )
+        except Exception as e:
+            logger.warning(f"Failed to parse Google event {item.get('id', 'unknown')}: {e}")
+            return None
+
+
+class MicrosoftGraphProvider(CalendarProvider):
+    """
+    Microsoft Graph calendars.
+    Syncs through calendarView/delta: the first fetch returns the window and a
+    deltaLink, later fetches from that link return only changed and removed events.
+    Only the default calendar is synced, since a delta token covers one calendar.
+    """
+    name = 'microsoft'
+    supports_delta = True
+
+    SELECT_FIELDS = 'id,iCalUId,subject,start,end,isAllDay,isCancelled,type,seriesMasterId,attendees'
+    PAGE_SIZE = 100
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__(session)
+        self.base_url = self.config.MICROSOFT_GRAPH_URL
+        self.token_url = self.config.MICROSOFT_TOKEN_URL
+
+    def _headers(self, access_token: str) -> Dict:
+        return {
+            'Authorization': f'Bearer {access_token}',
+            # UTC times avoid mapping Windows time zone names
+            'Prefer': f'odata.maxpagesize={self.PAGE_SIZE}, outlook.timezone="UTC"',
+        }
+
+    def _default_calendar(self, access_token: str, deadline: Optional[Deadline], timeout: float):
+        return self.request(
+            'GET', f'{self.base_url}/me/calendar', deadline=deadline,
+            headers=self._headers(access_token), params={'$select': 'id'}, timeout=timeout
+        )
+
+    def validate_token(self, access_token: str, deadline: Optional[Deadline] = None) -> str:
+        response = self._default_calendar(access_token, deadline, timeout=10)
+        if response.status_code != 200:
+            raise ValueError(f"Invalid access token: {response.status_code}")
+        return response.json().get('id')
+
+    def token_is_valid(self, access_token: str, deadline: Optional[Deadline] = None) -> bool:
+        response = self._default_calendar(access_token, deadline, timeout=5)
+        if response.status_code == 200:
+            return True
+        if response.status_code == 401:
+            return False
+        raise ValueError("Unable to obtain valid access token")
+
+    def refresh(self, refresh_token: str, deadline: Optional[Deadline] = None) -> TokenGrant:
+        response = self.request(
+            'POST', self.token_url,
+            deadline=deadline,
+            data={
+                'client_id': self.config.MICROSOFT_CLIENT_ID,
+                'client_secret': self.config.MICROSOFT_CLIENT_SECRET,
+                'refresh_token': refresh_token,
+                'grant_type': 'refresh_token',
+                'scope': 'offline_access Calendars.Read'
+            },
+            timeout=10
+        )
+        return self._grant(response)
+
+    def fetch(self, access_token: str, calendar_id: Optional[str], start: datetime, end: datetime,
+              delta_token: Optional[str] = None, deadline: Optional[Deadline] = None) -> Iterator[EventPage]:
+        # calendarView/delta covers the default calendar
+        incremental = delta_token is not None
+        if incremental:
+            url, params = delta_token, None
+        else:
+            url = f'{self.base_url}/me/calendarView/delta'
+            params = {
+                'startDateTime': start.astimezone(pytz.UTC).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'endDateTime': end.astimezone(pytz.UTC).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                '$select': self.SELECT_FIELDS,
+            }
+
+        first_page = True
+        while True:
+            response = self.request(
+                'GET', url, deadline=deadline, headers=self._headers(access_token), params=params, timeout=30
+            )
+            if response.status_code == 410 and incremental and first_page:
+                # The delta token expired; start over with the full window
+                logger.info("Graph delta token expired, resyncing the full window")
+                yield from self.fetch(access_token, calendar_id, start, end, None, deadline)
+                return
+            if response.status_code != 200:
+                raise ValueError(f"Graph API error: {response.status_code}")
+
+            body = response.json()
+            items = body.get('value', [])
+            events, removed = [], []
+            for item in items:
+                if '@removed' in item or item.get('isCancelled'):
+                    removed.append(item['id'])
+                    continue
+                event = self.parse_event(item)
+                if event:
+                    events.append(event)
+                elif incremental:
+                    # An event that became all-day or too short must leave the store
+                    removed.append(item['id'])
+
+            # Follow-up links carry the original query, including $select
+            next_link = body.get('@odata.nextLink')
+            yield EventPage(
+                events, removed, fetched=len(items), incremental=incremental,
+                delta_token=None if next_link else body.get('@odata.deltaLink')
+            )
+            if not next_link:
+                return
+            url, params, first_page = next_link, None, False
+
+    @staticmethod
+    def _parse_time(value: Dict) -> datetime:
+        parsed = datetime.fromisoformat(value['dateTime'].replace('Z', ''))
+        if parsed.tzinfo is not None:
+            return parsed
+        try:
+            return pytz.timezone(value.get('timeZone') or 'UTC').localize(parsed)
+        except pytz.UnknownTimeZoneError:
+            return pytz.UTC.localize(parsed)
+
+    @classmethod
+    def parse_event(cls, item: Dict) -> Optional[ProviderEvent]:
+        try:
+            if item.get('isAllDay') or 'start' not in item:
+                return None
+
+            attendees = item.get('attendees') or []
+            return build_event(
+                external_id=item['id'],
+                title=item.get('subject'),
+                start_time=cls._parse_time(item['start']),
+                end_time=cls._parse_time(item['end']),
+                attendee_count=len([
+                    a for a in attendees if (a.get('status') or {}).get('response') != 'declined'
+                ]),
+                is_recurring=item.get('type') in ('occurrence', 'exception') or bool(item.get('seriesMasterId')),
+                ical_uid=item.get('iCalUId')
+            )
+        except Exception as e:
+            logger.warning(f"Failed to parse Graph event {item.get('id', 'unknown')}: {e}")
+            return None
+
+
+PROVIDERS = {
+    GoogleCalendarProvider.name: GoogleCalendarProvider,
+    MicrosoftGraphProvider.name: MicrosoftGraphProvider,
+}
+
+
+def get_provider(name: Optional[str]) -> CalendarProvider:
+    """Provider for a connection; raises ValueError for unsupported providers"""
+    provider_class = PROVIDERS.get(name or 'google')
+    if provider_class is None:
+        raise ValueError(f"Unsupported calendar provider: {name}")
+    return provider_class()
@@ -1,17 +1,22 @@
 """
-Google Calendar Integration Service
-Handles OAuth, calendar sync, and event fetching from Google Calendar API.
+Calendar Integration Service
+Handles OAuth connections, calendar sync and event fetching through the
+user's calendar provider (Google or Microsoft 365).
 """
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 import pytz
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
 from app import db
-from app.models import User, CalendarEvent, CalendarConnection
+from app.models import CalendarEvent, CalendarConnection, RecurringSeries
+from app.services.calendar_providers import (
+    CalendarProvider, EventPage, ProviderEvent, ProviderSeries, busy_event, get_provider
+)
+from app.services.user_context import get_user_context, invalidate_user_context
+from app.tasks import telemetry
+from app.utils.outbound import Deadline
+from app.utils.timing import span
 from config import get_config
 
 logger = logging.getLogger(__name__)
@@ -19,63 +24,50 @@ logger = logging.getLogger(__name__)
 
 class CalendarService:
     """
-    Manages Google Calendar API integration and calendar data synchronization.
+    Manages calendar connections and calendar data synchronization.
+    Provider specifics live in app.services.calendar_providers.
     """
     
     def __init__(self):
         self.config = get_config()
-        self.base_url = 'https://www.googleapis.com/calendar/v3'
-        
-        # Configure retry strategy for API calls
-        self.session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("https://", adapter)
     
     def connect_calendar(self, user_id: int, access_token: str, 
-                        refresh_token: str) -> CalendarConnection:
+                        refresh_token: str, deadline: Optional[Deadline] = None,
+                        provider: str = 'google') -> CalendarConnection:
         """
         Create or update calendar connection for a user.
         Stores OAuth tokens for future calendar access.
         """
         try:
             # Validate token by making a test API call
-            headers = {'Authorization': f'Bearer {access_token}'}
-            response = self.session.get(
-                f'{self.base_url}/users/me/calendarList/primary',
-                headers=headers,
-                timeout=10
-            )
-            
-            if response.status_code != 200:
-                raise ValueError(f"Invalid access token: {response.status_code}")
-            
-            calendar_info = response.json()
+            calendar_id = get_provider(provider).validate_token(access_token, deadline)
             
             # Create or update calendar connection
             connection = CalendarConnection.query.filter_by(user_id=user_id).first()
             
             if connection:
+                connection.provider = provider
                 connection.access_token = access_token
                 connection.refresh_token = refresh_token
-                connection.calendar_id = calendar_info.get('id', 'primary')
+                connection.calendar_id = calendar_id
                 connection.last_sync_at = None  # Reset sync status
+                connection.delta_token = None
+                connection.delta_window_end = None
             else:
                 connection = CalendarConnection(
                     user_id=user_id,
-                    provider='google',
+                    provider=provider,
                     access_token=access_token,
                     refresh_token=refresh_token,
-                    calendar_id=calendar_info.get('id', 'primary')
+                    calendar_id=calendar_id
                 )
                 db.session.add(connection)
+            # Unknown for tokens granted to the client; checked before use
+            connection.token_expires_at = datetime.now(pytz.UTC) + timedelta(hours=1)
             
             db.session.commit()
-            logger.info(f"Calendar connected successfully for user {user_id}")
+            invalidate_user_context(user_id)
+            logger.info(f"Calendar connected successfully for user {user_id} ({provider})")
             return connection
             
         except Exception as e:
@@ -83,104 +75,64 @@ class CalendarService:
             db.session.rollback()
             raise
     
-    def refresh_access_token(self, connection: CalendarConnection) -> str:
+    def refresh_access_token(self, connection: CalendarConnection, deadline: Optional[Deadline] = None) -> str:
         """
         Refresh the access token using the refresh token.
         """
         try:
-            data = {
-                'client_id': self.config.GOOGLE_CLIENT_ID,
-                'client_secret': self.config.GOOGLE_CLIENT_SECRET,
-                'refresh_token': connection.refresh_token,
-                'grant_type': 'refresh_token'
-            }
-            
-            response = self.session.post(
-                'https://oauth2.googleapis.com/token',
-                data=data,
-                timeout=10
-            )
-            
-            if response.status_code != 200:
-                raise ValueError(f"Token refresh failed: {response.status_code}")
-            
-            token_data = response.json()
-            new_access_token = token_data['access_token']
+            grant = get_provider(connection.provider).refresh(connection.refresh_token, deadline)
             
             # Update stored token
-            connection.access_token = new_access_token
+            connection.access_token = grant.access_token
+            connection.token_expires_at = grant.expires_at
+            if grant.refresh_token:
+                connection.refresh_token = grant.refresh_token
             db.session.commit()
             
             logger.info(f"Access token refreshed for user {connection.user_id}")
-            return new_access_token
+            return grant.access_token
             
         except Exception as e:
             logger.error(f"Failed to refresh token for user {connection.user_id}: {e}")
             raise
     
-    def get_valid_access_token(self, connection: CalendarConnection) -> str:
+    def get_valid_access_token(self, connection: CalendarConnection, deadline: Optional[Deadline] = None) -> str:
         """
         Get a valid access token, refreshing if necessary.
         """
         # Try the current token first
-        headers = {'Authorization': f'Bearer {connection.access_token}'}
-        response = self.session.get(
-            f'{self.base_url}/users/me/settings/timezone',
-            headers=headers,
-            timeout=5
-        )
-        
-        if response.status_code == 200:
+        if get_provider(connection.provider).token_is_valid(connection.access_token, deadline):
             return connection.access_token
         
         # Token is invalid, try to refresh
-        if response.status_code == 401 and connection.refresh_token:
-            return self.refresh_access_token(connection)
+        if connection.refresh_token:
+            return self.refresh_access_token(connection, deadline)
         
         raise ValueError("Unable to obtain valid access token")
     
-    def fetch_calendar_events(self, user_id: int, days_ahead: int = 7) -> List[Dict]:
+    def fetch_calendar_events(self, user_id: int, days_ahead: int = 7,
+                              deadline: Optional[Deadline] = None) -> List[Dict]:
         """
-        Fetch calendar events for the next N days from Google Calendar.
+        Fetch calendar events for the next N days from all of the user's calendars.
+        Always reads the full window; pass a deadline when serving a request.
         """
         try:
-            connection = CalendarConnection.query.filter_by(user_id=user_id).first()
+            context = get_user_context(user_id)
+            connection = context.connection
             if not connection:
                 raise ValueError(f"No calendar connection found for user {user_id}")
             
-            access_token = self.get_valid_access_token(connection)
+            access_token = self.get_valid_access_token(connection, deadline)
             
             # Calculate time range
-            user = User.query.get(user_id)
-            user_tz = pytz.timezone(user.timezone)
-            now = datetime.now(user_tz)
-            time_min = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            time_min = context.today_start()
             time_max = time_min + timedelta(days=days_ahead)
             
-            # API parameters
-            params = {
-                'calendarId': connection.calendar_id or 'primary',
-                'timeMin': time_min.isoformat(),
-                'timeMax': time_max.isoformat(),
-                'singleEvents': True,
-                'orderBy': 'startTime',
-                'maxResults': 500  # Google's max limit
-            }
-            
-            headers = {'Authorization': f'Bearer {access_token}'}
-            
-            response = self.session.get(
-                f'{self.base_url}/calendars/{params["calendarId"]}/events',
-                headers=headers,
-                params=params,
-                timeout=30
+            pages = self._pages(
+                get_provider(connection.provider), connection, access_token, time_min, time_max,
+                deadline=deadline, busy_only=self.uses_free_busy(context.user)
             )
-            
-            if response.status_code != 200:
-                raise ValueError(f"Calendar API error: {response.status_code}")
-            
-            events_data = response.json()
-            events = events_data.get('items', [])
+            events = [event.to_dict() for page in pages for event in page.expanded_events(time_min, time_max)]
             
             logger.info(f"Fetched {len(events)} events for user {user_id}")
             return events
@@ -191,44 +143,66 @@ class CalendarService:
     
     def sync_calendar_events(self, user_id: int, days_ahead: int = 7) -> int:
         """
-        Sync calendar events from Google Calendar to local database.
-        Returns number of events synced.
+        Sync calendar events from the provider to the local database.
+        Providers with delta support transfer only changes after the first sync;
+        recurring series from Google are stored once and expanded on read.
+        Returns number of events and series written.
         """
         try:
-            # Fetch events from Google Calendar
-            google_events = self.fetch_calendar_events(user_id, days_ahead)
+            context = get_user_context(user_id)
+            connection = context.connection
+            if not connection:
+                raise ValueError(f"No calendar connection found for user {user_id}")
             
-            # Parse and store events
-            synced_count = 0
-            user = User.query.get(user_id)
-            user_tz = pytz.timezone(user.timezone)
+            provider = get_provider(connection.provider)
+            access_token = self.get_valid_access_token(connection)
             
-            # Clear existing events for the sync period
-            sync_start = datetime.now(user_tz).replace(hour=0, minute=0, second=0, microsecond=0)
+            # Sync period
+            sync_start = context.today_start()
             sync_end = sync_start + timedelta(days=days_ahead)
             
-            CalendarEvent.query.filter(
-                CalendarEvent.user_id == user_id,
-                CalendarEvent.start_time >= sync_start,
-                CalendarEvent.start_time < sync_end
-            ).delete()
+            delta_token = self._usable_delta_token(provider, connection, sync_end)
+            if provider.supports_delta and delta_token is None:
+                # A wider window keeps the delta token usable for the following days
+                sync_end += timedelta(days=self.config.CALENDAR_DELTA_WINDOW_SLACK_DAYS)
             
-            for event_data in google_events:
-                try:
-                    event = self._parse_google_event(event_data, user_id, user_tz)
-                    if event:
-                        db.session.add(event)
-                        synced_count += 1
-                except Exception as e:
-                    logger.warning(f"Failed to parse event {event_data.get('id', 'unknown')}: {e}")
-                    continue
+            first_page = True
+            fetched = 0
+            synced_count = 0
+            pages = self._pages(
+                provider, connection, access_token, sync_start, sync_end, delta_token,
+                busy_only=self.uses_free_busy(context.user)
+            )
+            while True:
+                with span('fetch'):
+                    page = next(pages, None)
+                if page is None:
+                    break
+                
+                with span('db_write'):
+                    if first_page and not page.incremental:
+                        # Full fetch: replace everything stored for the window, and every series
+                        CalendarEvent.query.filter(
+                            CalendarEvent.user_id == user_id,
+                            CalendarEvent.start_time >= sync_start,
+                            CalendarEvent.start_time < sync_end
+                        ).delete()
+                        RecurringSeries.query.filter_by(user_id=user_id).delete()
+                    synced_count += self._apply_page(user_id, context.tz, page)
+                fetched += page.fetched
+                first_page = False
+                
+                if page.delta_token:
+                    connection.delta_token = page.delta_token
+                    if not page.incremental:
+                        connection.delta_window_end = sync_end
             
-            # Update sync timestamp
-            connection = CalendarConnection.query.filter_by(user_id=user_id).first()
-            if connection:
+            with span('db_write'):
+                # Update sync timestamp
                 connection.last_sync_at = datetime.utcnow()
+                db.session.commit()
             
-            db.session.commit()
+            telemetry.annotate(events_fetched=fetched, events_processed=synced_count)
             logger.info(f"Synced {synced_count} events for user {user_id}")
             return synced_count
             
@@ -237,63 +211,94 @@ class CalendarService:
             db.session.rollback()
             raise
     
-    def _parse_google_event(self, event_data: Dict, user_id: int, 
-                           user_tz: pytz.timezone) -> Optional[CalendarEvent]:
+    def uses_free_busy(self, user) -> bool:
+        """Whether the user's company opted into storing busy intervals only"""
+        return bool(user.company_domain) and user.company_domain.lower() in self.config.CALENDAR_FREE_BUSY_DOMAINS
+    
+    @staticmethod
+    def _pages(provider: CalendarProvider, connection: CalendarConnection, access_token: str,
+               start: datetime, end: datetime, delta_token: Optional[str] = None,
+               deadline: Optional[Deadline] = None, busy_only: bool = False) -> Iterator[EventPage]:
         """
-        Parse a Google Calendar event into our CalendarEvent model.
+        Delta providers stream the connected calendar page by page; others fetch
+        every selected calendar concurrently and yield the merged result as one page.
+        With busy_only, events are reduced to neutral busy blocks, read from the
+        provider's free/busy endpoint when it has one.
         """
-        try:
-            # Skip events without start/end times (all-day events handled separately)
-            start_data = event_data.get('start', {})
-            end_data = event_data.get('end', {})
-            
-            # Handle different time formats
-            if 'dateTime' in start_data:
-                start_time = datetime.fromisoformat(start_data['dateTime'].replace('Z', '+00:00'))
-                end_time = datetime.fromisoformat(end_data['dateTime'].replace('Z', '+00:00'))
-                
-                # Convert to user's timezone
-                start_time = start_time.astimezone(user_tz)
-                end_time = end_time.astimezone(user_tz)
-                
-            elif 'date' in start_data:
-                # All-day event - skip for break recommendations
-                return None
-            else:
-                return None
-            
-            # Extract attendee count
-            attendees = event_data.get('attendees', [])
-            attendee_count = len([a for a in attendees if a.get('responseStatus') != 'declined'])
-            
-            # Skip declined events
-            if event_data.get('status') == 'cancelled':
-                return None
-            
-            # Skip very short events (< 5 minutes)
-            duration = (end_time - start_time).total_seconds() / 60
-            if duration < 5:
-                return None
-            
-            return CalendarEvent(
-                user_id=user_id,
-                external_id=event_data.get('id'),
-                title=event_data.get('summary', 'Untitled Event'),
-                start_time=start_time,
-                end_time=end_time,
-                attendee_count=max(attendee_count, 1),  # At least 1 (the user)
-                is_recurring=bool(event_data.get('recurringEventId'))
-            )
-            
-        except Exception as e:
-            logger.warning(f"Failed to parse event: {e}")
+        if busy_only and provider.supports_free_busy:
+            calendar_ids = provider.list_calendars(access_token, deadline)
+            yield provider.fetch_busy(access_token, calendar_ids, start, end, deadline)
+            return
+        
+        if provider.supports_delta:
+            pages = provider.fetch(access_token, connection.calendar_id, start, end, delta_token, deadline)
+        else:
+            calendar_ids = provider.list_calendars(access_token, deadline)
+            pages = iter([provider.fetch_calendars(access_token, calendar_ids, start, end, deadline)])
+        
+        for page in pages:
+            if busy_only:
+                # Keep provider ids so delta changes still apply
+                page.events = [busy_event(event.start_time, event.end_time, event.external_id) for event in page.events]
+            yield page
+    
+    @staticmethod
+    def _usable_delta_token(provider: CalendarProvider, connection: CalendarConnection,
+                            sync_end: datetime) -> Optional[str]:
+        """The stored delta token, if its window still covers the sync period"""
+        if not provider.supports_delta or not connection.delta_token or not connection.delta_window_end:
             return None
+        window_end = connection.delta_window_end
+        if window_end.tzinfo is None:
+            window_end = pytz.utc.localize(window_end)
+        return connection.delta_token if window_end >= sync_end else None
+    
+    def _apply_page(self, user_id, user_tz: pytz.BaseTzInfo, page) -> int:
+        """Write one page of events; incremental pages replace rows by external id"""
+        if page.incremental:
+            stale_ids = page.removed_ids + [event.external_id for event in page.events]
+            if stale_ids:
+                CalendarEvent.query.filter(
+                    CalendarEvent.user_id == user_id,
+                    CalendarEvent.external_id.in_(stale_ids)
+                ).delete(synchronize_session=False)
+        
+        db.session.add_all(self._to_row(event, user_id, user_tz) for event in page.events)
+        db.session.add_all(self._series_row(series, user_id) for series in page.series)
+        return len(page.events) + len(page.series)
+    
+    @staticmethod
+    def _to_row(event: ProviderEvent, user_id, user_tz: pytz.BaseTzInfo) -> CalendarEvent:
+        return CalendarEvent(
+            user_id=user_id,
+            external_id=event.external_id,
+            title=event.title[:500],
+            start_time=event.start_time.astimezone(user_tz),
+            end_time=event.end_time.astimezone(user_tz),
+            attendee_count=event.attendee_count,
+            is_recurring=event.is_recurring,
+            meeting_type=event.meeting_type
+        )
+    
+    @staticmethod
+    def _series_row(series: ProviderSeries, user_id) -> RecurringSeries:
+        return RecurringSeries(
+            user_id=user_id,
+            external_id=series.external_id,
+            title=series.title[:500],
+            start_time=series.start_time.astimezone(pytz.UTC),
+            duration_minutes=series.duration_minutes,
+            timezone=series.timezone,
+            recurrence='\n'.join(series.recurrence),
+            excluded_starts=[start.isoformat() for start in series.excluded_starts],
+            attendee_count=series.attendee_count
+        )
     
     def is_sync_needed(self, user_id: int, max_age_hours: int = 1) -> bool:
         """
         Check if calendar sync is needed based on last sync time.
         """
-        connection = CalendarConnection.query.filter_by(user_id=user_id).first()
+        connection = get_user_context(user_id).connection
         if not connection or not connection.last_sync_at:
             return True
         
@@ -312,8 +317,10 @@ class CalendarService:
             
             # Remove stored events
             CalendarEvent.query.filter_by(user_id=user_id).delete()
+            RecurringSeries.query.filter_by(user_id=user_id).delete()
             
             db.session.commit()
+            invalidate_user_context(user_id)
             logger.info(f"Calendar disconnected for user {user_id}")
             
         except Exception as e:
@@ -0,0 +1,121 @@
+"""
+Break Session Catalog
+Serves the session library from a versioned in-process snapshot.
+The database is read at most once per refresh interval per process.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.models import BreakSession
+from app.utils.http_cache import EncodedBody, encode_body
+from app.utils.metrics import registry
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Distinct filter combinations kept encoded per snapshot
+MAX_CACHED_QUERIES = 64
+
+CATALOG_REFRESHES = registry.counter(
+    'catalog_snapshot_refreshes_total', 'Catalog reloads from the database, by whether content changed', ['changed']
+)
+
+
+class CatalogSnapshot:
+    """
+    Immutable view of the active sessions at one catalog version.
+    The full list, each category and each session are encoded up front;
+    other filter combinations are encoded on first use.
+    """
+
+    def __init__(self, sessions: Tuple[Dict, ...]):
+        self.sessions = sessions
+        self.full = encode_body({'sessions': list(sessions)})
+        self.version = self.full.etag.strip('"')
+        self.by_id: Dict[str, EncodedBody] = {s['id']: encode_body(s) for s in sessions}
+        self._sessions_by_id = {s['id']: s for s in sessions}
+        self._queries: 'OrderedDict[Tuple, EncodedBody]' = OrderedDict()
+        self._lock = threading.Lock()
+        for category in {s['category'] for s in sessions}:
+            self.query(category=category)
+
+    def get(self, session_id) -> Optional[Dict]:
+        """A session's fields, or None when it isn't active"""
+        return self._sessions_by_id.get(str(session_id))
+
+    def query(self, category: Optional[str] = None, min_duration: Optional[int] = None,
+              max_duration: Optional[int] = None) -> EncodedBody:
+        """Encoded session list matching the filters"""
+        if category is None and min_duration is None and max_duration is None:
+            return self.full
+
+        key = (category, min_duration, max_duration)
+        with self._lock:
+            body = self._queries.get(key)
+            if body is not None:
+                self._queries.move_to_end(key)
+                return body
+
+        matches = [
+            s for s in self.sessions
+            if (category is None or s['category'] == category)
+            and (min_duration is None or s['duration_minutes'] >= min_duration)
+            and (max_duration is None or s['duration_minutes'] <= max_duration)
+        ]
+        body = encode_body({'sessions': matches})
+
+        with self._lock:
+            self._queries[key] = body
+            if len(self._queries) > MAX_CACHED_QUERIES:
+                self._queries.popitem(last=False)
+        return body
+
+
+class CatalogService:
+    """Holds the current snapshot and reloads it after refresh_seconds"""
+
+    def __init__(self, refresh_seconds: float = 300):
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_snapshot(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while we waited
+            if self._snapshot is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return self._snapshot
+            self._snapshot = self._reload(self._snapshot)
+            self._loaded_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """Reload on next access, e.g. after editing the library"""
+        self._loaded_at = float('-inf')
+
+    @staticmethod
+    def _reload(current: Optional[CatalogSnapshot]) -> CatalogSnapshot:
+        sessions = tuple(
+            s.to_dict() for s in BreakSession.query.filter(
+                BreakSession.is_active.is_(True)
+            ).order_by(BreakSession.category, BreakSession.duration_minutes, BreakSession.title).all()
+        )
+        # Unchanged content keeps the snapshot and its encoded bodies
+        if current is not None and current.sessions == sessions:
+            CATALOG_REFRESHES.inc(changed='false')
+            return current
+
+        CATALOG_REFRESHES.inc(changed='true')
+        snapshot = CatalogSnapshot(sessions)
+        logger.info(f"Loaded catalog version {snapshot.version} with {len(sessions)} sessions")
+        return snapshot
+
+
+catalog_service = CatalogService(get_config().CATALOG_REFRESH_SECONDS)
@@ -0,0 +1,168 @@
+"""
+Dashboard Service
+Assembles the home screen in one request from the user context, the progress
+rollup and today's recommendation, caching each section for its own lifetime.
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import pytz
+from redis.exceptions import RedisError
+
+from app.services.catalog_service import catalog_service
+from app.services.progress_service import ProgressService
+from app.services.user_context import get_user_context
+from app.utils.metrics import registry
+from app.utils.redis_client import get_redis
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'dashboard:'
+PROGRESS = 'progress'
+RECOMMENDATION = 'recommendation'
+SECTIONS = (PROGRESS, RECOMMENDATION)
+
+DASHBOARD_CACHE = registry.counter(
+    'dashboard_section_cache_total', 'Dashboard section cache lookups, by section and result', ('section', 'result')
+)
+
+
+def _key(user_id, section: str) -> str:
+    return f'{KEY_PREFIX}{user_id}:{section}'
+
+
+def invalidate_dashboard(user_id, *sections: str) -> None:
+    """Drop cached sections after a write that changes them; call after committing"""
+    try:
+        get_redis().delete(*(_key(user_id, section) for section in sections or SECTIONS))
+    except RedisError as e:
+        # The section TTL bounds staleness if the delete is lost
+        logger.warning(f"Failed to invalidate dashboard cache for user {user_id}: {e}")
+
+
+def greeting(name: Optional[str], local_now: datetime) -> str:
+    if local_now.hour < 12:
+        salutation = 'Good morning'
+    elif local_now.hour < 17:
+        salutation = 'Good afternoon'
+    else:
+        salutation = 'Good evening'
+    first_name = (name or '').split(' ')[0]
+    return f'{salutation}, {first_name}' if first_name else salutation
+
+
+class DashboardService:
+    """
+    Sections that are cheap to build come straight from the memoized user
+    context; progress and the recommendation are cached in Redis per user.
+    A cold dashboard costs the same queries as the individual endpoints combined,
+    a warm one a single query and one Redis round trip.
+    """
+
+    def __init__(self):
+        # Recommendation generation invalidates the dashboard, so import late
+        from app.services.recommendation_service import RecommendationService
+
+        self.config = get_config()
+        self.progress_service = ProgressService()
+        self.recommendation_service = RecommendationService()
+
+    def get_dashboard(self, user_id) -> Dict:
+        """Raises ValueError when the user doesn't exist"""
+        context = get_user_context(user_id)
+        user, connection = context.user, context.connection
+        local_now = context.now()
+
+        sections = self._cached_sections(context.user_id, {
+            PROGRESS: self._build_progress,
+            RECOMMENDATION: self._build_recommendation,
+        })
+        progress = sections[PROGRESS]
+
+        return {
+            'greeting': greeting(user.full_name, local_now),
+            'current_date': local_now.date().isoformat(),
+            'user': user.to_dict(),
+            'calendar': {
+                'connected': connection is not None,
+                'provider': connection.provider if connection else None,
+                'last_sync': connection.last_sync_at.isoformat() if connection and connection.last_sync_at else None,
+            },
+            'streak': progress['streak'],
+            'stats': progress['stats'],
+            'recent_breaks': progress['recent_breaks'],
+            'recommendation': sections[RECOMMENDATION],
+        }
+
+    def _cached_sections(self, user_id, builders: Dict[str, Callable]) -> Dict:
+        """Read all sections in one round trip and rebuild only the missing ones"""
+        names = list(builders)
+        try:
+            cached = get_redis().mget([_key(user_id, name) for name in names])
+        except RedisError as e:
+            logger.warning(f"Dashboard cache unavailable for user {user_id}: {e}")
+            return {name: builders[name](user_id)[0] for name in names}
+
+        sections = {}
+        misses = {}
+        for name, raw in zip(names, cached):
+            DASHBOARD_CACHE.inc(section=name, result='hit' if raw is not None else 'miss')
+            if raw is not None:
+                sections[name] = json.loads(raw)
+            else:
+                sections[name], ttl = builders[name](user_id)
+                if ttl > 0:
+                    misses[name] = ttl
+
+        if misses:
+            try:
+                pipe = get_redis().pipeline(transaction=False)
+                for name, ttl in misses.items():
+                    pipe.set(_key(user_id, name), json.dumps(sections[name], default=str), ex=ttl)
+                pipe.execute()
+            except RedisError as e:
+                logger.warning(f"Failed to cache dashboard sections for user {user_id}: {e}")
+
+        return sections
+
+    def _build_progress(self, user_id):
+        overview = self.progress_service.get_overview(user_id, days=7)
+        current = overview['current_streak']
+        section = {
+            'streak': {
+                'current': current,
+                'longest': overview['longest_streak'],
+                'icon': 'flame' if current else 'seedling',
+            },
+            'stats': {
+                'breaks_this_week': overview['total_breaks'],
+                'mindful_minutes': int(overview['total_minutes']),
+            },
+            'recent_breaks': [{'date': point['date'], 'count': point['break_count']} for point in overview['trend']],
+        }
+        return section, self.config.DASHBOARD_PROGRESS_TTL
+
+    def _build_recommendation(self, user_id):
+        recommendation = self.recommendation_service.get_today_recommendation(user_id)
+        ttl = self.config.DASHBOARD_RECOMMENDATION_TTL
+        if recommendation is None:
+            return None, ttl
+
+        session = catalog_service.get_snapshot().get(recommendation.session_id)
+        recommended_time = recommendation.recommended_time
+        if recommended_time.tzinfo is None:
+            recommended_time = pytz.utc.localize(recommended_time)
+
+        # Never serve a recommendation past its time from cache
+        remaining = int((recommended_time - datetime.now(pytz.UTC)).total_seconds())
+        return {
+            'id': str(recommendation.id),
+            'session': session,
+            'recommended_time': recommendation.recommended_time.isoformat(),
+            'reason': recommendation.reason,
+            'score': recommendation.score,
+            'status': recommendation.status,
+        }, min(ttl, remaining)
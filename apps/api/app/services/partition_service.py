@@ -0,0 +1,151 @@
+"""
+Partition Maintenance Service
+Pre-creates monthly partitions and enforces retention by dropping whole partitions.
+Rows outside every monthly range are kept in each table's DEFAULT partition until
+their month's partition is created.
+"""
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app import db
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> (partition key, retention config key)
+PARTITIONED_TABLES = {
+    'calendar_events': ('start_time', 'CALENDAR_EVENT_RETENTION_DAYS'),
+    'break_recommendations': ('recommended_time', 'RECOMMENDATION_RETENTION_DAYS'),
+}
+
+# Partition DDL waits at most this long for locks held by live queries
+LOCK_TIMEOUT = '5s'
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f'{table}_p{month:%Y%m}'
+
+
+def default_partition_name(table: str) -> str:
+    return f'{table}_default'
+
+
+def parse_partition_month(table: str, name: str) -> Optional[date]:
+    """Month covered by a partition created by this service, or None"""
+    match = re.fullmatch(rf'{re.escape(table)}_p(\d{{4}})(\d{{2}})', name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def months_to_create(today: date, months_ahead: int) -> List[date]:
+    """The current month and the next `months_ahead` months"""
+    current = month_start(today)
+    return [add_months(current, offset) for offset in range(months_ahead + 1)]
+
+
+def expired_partitions(table: str, names: List[str], cutoff: datetime) -> List[str]:
+    """Partitions whose every row is older than the cutoff, oldest first"""
+    expired = []
+    for name in names:
+        month = parse_partition_month(table, name)
+        if month and add_months(month, 1) <= cutoff.date():
+            expired.append((month, name))
+    return [name for _, name in sorted(expired)]
+
+
+def create_partition_sql(table: str, key: str, month: date) -> List[str]:
+    """
+    Statements creating a month's partition. Rows for that month already in the
+    DEFAULT partition are moved into it first, since attaching a range the default
+    partition still holds rows for fails.
+    """
+    name = partition_name(table, month)
+    lower, upper = f"'{month.isoformat()} 00:00:00+00'", f"'{add_months(month, 1).isoformat()} 00:00:00+00'"
+    return [
+        f"CREATE TABLE IF NOT EXISTS {name} (LIKE {table} INCLUDING DEFAULTS)",
+        f"WITH moved AS (DELETE FROM {default_partition_name(table)} "
+        f"WHERE {key} >= {lower} AND {key} < {upper} RETURNING *) INSERT INTO {name} SELECT * FROM moved",
+        f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})",
+    ]
+
+
+class PartitionService:
+    """
+    Keeps calendar_events and break_recommendations partitioned by month.
+    Each DDL statement runs in its own short transaction with a lock timeout,
+    so a busy table delays maintenance rather than the application.
+    """
+
+    def __init__(self):
+        self.config = get_config()
+
+    def list_partitions(self, table: str) -> List[str]:
+        rows = db.session.execute(text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table
+        """), {'table': table}).scalars().all()
+        return list(rows)
+
+    def _run_ddl(self, *statements: str) -> bool:
+        """Run statements in one transaction; False if they couldn't get their locks in time"""
+        try:
+            db.session.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+            for statement in statements:
+                db.session.execute(text(statement))
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Partition DDL failed, will retry next run: {'; '.join(statements)}: {e}")
+            return False
+
+    def ensure_future_partitions(self, table: str, today: date = None) -> List[str]:
+        """Create missing partitions for this month and the configured months ahead"""
+        today = today or datetime.utcnow().date()
+        key, _ = PARTITIONED_TABLES[table]
+        existing = set(self.list_partitions(table))
+        created = []
+        for month in months_to_create(today, self.config.PARTITION_MONTHS_AHEAD):
+            name = partition_name(table, month)
+            if name not in existing and self._run_ddl(*create_partition_sql(table, key, month)):
+                created.append(name)
+        return created
+
+    def drop_expired_partitions(self, table: str, retention_days: int, now: datetime = None) -> List[str]:
+        """Detach and drop partitions entirely older than the retention window"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+        dropped = []
+        for name in expired_partitions(table, self.list_partitions(table), cutoff):
+            # Together, so a failed drop can't leave a detached table behind
+            if self._run_ddl(f"ALTER TABLE {table} DETACH PARTITION {name}", f"DROP TABLE {name}"):
+                dropped.append(name)
+        return dropped
+
+    def run_maintenance(self, now: datetime = None) -> Dict[str, Dict[str, List[str]]]:
+        """Create upcoming partitions and drop expired ones for every partitioned table"""
+        now = now or datetime.utcnow()
+        result = {}
+        for table, (_, retention_key) in PARTITIONED_TABLES.items():
+            created = self.ensure_future_partitions(table, now.date())
+            dropped = self.drop_expired_partitions(table, getattr(self.config, retention_key), now)
+            if created or dropped:
+                logger.info(f"Partitions for {table}: created {created}, dropped {dropped}")
+            result[table] = {'created': created, 'dropped': dropped}
+        return result
@@ -0,0 +1,173 @@
+"""
+Progress Service
+Maintains per-user daily activity rollups and derives the progress dashboard from them.
+"""
+import logging
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models import User, UserStreak, UserDailyActivity, UserAcceptanceStats
+from app.services.streak_service import StreakService, effective_current_streak
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Distinct categories needed for a full diversity score
+DIVERSITY_TARGET = 3
+
+# Score weights for frequency, diversity and consistency (sum to 100)
+FREQUENCY_WEIGHT = 40
+DIVERSITY_WEIGHT = 30
+CONSISTENCY_WEIGHT = 30
+
+
+def time_slot(hour: int) -> str:
+    """Bucket a local hour into the dashboard's time-of-day slots"""
+    if hour < 12:
+        return 'morning'
+    if hour < 17:
+        return 'afternoon'
+    return 'evening'
+
+
+def count_workdays(start: date, end: date) -> int:
+    """Weekdays in the inclusive range [start, end]"""
+    return sum(1 for offset in range((end - start).days + 1)
+               if (start + timedelta(days=offset)).weekday() < 5)
+
+
+def wellness_score(activities: List[UserDailyActivity], start: date, end: date,
+                   current_streak: int = 0, breaks_per_day: int = 3) -> Dict:
+    """
+    Composite 0-100 score over [start, end] from daily rollups.
+    Frequency is breaks per workday against the daily target, diversity is
+    distinct categories used, and consistency blends active days with the streak.
+    """
+    workdays = max(count_workdays(start, end), 1)
+    total_breaks = sum(a.break_count or 0 for a in activities)
+    active_days = sum(1 for a in activities if a.break_count)
+    categories = {c for a in activities for c, n in (a.category_counts or {}).items() if n}
+
+    frequency = min(total_breaks / (workdays * max(breaks_per_day, 1)), 1.0)
+    diversity = min(len(categories) / DIVERSITY_TARGET, 1.0)
+    consistency = 0.5 * min(active_days / workdays, 1.0) + 0.5 * min(current_streak / 7, 1.0)
+
+    return {
+        'score': round(FREQUENCY_WEIGHT * frequency + DIVERSITY_WEIGHT * diversity + CONSISTENCY_WEIGHT * consistency),
+        'frequency': round(frequency, 2),
+        'diversity': round(diversity, 2),
+        'consistency': round(consistency, 2),
+    }
+
+
+class ProgressService:
+    """
+    Per-user progress from the user_daily_activity rollup.
+    Completions update one row; dashboard reads are bounded by the window size.
+    """
+
+    def __init__(self):
+        self.config = get_config()
+
+    def record_break(self, user_id, local_day: date, local_hour: int,
+                     category: Optional[str], duration_seconds: Optional[int]) -> UserDailyActivity:
+        """Fold a completed break into the user's row for that local day; the caller commits"""
+        # Create the row first so racing first completions of a day both lock it
+        # instead of one failing on the unique constraint
+        db.session.execute(
+            insert(UserDailyActivity.__table__).values(
+                user_id=user_id, date=local_day, break_count=0, total_seconds=0
+            ).on_conflict_do_nothing(index_elements=['user_id', 'date'])
+        )
+        activity = UserDailyActivity.query.filter_by(
+            user_id=user_id, date=local_day
+        ).with_for_update().one()
+
+        # JSON columns only track reassignment, so build new containers
+        categories = dict(activity.category_counts or {})
+        if category:
+            categories[category] = categories.get(category, 0) + 1
+
+        hours = list(activity.hour_counts or []) or [0] * 24
+        hours[local_hour] += 1
+
+        activity.break_count = (activity.break_count or 0) + 1
+        activity.total_seconds = (activity.total_seconds or 0) + max(duration_seconds or 0, 0)
+        activity.category_counts = categories
+        activity.hour_counts = hours
+        return activity
+
+    def get_overview(self, user_id, days: int = 30) -> Optional[Dict]:
+        """Build the progress dashboard from at most `days` rollup rows"""
+        row = db.session.query(
+            User.timezone, UserStreak, UserAcceptanceStats.acted_count, UserAcceptanceStats.expired_count
+        ).outerjoin(
+            UserStreak, UserStreak.user_id == User.id
+        ).outerjoin(
+            UserAcceptanceStats, UserAcceptanceStats.user_id == User.id
+        ).filter(User.id == user_id).first()
+        if not row:
+            return None
+
+        timezone, streak, acted, expired = row
+        acted, expired = acted or 0, expired or 0
+        end = StreakService.local_today(timezone)
+        start = end - timedelta(days=days - 1)
+
+        activities = UserDailyActivity.query.filter(
+            UserDailyActivity.user_id == user_id,
+            UserDailyActivity.date >= start,
+            UserDailyActivity.date <= end
+        ).order_by(UserDailyActivity.date).all()
+
+        current_streak = effective_current_streak(streak, end) if streak else 0
+        by_date = {a.date: a for a in activities}
+
+        categories = Counter()
+        hours = [0] * 24
+        for activity in activities:
+            categories.update(activity.category_counts or {})
+            for hour, count in enumerate(activity.hour_counts or []):
+                hours[hour] += count
+
+        total_breaks = sum(a.break_count or 0 for a in activities)
+        total_seconds = sum(a.total_seconds or 0 for a in activities)
+        most_active_hour = max(range(24), key=hours.__getitem__) if total_breaks else None
+
+        trend = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            activity = by_date.get(day)
+            trend.append(activity.to_dict() if activity else {'date': day.isoformat(), 'break_count': 0, 'minutes': 0})
+
+        this_week = sum(point['break_count'] for point in trend[-7:])
+        last_week = sum(point['break_count'] for point in trend[-14:-7])
+
+        return {
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'wellness': wellness_score(activities, start, end, current_streak, self.config.BREAKS_PER_DAY_LIMIT),
+            'total_breaks': total_breaks,
+            'total_minutes': round(total_seconds / 60, 1),
+            'average_break_minutes': round(total_seconds / 60 / total_breaks, 1) if total_breaks else 0,
+            'most_active_hour': most_active_hour,
+            'most_active_time_of_day': time_slot(most_active_hour) if most_active_hour is not None else None,
+            'category_breakdown': dict(categories),
+            'week_over_week': {
+                'this_week': this_week,
+                'last_week': last_week,
+                'change': this_week - last_week,
+            },
+            'current_streak': current_streak,
+            'longest_streak': (streak.longest_streak or 0) if streak else 0,
+            'recommendations': {  # All-time, not limited to the window
+                'acted': acted,
+                'expired': expired,
+                'engagement_rate': round(acted / (acted + expired), 2) if acted + expired else None,
+            },
+            'trend': trend,
+        }
@@ -0,0 +1,89 @@
+"""
+Recommendation Expiry Service
+Moves pending recommendations past expires_at to 'expired' in set-based batches
+and counts them per user, keeping the pending set small.
+"""
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models import BreakRecommendation, UserAcceptanceStats
+from app.services.acceptance_service import empty_stats_values
+from app.utils.metrics import registry
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATIONS_EXPIRED = registry.counter(
+    'recommendations_expired_total', 'Pending recommendations transitioned to expired'
+)
+
+
+class RecommendationExpiryService:
+    """
+    Batches are claimed with FOR UPDATE SKIP LOCKED through idx_recommendations_expired,
+    so concurrent runs skip each other's rows. Accept, dismiss and completion lock the
+    recommendation too, so one on a row in a batch being expired waits for that batch
+    to commit and then sees 'expired'; batches are kept short by EXPIRY_BATCH_SIZE.
+    """
+
+    def __init__(self):
+        self.config = get_config()
+
+    def expire_batch(self, now: datetime, batch_size: int) -> int:
+        """Expire up to batch_size recommendations and count them per user in one transaction"""
+        rows = db.session.execute(
+            select(BreakRecommendation.id, BreakRecommendation.user_id).where(
+                BreakRecommendation.status == 'pending',
+                BreakRecommendation.expires_at < now
+            ).order_by(BreakRecommendation.expires_at).limit(batch_size).with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            return 0
+
+        db.session.execute(
+            update(BreakRecommendation).where(
+                BreakRecommendation.id.in_([row.id for row in rows])
+            ).values(status='expired'),
+            execution_options={'synchronize_session': False}
+        )
+
+        # One upsert that increments in SQL, so neither concurrent outcome updates nor
+        # a racing first outcome that creates the stats row can fail or be lost
+        per_user = Counter(row.user_id for row in rows)
+        table = UserAcceptanceStats.__table__
+        statement = insert(table).values([
+            {**empty_stats_values(user_id), 'expired_count': count} for user_id, count in per_user.items()
+        ])
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['user_id'],
+            set_={'expired_count': db.func.coalesce(table.c.expired_count, 0) + statement.excluded.expired_count}
+        ))
+
+        db.session.commit()
+        RECOMMENDATIONS_EXPIRED.inc(len(rows))
+        return len(rows)
+
+    def expire_pending(self, now: Optional[datetime] = None) -> int:
+        """Expire stale recommendations in batches until none remain or the run limit is reached"""
+        now = now or datetime.utcnow()
+        batch_size = self.config.EXPIRY_BATCH_SIZE
+        total = 0
+        for _ in range(self.config.EXPIRY_MAX_BATCHES):
+            try:
+                expired = self.expire_batch(now, batch_size)
+            except Exception:
+                db.session.rollback()
+                raise
+            total += expired
+            if expired < batch_size:
+                break
+
+        if total:
+            logger.info(f"Expired {total} pending recommendations")
+        return total
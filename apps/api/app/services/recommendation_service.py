@@ -5,11 +5,18 @@ Implements the core recommendation algorithm from PRD section 4.7.
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-import pytz
 
 from app import db
-from app.models import User, CalendarEvent, BreakRecommendation, BreakSession, CompletedBreak
+from app.models import User, CalendarEvent, BreakRecommendation, BreakSession, CompletedBreak, UserAcceptanceStats
+from app.services.acceptance_service import category_preference
+from app.services.break_selection import select_spaced_breaks
 from app.services.calendar_analyzer import CalendarAnalyzer
+from app.services.dashboard_service import RECOMMENDATION, invalidate_dashboard
+from app.services.recurrence import events_between
+from app.services.user_context import get_user_context
+from app.utils.event_stream import publish_user_event
+from app.utils.timing import span
+from config import get_config
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +29,7 @@ class RecommendationService:
     
     def __init__(self):
         self.analyzer = CalendarAnalyzer()
+        self.config = get_config()
         
         # Break type mappings based on context
         self.break_type_mapping = {
@@ -41,51 +49,61 @@ class RecommendationService:
         Implementation of the complete suggestBreaks algorithm from PRD.
         """
         try:
-            user = User.query.get(user_id)
-            if not user:
-                raise ValueError(f"User {user_id} not found")
+            # Acceptance stats ride along with the user; scoring then needs no queries
+            context = get_user_context(user_id)
+            user, acceptance = context.user, context.acceptance
             
             # Get today's calendar events
-            user_tz = pytz.timezone(user.timezone)
-            today = datetime.now(user_tz).replace(hour=0, minute=0, second=0, microsecond=0)
+            today = context.today_start()
             tomorrow = today + timedelta(days=1)
             
-            events = CalendarEvent.query.filter(
-                CalendarEvent.user_id == user_id,
-                CalendarEvent.start_time >= today,
-                CalendarEvent.start_time < tomorrow
-            ).order_by(CalendarEvent.start_time).all()
+            with span('load_events'):
+                events = events_between(user_id, today, tomorrow)
             
-            # Step 1: Define work boundaries
-            workday_start, workday_end = self.analyzer.calculate_workday_boundaries(events, user)
-            
-            # Step 2: Analyze meeting density and context
-            meeting_analysis = self._analyze_meetings(events)
-            
-            # Step 3: Find break opportunities
-            opportunities = self.analyzer.find_break_opportunities(events, workday_start, workday_end)
+            with span('analyze'):
+                # Step 1: Define work boundaries
+                workday_start, workday_end = self.analyzer.calculate_workday_boundaries(events, user)
+                
+                # Step 2: Analyze meeting density and context
+                meeting_analysis = self._analyze_meetings(events)
+                
+                # Step 3: Find break opportunities
+                opportunities = self.analyzer.find_break_opportunities(events, workday_start, workday_end)
             
             # Get recent breaks for scoring
-            recent_breaks = self._get_recent_break_times(user_id, today)
+            with span('recent_breaks'):
+                recent_breaks = self._get_recent_break_times(user_id, today)
             
             # Step 4: Score opportunities
-            scored_opportunities = []
-            for opportunity in opportunities:
-                score = self.analyzer.calculate_opportunity_score(opportunity, user, recent_breaks)
-                scored_opportunities.append({
-                    **opportunity,
-                    'score': score,
-                    'meeting_context': self._get_opportunity_context(opportunity, meeting_analysis)
-                })
-            
-            # Step 5: Select optimal breaks (top 1 for MVP)
-            selected_opportunities = sorted(scored_opportunities, key=lambda x: x['score'], reverse=True)[:1]
+            with span('score'):
+                scored_opportunities = []
+                for opportunity in opportunities:
+                    score = self.analyzer.calculate_opportunity_score(
+                        opportunity, user, recent_breaks, acceptance
+                    )
+                    scored_opportunities.append({
+                        **opportunity,
+                        'score': score,
+                        'meeting_context': self._get_opportunity_context(opportunity, meeting_analysis)
+                    })
+                
+            # Step 5: Select the best spaced-out breaks, up to the daily limit
+            with span('select'):
+                selected_opportunities = select_spaced_breaks(
+                    scored_opportunities,
+                    self.config.BREAKS_PER_DAY_LIMIT,
+                    self.config.MIN_BREAK_SPACING_MINUTES
+                )
             
             # Step 6: Match break types and create recommendations
             recommendations = []
+            sessions = self._load_break_sessions() if selected_opportunities else []
             for opportunity in selected_opportunities:
-                break_type = self._select_break_type(opportunity, user)
-                break_session = self._select_break_session(break_type, opportunity['duration_minutes'])
+                with span('match_session'):
+                    break_type = self._select_break_type(opportunity, user)
+                    break_session = self._select_break_session(
+                        break_type, opportunity['duration_minutes'], sessions, acceptance
+                    )
                 
                 # Calculate expiration time (end of day)
                 expires_at = opportunity['start_time'].replace(hour=23, minute=59, second=59)
@@ -96,6 +114,7 @@ class RecommendationService:
                     recommended_time=opportunity['start_time'],
                     reason=self._generate_context_reason(opportunity),
                     score=min(opportunity['score'] / 10, 1.0),  # Normalize to 0-1
+                    gap_type=opportunity['gap_type'],
                     expires_at=expires_at,
                     created_at=datetime.utcnow()
                 )
@@ -115,9 +134,7 @@ class RecommendationService:
         """
         try:
             # Clear existing recommendations for today
-            user = User.query.get(user_id)
-            user_tz = pytz.timezone(user.timezone)
-            today = datetime.now(user_tz).replace(hour=0, minute=0, second=0, microsecond=0)
+            today = get_user_context(user_id).today_start()
             tomorrow = today + timedelta(days=1)
             
             BreakRecommendation.query.filter(
@@ -134,6 +151,11 @@ class RecommendationService:
                 db.session.add(rec)
             
             db.session.commit()
+            invalidate_dashboard(user_id, RECOMMENDATION)
+            publish_user_event(user_id, 'recommendations_updated', {
+                'count': len(recommendations),
+                'recommendation_id': str(recommendations[0].id) if recommendations else None
+            })
             
             logger.info(f"Stored {len(recommendations)} recommendations for user {user_id}")
             return recommendations
@@ -149,23 +171,23 @@ class RecommendationService:
         If none exists or is stale, generate new ones.
         """
         try:
-            user = User.query.get(user_id)
-            user_tz = pytz.timezone(user.timezone)
-            now = datetime.now(user_tz)
-            today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            tomorrow = today + timedelta(days=1)
+            context = get_user_context(user_id)
+            now = context.now()
+            tomorrow = context.today_start() + timedelta(days=1)
             
             # Look for valid recommendation for today
-            recommendation = BreakRecommendation.query.filter(
-                BreakRecommendation.user_id == user_id,
-                BreakRecommendation.recommended_time >= now,  # Future or current
-                BreakRecommendation.recommended_time < tomorrow,
-                BreakRecommendation.status == 'pending'
-            ).order_by(BreakRecommendation.score.desc()).first()
+            with span('lookup'):
+                recommendation = BreakRecommendation.query.filter(
+                    BreakRecommendation.user_id == user_id,
+                    BreakRecommendation.recommended_time >= now,  # Future or current
+                    BreakRecommendation.recommended_time < tomorrow,
+                    BreakRecommendation.status == 'pending'
+                ).order_by(BreakRecommendation.score.desc()).first()
             
             # If no valid recommendation exists, generate new ones
             if not recommendation:
-                recommendations = self.generate_and_store_recommendations(user_id)
+                with span('regenerate'):
+                    recommendations = self.generate_and_store_recommendations(user_id)
                 recommendation = recommendations[0] if recommendations else None
             
             return recommendation
@@ -284,24 +306,39 @@ class RecommendationService:
         
         return default_types[0]
     
-    def _select_break_session(self, break_type: str, duration_minutes: int) -> Optional[BreakSession]:
+    def _load_break_sessions(self) -> List[BreakSession]:
+        """
+        Load the break session library once per generation run.
+        Sessions are matched in memory so selection doesn't query per opportunity.
+        Only active sessions, the same set the catalog serves and breaks can start from.
+        """
+        return BreakSession.query.filter(
+            BreakSession.is_active.is_(True)
+        ).order_by(BreakSession.duration_minutes).all()
+    
+    def _select_break_session(self, break_type: str, duration_minutes: int,
+                              sessions: List[BreakSession],
+                              acceptance: Optional[UserAcceptanceStats] = None) -> Optional[BreakSession]:
         """
         Select appropriate break session content based on type and duration.
+        Fallbacks prefer the categories this user accepts most.
         """
+        max_duration = duration_minutes + 2  # 2 min buffer
+        min_duration = max(duration_minutes - 5, 5)  # Minimum 5 min
+        
         # Find sessions that match type and duration
-        sessions = BreakSession.query.filter(
-            BreakSession.category.ilike(f'%{break_type}%'),
-            BreakSession.duration_minutes <= duration_minutes + 2,  # 2 min buffer
-            BreakSession.duration_minutes >= max(duration_minutes - 5, 5)  # Minimum 5 min
-        ).first()
+        for session in sessions:
+            if (break_type.lower() in (session.category or '').lower()
+                    and min_duration <= session.duration_minutes <= max_duration):
+                return session
         
-        if not sessions:
-            # Fallback to any session within duration
-            sessions = BreakSession.query.filter(
-                BreakSession.duration_minutes <= duration_minutes + 2
-            ).first()
+        # Fallback to any session within duration
+        candidates = [session for session in sessions if session.duration_minutes <= max_duration]
+        if not candidates:
+            return None
         
-        return sessions
+        # max() keeps the shortest session among equally preferred categories
+        return max(candidates, key=lambda session: category_preference(acceptance, session.category))
     
     def _generate_context_reason(self, opportunity: Dict) -> str:
         """
@@ -0,0 +1,107 @@
+"""
+Recurrence Expansion
+Recurring meetings are stored once as RecurringSeries rows and expanded into
+instances for the window being read, locally with dateutil. Parsed rules and
+expanded windows are cached per process, so a series is parsed once and each
+day's instances are computed once however often recommendations are rebuilt.
+"""
+import logging
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Tuple
+
+import pytz
+from dateutil import tz
+from dateutil.rrule import rruleset, rrulestr
+
+from app.models import CalendarEvent, RecurringSeries
+
+logger = logging.getLogger(__name__)
+
+RULE_CACHE_SIZE = 1024
+EXPANSION_CACHE_SIZE = 4096
+
+# Date-only UNTIL values, which dateutil rejects once DTSTART carries a zone
+_DATE_UNTIL = re.compile(r'UNTIL=(\d{8})(?=;|$)', re.MULTILINE)
+
+
+@lru_cache(maxsize=RULE_CACHE_SIZE)
+def _rule_set(recurrence: str, start_time: datetime, timezone: str) -> rruleset:
+    # Expanding in the series' own zone keeps instances at the same wall time across DST
+    zone = tz.gettz(timezone) or tz.UTC
+    return rrulestr(
+        _DATE_UNTIL.sub(r'UNTIL=\1T235959Z', recurrence),
+        dtstart=start_time.astimezone(zone), forceset=True, unfold=True
+    )
+
+
+@lru_cache(maxsize=EXPANSION_CACHE_SIZE)
+def _expand(recurrence: str, start_time: datetime, timezone: str, duration_minutes: int,
+            excluded: FrozenSet[datetime], window_start: datetime, window_end: datetime) -> Tuple[datetime, ...]:
+    duration = timedelta(minutes=duration_minutes)
+    starts = _rule_set(recurrence, start_time, timezone).between(window_start - duration, window_end)
+    return tuple(start for start in starts if start not in excluded)
+
+
+def expand(recurrence: str, start_time: datetime, timezone: str, duration_minutes: int,
+           excluded: Iterable[datetime], window_start: datetime, window_end: datetime) -> List[Tuple[datetime, datetime]]:
+    """
+    (start, end) of every instance overlapping the window, skipping excluded starts.
+    Raises ValueError for rules dateutil can't parse.
+    """
+    starts = _expand(recurrence, _aware(start_time), timezone, duration_minutes,
+                     frozenset(_aware(start) for start in excluded), window_start, window_end)
+    duration = timedelta(minutes=duration_minutes)
+    return [(start, start + duration) for start in starts]
+
+
+def _aware(value: datetime) -> datetime:
+    return pytz.utc.localize(value) if value.tzinfo is None else value
+
+
+def series_events(series: RecurringSeries, window_start: datetime, window_end: datetime) -> List[CalendarEvent]:
+    """Transient CalendarEvent instances of the series within the window, in the window's zone"""
+    try:
+        occurrences = expand(
+            series.recurrence, series.start_time, series.timezone, series.duration_minutes,
+            (datetime.fromisoformat(start) for start in series.excluded_starts or []),
+            window_start, window_end
+        )
+    except ValueError as e:
+        logger.warning(f"Skipping series {series.external_id} with unreadable recurrence: {e}")
+        return []
+
+    return [
+        CalendarEvent(
+            user_id=series.user_id,
+            external_id=f"{series.external_id}_{start.astimezone(pytz.UTC).strftime('%Y%m%dT%H%M%SZ')}",
+            title=series.title,
+            start_time=start.astimezone(window_start.tzinfo),
+            end_time=end.astimezone(window_start.tzinfo),
+            attendee_count=series.attendee_count,
+            is_recurring=True,
+            meeting_type=series.meeting_type
+        )
+        for start, end in occurrences
+    ]
+
+
+def events_between(user_id, window_start: datetime, window_end: datetime) -> List[CalendarEvent]:
+    """Stored one-off events plus expanded series instances starting in the window, by start time"""
+    events = CalendarEvent.query.filter(
+        CalendarEvent.user_id == user_id,
+        CalendarEvent.start_time >= window_start,
+        CalendarEvent.start_time < window_end
+    ).all()
+
+    for series in RecurringSeries.query.filter(
+        RecurringSeries.user_id == user_id,
+        RecurringSeries.start_time < window_end
+    ):
+        events.extend(
+            event for event in series_events(series, window_start, window_end)
+            if event.start_time >= window_start
+        )
+
+    return sorted(events, key=lambda event: _aware(event.start_time))
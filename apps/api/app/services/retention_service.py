@@ -0,0 +1,132 @@
+"""
+Retention Sweeper
+Deletes expired rows in small keyset batches, one short transaction per batch,
+so retention never holds long locks or floods replication.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app import db
+from app.utils.metrics import registry
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+RETENTION_ROWS_DELETED = registry.counter(
+    'retention_rows_deleted_total', 'Rows deleted by the retention sweeper', ('rule',)
+)
+
+# Log progress every this many batches
+PROGRESS_EVERY = 20
+
+
+@dataclass(frozen=True)
+class RetentionRule:
+    """Rows of `table` whose `time_column` is older than the configured retention are deleted"""
+    name: str
+    table: str
+    time_column: str
+    retention_key: str
+    condition: str = ''  # Extra SQL predicate, e.g. to match a partial index
+
+
+RETENTION_RULES = (
+    RetentionRule('calendar_events', 'calendar_events', 'start_time', 'CALENDAR_EVENT_RETENTION_DAYS'),
+    # Recommendations the expiry sweeper marked expired, once counted
+    RetentionRule('expired_recommendations', 'break_recommendations', 'expires_at',
+                  'EXPIRED_RECOMMENDATION_RETENTION_DAYS', "status = 'expired'"),
+    RetentionRule('break_recommendations', 'break_recommendations', 'recommended_time',
+                  'RECOMMENDATION_RETENTION_DAYS'),
+    # Source rows of the streak and company analytics rollups
+    RetentionRule('completed_breaks', 'completed_breaks', 'started_at', 'COMPLETED_BREAK_RETENTION_DAYS'),
+)
+
+# Keyset on the time column: each batch seeks past the previous one instead of
+# rescanning index entries of rows that were just deleted
+_DELETE_BATCH_SQL = """
+DELETE FROM {table}
+WHERE id IN (
+    SELECT id FROM {table}
+    WHERE {time_column} >= :after AND {time_column} < :cutoff {condition}
+    ORDER BY {time_column}
+    LIMIT :limit
+)
+RETURNING {time_column}
+"""
+
+
+class RetentionSweeper:
+    """
+    Runs retention rules in throttled batches.
+    Throughput is capped by RETENTION_MAX_ROWS_PER_SECOND and each run stops
+    after RETENTION_MAX_SECONDS; the next run resumes where this one stopped.
+    """
+
+    def __init__(self, sleep=time.sleep, clock=time.monotonic):
+        self.config = get_config()
+        self._sleep = sleep
+        self._clock = clock
+
+    def sweep(self, rule: RetentionRule, now: datetime = None, deadline: Optional[float] = None) -> int:
+        """Delete a rule's expired rows; returns the number of rows deleted"""
+        retention_days = getattr(self.config, rule.retention_key)
+        if not retention_days:
+            return 0
+
+        cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+        batch_size = self.config.RETENTION_BATCH_SIZE
+        max_rate = self.config.RETENTION_MAX_ROWS_PER_SECOND
+        statement = text(_DELETE_BATCH_SQL.format(
+            table=rule.table,
+            time_column=rule.time_column,
+            condition=f'AND {rule.condition}' if rule.condition else '',
+        ))
+
+        after = datetime(1970, 1, 1)
+        deleted = 0
+        batches = 0
+        while deadline is None or self._clock() < deadline:
+            started = self._clock()
+            try:
+                times = db.session.execute(
+                    statement, {'after': after, 'cutoff': cutoff, 'limit': batch_size}
+                ).scalars().all()
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            deleted += len(times)
+            batches += 1
+            RETENTION_ROWS_DELETED.inc(len(times), rule=rule.name)
+            if times and batches % PROGRESS_EVERY == 0:
+                logger.info(f"Retention {rule.name}: {deleted} rows deleted so far (up to {max(times)})")
+
+            if len(times) < batch_size:
+                break
+            after = max(times)
+
+            # Spread deletes out so replicas and vacuum keep up
+            if max_rate:
+                self._sleep(max(len(times) / max_rate - (self._clock() - started), 0))
+
+        logger.info(f"Retention {rule.name}: deleted {deleted} rows older than {cutoff.isoformat()}")
+        return deleted
+
+    def sweep_all(self, rules: List[RetentionRule] = RETENTION_RULES, now: datetime = None) -> Dict[str, int]:
+        """
+        Run every rule within the configured time budget.
+        Each rule gets an equal share of the time left, so a large backlog in one
+        rule can't starve the rules after it; time a rule doesn't use carries over.
+        """
+        end = self._clock() + self.config.RETENTION_MAX_SECONDS
+        deleted = {}
+        for index, rule in enumerate(rules):
+            started = self._clock()
+            deleted[rule.name] = self.sweep(rule, now, started + (end - started) / (len(rules) - index))
+        return deleted
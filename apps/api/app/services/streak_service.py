@@ -0,0 +1,181 @@
+"""
+Streak Service
+Maintains UserStreak incrementally on break completion and reconciles drift nightly.
+"""
+import logging
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+
+import pytz
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models import User, UserStreak
+
+logger = logging.getLogger(__name__)
+
+# Rebuilds every user's streak from completed_breaks in one set-based pass.
+# Days are local to each user's timezone; consecutive days form an island,
+# and the island ending on the latest day is the current streak.
+_RECONCILE_SQL = """
+WITH break_days AS (
+    SELECT DISTINCT cb.user_id,
+           (cb.completed_at AT TIME ZONE COALESCE(u.timezone, 'UTC'))::date AS day
+    FROM completed_breaks cb
+    JOIN users u ON u.id = cb.user_id
+    WHERE cb.completed_at IS NOT NULL
+),
+islands AS (
+    SELECT user_id,
+           day,
+           day - (ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY day))::int AS island
+    FROM break_days
+),
+runs AS (
+    SELECT user_id, island, MIN(day) AS run_start, MAX(day) AS run_end, COUNT(*) AS run_length
+    FROM islands
+    GROUP BY user_id, island
+),
+summary AS (
+    SELECT user_id,
+           MAX(run_length) AS longest,
+           MAX(run_end) AS last_day,
+           (ARRAY_AGG(run_start ORDER BY run_end DESC))[1] AS last_run_start,
+           (ARRAY_AGG(run_length ORDER BY run_end DESC))[1] AS last_run_length
+    FROM runs
+    GROUP BY user_id
+),
+streaks AS (
+    SELECT s.user_id,
+           s.longest,
+           s.last_day,
+           s.last_day >= (NOW() AT TIME ZONE COALESCE(u.timezone, 'UTC'))::date - 1 AS alive,
+           s.last_run_start,
+           s.last_run_length
+    FROM summary s
+    JOIN users u ON u.id = s.user_id
+)
+INSERT INTO user_streaks (id, user_id, current_streak, longest_streak, last_break_date, streak_started_at, updated_at)
+SELECT uuid_generate_v4(),
+       user_id,
+       CASE WHEN alive THEN last_run_length ELSE 0 END,
+       longest,
+       last_day,
+       CASE WHEN alive THEN last_run_start END,
+       NOW()
+FROM streaks
+ON CONFLICT (user_id) DO UPDATE SET
+    current_streak = EXCLUDED.current_streak,
+    -- Retention may have deleted old breaks; never shrink the record
+    longest_streak = GREATEST(user_streaks.longest_streak, EXCLUDED.longest_streak),
+    last_break_date = EXCLUDED.last_break_date,
+    streak_started_at = EXCLUDED.streak_started_at,
+    updated_at = NOW()
+WHERE (user_streaks.current_streak, user_streaks.longest_streak,
+       user_streaks.last_break_date, user_streaks.streak_started_at)
+    IS DISTINCT FROM
+      (EXCLUDED.current_streak, GREATEST(user_streaks.longest_streak, EXCLUDED.longest_streak),
+       EXCLUDED.last_break_date, EXCLUDED.streak_started_at)
+"""
+
+# Streaks whose source breaks are gone (retention) but are no longer alive
+_RESET_BROKEN_SQL = """
+UPDATE user_streaks us
+SET current_streak = 0, streak_started_at = NULL, updated_at = NOW()
+FROM users u
+WHERE u.id = us.user_id
+  AND us.current_streak > 0
+  AND us.last_break_date < (NOW() AT TIME ZONE COALESCE(u.timezone, 'UTC'))::date - 1
+"""
+
+
+def advance_streak(streak: UserStreak, day: date) -> UserStreak:
+    """
+    Apply one break day to a streak using only its stored fields.
+    Out-of-order days (e.g. late writes) are left to the nightly reconciler.
+    """
+    last = streak.last_break_date
+    current = streak.current_streak or 0
+
+    if last is None or current == 0:
+        current = 1
+        streak.streak_started_at = day
+    elif day == last:
+        return streak
+    elif day == last + timedelta(days=1):
+        current += 1
+    elif day < last:
+        return streak
+    else:
+        current = 1
+        streak.streak_started_at = day
+
+    streak.current_streak = current
+    streak.longest_streak = max(streak.longest_streak or 0, current)
+    streak.last_break_date = day
+    return streak
+
+
+def effective_current_streak(streak: UserStreak, today: date) -> int:
+    """Current streak as of today; a streak without a break yesterday or today is broken"""
+    if not streak.last_break_date or streak.last_break_date < today - timedelta(days=1):
+        return 0
+    return streak.current_streak or 0
+
+
+class StreakService:
+    """
+    O(1) streak maintenance.
+    Completion updates touch one row; reads are a single indexed lookup.
+    """
+
+    def record_break(self, user_id, completed_at: datetime, timezone: str = 'UTC') -> UserStreak:
+        """
+        Fold a completed break into the user's streak.
+        The caller commits, so the update lands in the same transaction as the break.
+        """
+        local_day = self.local_date(completed_at, timezone)
+
+        # Insert-if-missing, then lock, so a user's first two breaks can't race on user_id
+        db.session.execute(
+            insert(UserStreak.__table__).values(
+                user_id=user_id, current_streak=0, longest_streak=0
+            ).on_conflict_do_nothing(index_elements=['user_id'])
+        )
+        streak = UserStreak.query.filter_by(user_id=user_id).with_for_update().one()
+
+        return advance_streak(streak, local_day)
+
+    def get_streak(self, user_id) -> Optional[Tuple[UserStreak, str]]:
+        """Load the streak with the user's timezone in one query"""
+        return db.session.query(UserStreak, User.timezone).join(
+            User, User.id == UserStreak.user_id
+        ).filter(UserStreak.user_id == user_id).first()
+
+    def reconcile_all(self) -> int:
+        """
+        Rebuild streaks for all users from completed_breaks and reset broken ones.
+        Returns the number of streak rows changed.
+        """
+        try:
+            upserted = db.session.execute(text(_RECONCILE_SQL)).rowcount
+            reset = db.session.execute(text(_RESET_BROKEN_SQL)).rowcount
+            db.session.commit()
+            logger.info(f"Streak reconciliation updated {upserted} streaks and reset {reset}")
+            return upserted + reset
+        except Exception as e:
+            logger.error(f"Streak reconciliation failed: {e}")
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def local_date(moment: datetime, timezone: str) -> date:
+        tz = pytz.timezone(timezone or 'UTC')
+        if moment.tzinfo is None:
+            moment = pytz.utc.localize(moment)
+        return moment.astimezone(tz).date()
+
+    @staticmethod
+    def local_today(timezone: str) -> date:
+        return datetime.now(pytz.timezone(timezone or 'UTC')).date()
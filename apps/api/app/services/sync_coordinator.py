@@ -0,0 +1,142 @@
+"""
+Calendar Sync Coordinator
+At most one sync per user is queued and at most one runs. Requests made while
+a sync is queued share it; requests made while one runs coalesce into a single
+follow-up run enqueued when it finishes.
+"""
+import logging
+import uuid
+
+from redis.exceptions import RedisError
+
+from app.utils.metrics import registry
+from app.utils.redis_client import get_redis
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+QUEUED_PREFIX = 'sync:queued:'  # Id of the task waiting to run
+LEASE_PREFIX = 'sync:lease:'  # Id of the task running
+FOLLOWUP_PREFIX = 'sync:followup:'  # Set when a request arrived during the run
+
+SYNC_REQUESTS = registry.counter(
+    'calendar_sync_requests_total', 'Calendar sync requests, by whether they enqueued a task', ('outcome',)
+)
+
+# Returns {outcome, task id}: joins the running sync as a follow-up, joins
+# the queued one, or claims the queued slot for a new task
+_REQUEST_SCRIPT = """
+local running = redis.call('GET', KEYS[2])
+if running then
+    redis.call('SET', KEYS[3], '1', 'EX', ARGV[3])
+    return {'coalesced', running}
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    return {'enqueued', ARGV[1]}
+end
+return {'queued', redis.call('GET', KEYS[1])}
+"""
+
+# Moves a task from queued to running. A task that finds another one running
+# leaves a follow-up request and returns 0. Retries keep their task id and lease.
+_ACQUIRE_SCRIPT = """
+if redis.call('GET', KEYS[2]) == ARGV[1] then
+    redis.call('DEL', KEYS[2])
+end
+local holder = redis.call('GET', KEYS[1])
+if holder and holder ~= ARGV[1] then
+    redis.call('SET', KEYS[3], '1', 'EX', ARGV[2])
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('DEL', KEYS[3])
+return 1
+"""
+
+# Compare-and-delete of the lease; returns 1 when a follow-up was requested
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+return redis.call('DEL', KEYS[2])
+"""
+
+
+class SyncCoordinator:
+    """
+    Per-user deduplication of sync_user_calendar in Redis.
+    When Redis is unavailable requests enqueue directly and tasks run unlocked,
+    as they did before coordination.
+    """
+
+    def __init__(self, client_factory=get_redis):
+        self.config = get_config()
+        self._client_factory = client_factory
+        self._scripts = {}
+
+    @property
+    def client(self):
+        return self._client_factory()
+
+    def _run(self, script: str, keys, args):
+        if script not in self._scripts:
+            self._scripts[script] = self.client.register_script(script)
+        return self._scripts[script](keys=keys, args=args, client=self.client)
+
+    @staticmethod
+    def _keys(user_id):
+        return f'{QUEUED_PREFIX}{user_id}', f'{LEASE_PREFIX}{user_id}', f'{FOLLOWUP_PREFIX}{user_id}'
+
+    def request_sync(self, user_id) -> str:
+        """Make sure a sync covering this request will run; returns that sync's task id"""
+        from app.tasks.calendar_tasks import sync_user_calendar
+
+        queued_key, lease_key, followup_key = self._keys(user_id)
+        task_id = str(uuid.uuid4())
+        try:
+            outcome, existing_id = self._run(
+                _REQUEST_SCRIPT,
+                keys=[queued_key, lease_key, followup_key],
+                args=[task_id, self.config.CALENDAR_SYNC_DEDUPE_SECONDS, self.config.CALENDAR_SYNC_LEASE_SECONDS]
+            )
+        except RedisError as e:
+            logger.warning(f"Sync dedupe unavailable for user {user_id}, enqueueing directly: {e}")
+            return sync_user_calendar.apply_async(args=[user_id]).id
+
+        SYNC_REQUESTS.inc(outcome=outcome)
+        if outcome != 'enqueued':
+            return existing_id
+
+        try:
+            sync_user_calendar.apply_async(args=[user_id], task_id=task_id)
+        except Exception:
+            # Don't leave the slot claimed by a task that was never sent
+            self.client.delete(queued_key)
+            raise
+        return task_id
+
+    def acquire(self, user_id, task_id: str) -> bool:
+        """Take the user's sync lease for this task; False means another sync is running"""
+        queued_key, lease_key, followup_key = self._keys(user_id)
+        try:
+            return bool(self._run(
+                _ACQUIRE_SCRIPT,
+                keys=[lease_key, queued_key, followup_key],
+                args=[task_id, self.config.CALENDAR_SYNC_LEASE_SECONDS]
+            ))
+        except RedisError as e:
+            logger.warning(f"Sync lease unavailable for user {user_id}, running unlocked: {e}")
+            return True
+
+    def release(self, user_id, task_id: str) -> bool:
+        """Drop the lease if this task still holds it; True when a follow-up run was requested"""
+        _, lease_key, followup_key = self._keys(user_id)
+        try:
+            return bool(self._run(_RELEASE_SCRIPT, keys=[lease_key, followup_key], args=[task_id]))
+        except RedisError as e:
+            logger.warning(f"Failed to release sync lease for user {user_id}: {e}")
+            return False
+
+
+sync_coordinator = SyncCoordinator()
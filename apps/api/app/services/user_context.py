@@ -0,0 +1,94 @@
+"""
+User Context
+Loads a user with their calendar connection and timezone once per request or task.
+"""
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+import pytz
+from flask import g
+
+from app import db
+from app.models import User, CalendarConnection, UserAcceptanceStats
+
+
+@dataclass
+class UserContext:
+    """Identity shared by services within one request or task"""
+    user: User
+    connection: Optional[CalendarConnection]
+    acceptance: Optional[UserAcceptanceStats]
+    timezone: str
+    tz: pytz.BaseTzInfo
+
+    @property
+    def user_id(self):
+        return self.user.id
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def today_start(self) -> datetime:
+        """Midnight today in the user's timezone"""
+        return self.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _memo() -> Dict:
+    # g lives for the app context: one HTTP request or one task body
+    if not hasattr(g, 'user_contexts'):
+        g.user_contexts = {}
+    return g.user_contexts
+
+
+def _key(user_id) -> str:
+    return str(user_id)
+
+
+def load_user_context(user_id) -> Optional[UserContext]:
+    """Fetch user, connection and acceptance stats in one query, bypassing the memo"""
+    if isinstance(user_id, str):
+        try:
+            user_id = uuid.UUID(user_id)
+        except ValueError:
+            return None
+
+    row = db.session.query(User, CalendarConnection, UserAcceptanceStats).outerjoin(
+        CalendarConnection, CalendarConnection.user_id == User.id
+    ).outerjoin(
+        UserAcceptanceStats, UserAcceptanceStats.user_id == User.id
+    ).filter(User.id == user_id).first()
+
+    if not row:
+        return None
+
+    user, connection, acceptance = row
+    # Read before any commit expires the instance
+    timezone = user.timezone or 'UTC'
+    return UserContext(user, connection, acceptance, timezone, pytz.timezone(timezone))
+
+
+def get_user_context(user_id) -> UserContext:
+    """
+    Memoized UserContext for the current request or task.
+    Raises ValueError when the user doesn't exist.
+    """
+    memo = _memo()
+    if _key(user_id) in memo:
+        return memo[_key(user_id)]
+
+    context = load_user_context(user_id)
+    if context is None:
+        raise ValueError(f"User {user_id} not found")
+
+    memo[_key(user_id)] = context
+    return context
+
+
+def invalidate_user_context(user_id) -> None:
+    """
+    Drop the memo after creating or deleting the user's connection, and after
+    each user in a task that loops over many users in one app context.
+    """
+    _memo().pop(_key(user_id), None)
@@ -0,0 +1,57 @@
+"""
+Celery tasks for analytics rollups.
+"""
+import logging
+from datetime import date
+from celery_app import celery
+
+from app import create_app
+from app.services.analytics_service import AnalyticsRollupService
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(name='rollup_company_analytics')
+def rollup_company_analytics():
+    """
+    Periodic task to fold newly completed breaks into company_analytics.
+    Should be scheduled every few minutes; each run only touches changed days.
+    """
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            rows = AnalyticsRollupService().rollup_changed()
+            return {
+                'status': 'success',
+                'rows_upserted': rows
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to roll up company analytics: {e}")
+            return {'status': 'error', 'message': str(e)}
+
+
+@celery.task(name='backfill_company_analytics')
+def backfill_company_analytics(start_date: str, end_date: str, batch_days: int = 7):
+    """
+    Recompute company_analytics for a historical range [start_date, end_date).
+    Dates are ISO formatted (YYYY-MM-DD).
+    """
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            rows = AnalyticsRollupService().backfill(
+                date.fromisoformat(start_date),
+                date.fromisoformat(end_date),
+                batch_days
+            )
+            return {
+                'status': 'success',
+                'rows_upserted': rows
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to backfill company analytics: {e}")
+            return {'status': 'error', 'message': str(e)}
\ No newline at end of file
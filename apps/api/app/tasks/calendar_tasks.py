@@ -9,6 +9,13 @@ from app import create_app, db
 from app.models import User, CalendarConnection
 from app.services.calendar_service import CalendarService
 from app.services.recommendation_service import RecommendationService
+from app.services.retention_service import RetentionSweeper
+from app.services.sync_coordinator import sync_coordinator
+from app.services.user_context import get_user_context, invalidate_user_context
+from app.tasks import telemetry
+from app.utils.db_routing import use_replica
+from app.utils.event_stream import publish_user_event
+from app.utils.timing import span
 
 logger = logging.getLogger(__name__)
 
@@ -16,22 +23,29 @@ logger = logging.getLogger(__name__)
 @celery.task(bind=True, max_retries=3)
 def sync_user_calendar(self, user_id: int, days_ahead: int = 7):
     """
-    Sync a user's calendar events from Google Calendar.
+    Sync a user's calendar events from their calendar provider.
     This is the main async task triggered by calendar connection.
+    Enqueue through sync_coordinator.request_sync; a user's syncs never overlap.
     """
     app = create_app()
     
     with app.app_context():
+        if not sync_coordinator.acquire(user_id, self.request.id):
+            logger.info(f"Calendar sync for user {user_id} already running; follow-up requested")
+            return {'status': 'coalesced', 'user_id': user_id}
+        
+        retrying = False
         try:
             logger.info(f"Starting calendar sync for user {user_id}")
             
             # Check if user exists and has calendar connection
-            user = User.query.get(user_id)
-            if not user:
+            try:
+                context = get_user_context(user_id)
+            except ValueError:
                 logger.error(f"User {user_id} not found")
                 return {'status': 'error', 'message': 'User not found'}
             
-            connection = CalendarConnection.query.filter_by(user_id=user_id).first()
+            connection = context.connection
             if not connection:
                 logger.error(f"No calendar connection for user {user_id}")
                 return {'status': 'error', 'message': 'No calendar connection'}
@@ -39,11 +53,13 @@ def sync_user_calendar(self, user_id: int, days_ahead: int = 7):
             # Perform calendar sync
             calendar_service = CalendarService()
             synced_count = calendar_service.sync_calendar_events(user_id, days_ahead)
+            telemetry.annotate(calendar_id=connection.calendar_id or 'primary')
             
             # Generate recommendations after sync
             try:
-                recommendation_service = RecommendationService()
-                recommendation_service.generate_and_store_recommendations(user_id)
+                with span('recommendations'):
+                    recommendation_service = RecommendationService()
+                    recommendation_service.generate_and_store_recommendations(user_id)
                 logger.info(f"Generated recommendations after sync for user {user_id}")
             except Exception as e:
                 logger.warning(f"Failed to generate recommendations for user {user_id}: {e}")
@@ -56,6 +72,15 @@ def sync_user_calendar(self, user_id: int, days_ahead: int = 7):
                 'sync_time': datetime.utcnow().isoformat()
             }
             
+            current = telemetry.current_telemetry()
+            if current:
+                telemetry.record_sync_cost(user_id, connection.calendar_id, current.summary())
+            
+            publish_user_event(user_id, 'sync_completed', {
+                'sync_task_id': self.request.id,
+                'events_synced': synced_count
+            })
+            
             logger.info(f"Calendar sync completed for user {user_id}: {synced_count} events")
             return result
             
@@ -67,14 +92,21 @@ def sync_user_calendar(self, user_id: int, days_ahead: int = 7):
                 # Exponential backoff: 30s, 2m, 8m
                 delay = 30 * (4 ** self.request.retries)
                 logger.info(f"Retrying calendar sync for user {user_id} in {delay} seconds")
+                # The retry keeps the lease, so requests meanwhile become one follow-up
+                retrying = True
                 raise self.retry(countdown=delay, exc=e)
             
+            publish_user_event(user_id, 'sync_failed', {'sync_task_id': self.request.id})
             return {
                 'status': 'error',
                 'user_id': user_id,
                 'message': str(e),
                 'retries': self.request.retries
             }
+        
+        finally:
+            if not retrying and sync_coordinator.release(user_id, self.request.id):
+                sync_coordinator.request_sync(user_id)
 
 
 @celery.task
@@ -90,18 +122,20 @@ def sync_all_users_calendars():
             # Find users who need calendar sync (last sync > 1 hour ago)
             cutoff_time = datetime.utcnow() - timedelta(hours=1)
             
-            connections = CalendarConnection.query.filter(
-                db.or_(
-                    CalendarConnection.last_sync_at.is_(None),
-                    CalendarConnection.last_sync_at < cutoff_time
-                )
-            ).all()
+            # A lagging replica at worst queues a sync that was just done
+            with use_replica():
+                connections = CalendarConnection.query.filter(
+                    db.or_(
+                        CalendarConnection.last_sync_at.is_(None),
+                        CalendarConnection.last_sync_at < cutoff_time
+                    )
+                ).all()
             
             synced_users = []
             for connection in connections:
                 try:
-                    # Trigger async sync for each user
-                    sync_user_calendar.delay(connection.user_id)
+                    # Users with a sync already queued or running aren't queued twice
+                    sync_coordinator.request_sync(connection.user_id)
                     synced_users.append(connection.user_id)
                 except Exception as e:
                     logger.error(f"Failed to queue sync for user {connection.user_id}: {e}")
@@ -129,9 +163,10 @@ def generate_daily_recommendations():
     with app.app_context():
         try:
             # Find all users with calendar connections
-            users_with_calendars = db.session.query(User.id).join(
-                CalendarConnection, User.id == CalendarConnection.user_id
-            ).all()
+            with use_replica():
+                users_with_calendars = db.session.query(User.id).join(
+                    CalendarConnection, User.id == CalendarConnection.user_id
+                ).all()
             
             recommendation_service = RecommendationService()
             generated_count = 0
@@ -142,6 +177,9 @@ def generate_daily_recommendations():
                     generated_count += 1
                 except Exception as e:
                     logger.error(f"Failed to generate recommendations for user {user_id}: {e}")
+                finally:
+                    # One app context spans every user; don't keep each one's rows alive
+                    invalidate_user_context(user_id)
             
             logger.info(f"Generated recommendations for {generated_count} users")
             return {
@@ -157,27 +195,22 @@ def generate_daily_recommendations():
 @celery.task
 def cleanup_old_calendar_events():
     """
-    Periodic task to clean up old calendar events.
-    Should be scheduled to run daily.
+    Periodic retention sweep for calendar events, expired recommendations and
+    old completed breaks. Should be scheduled to run daily.
+    Deletes in throttled batches so it never holds long locks.
     """
     app = create_app()
     
     with app.app_context():
         try:
-            # Delete events older than 30 days
-            cutoff_date = datetime.utcnow() - timedelta(days=30)
-            
-            from app.models import CalendarEvent
-            deleted_count = CalendarEvent.query.filter(
-                CalendarEvent.start_time < cutoff_date
-            ).delete()
+            deleted = RetentionSweeper().sweep_all()
+            telemetry.annotate(rows_deleted=sum(deleted.values()))
             
-            db.session.commit()
-            
-            logger.info(f"Cleaned up {deleted_count} old calendar events")
+            logger.info(f"Retention sweep deleted {deleted}")
             return {
                 'status': 'success',
-                'events_deleted': deleted_count
+                'events_deleted': deleted.get('calendar_events', 0),
+                'rows_deleted': deleted
             }
             
         except Exception as e:
@@ -200,23 +233,14 @@ def refresh_expired_tokens():
             refreshed_count = 0
             
             # Find connections that might have expired tokens
-            # Google tokens typically expire after 1 hour
+            # Google and Microsoft tokens typically expire after 1 hour
             connections = CalendarConnection.query.all()
             
             for connection in connections:
                 try:
-                    # Test current token
-                    headers = {'Authorization': f'Bearer {connection.access_token}'}
-                    import requests
-                    response = requests.get(
-                        'https://www.googleapis.com/calendar/v3/users/me/settings/timezone',
-                        headers=headers,
-                        timeout=5
-                    )
-                    
-                    # If token is invalid (401), refresh it
-                    if response.status_code == 401 and connection.refresh_token:
-                        calendar_service.refresh_access_token(connection)
+                    # Refreshes only when the provider rejects the current token
+                    previous_token = connection.access_token
+                    if calendar_service.get_valid_access_token(connection) != previous_token:
                         refreshed_count += 1
                         
                 except Exception as e:
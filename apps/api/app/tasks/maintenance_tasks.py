@@ -0,0 +1,53 @@
+"""
+Celery tasks for database maintenance.
+"""
+import logging
+from celery_app import celery
+
+from app import create_app
+from app.services.partition_service import PartitionService
+from app.services.recommendation_expiry import RecommendationExpiryService
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(name='maintain_partitions')
+def maintain_partitions():
+    """
+    Daily task creating upcoming monthly partitions and dropping expired ones.
+    Dropping a partition replaces row-by-row retention deletes.
+    """
+    app = create_app()
+
+    with app.app_context():
+        try:
+            partitions = PartitionService().run_maintenance()
+            return {
+                'status': 'success',
+                'partitions': partitions
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to maintain partitions: {e}")
+            return {'status': 'error', 'message': str(e)}
+
+
+@celery.task(name='expire_recommendations')
+def expire_recommendations():
+    """
+    Frequent task marking pending recommendations past expires_at as expired.
+    Keeps the pending rows read by /recommendations/today limited to live ones.
+    """
+    app = create_app()
+
+    with app.app_context():
+        try:
+            expired = RecommendationExpiryService().expire_pending()
+            return {
+                'status': 'success',
+                'recommendations_expired': expired
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to expire recommendations: {e}")
+            return {'status': 'error', 'message': str(e)}
@@ -0,0 +1,59 @@
+"""
+Celery tasks for per-user progress aggregates.
+"""
+import logging
+from celery_app import celery
+
+from app import create_app
+from app.services.break_buffer import break_buffer
+from app.services.streak_service import StreakService
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(name='reconcile_user_streaks')
+def reconcile_user_streaks():
+    """
+    Nightly task rebuilding all streaks from completed breaks.
+    Fixes drift from late or out-of-order completions and resets broken streaks.
+    """
+    app = create_app()
+
+    with app.app_context():
+        try:
+            rows = StreakService().reconcile_all()
+            return {
+                'status': 'success',
+                'streaks_updated': rows
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to reconcile user streaks: {e}")
+            return {'status': 'error', 'message': str(e)}
+
+
+@celery.task(name='flush_break_buffer')
+def flush_break_buffer():
+    """
+    Frequent task writing buffered break progress and completions to the database.
+    Each batch is one transaction; completions update streaks and daily activity.
+    """
+    app = create_app()
+
+    with app.app_context():
+        try:
+            batch_size = app.config.get('BREAK_FLUSH_BATCH_SIZE', 500)
+            flushed = 0
+            while True:
+                written = break_buffer.flush(batch_size)
+                flushed += written
+                if written < batch_size:
+                    break
+            return {
+                'status': 'success',
+                'breaks_flushed': flushed
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to flush break buffer: {e}")
+            return {'status': 'error', 'message': str(e)}
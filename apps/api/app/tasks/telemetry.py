@@ -0,0 +1,314 @@
+"""
+Structured telemetry for Celery tasks.
+Records queue latency, runtime, stage breakdowns and retries for every task,
+aggregates them in Redis so all worker processes report through one /metrics
+scrape, and tracks the most expensive calendar syncs per user.
+"""
+import bisect
+import json
+import logging
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence
+
+from celery import Task
+from celery.exceptions import Retry
+from celery.signals import before_task_publish
+
+from app.utils.metrics import registry, format_labels, DEFAULT_BUCKETS, COUNT_BUCKETS
+from app.utils.query_budget import start_log, stop_log, check_budget
+from app.utils.redis_client import get_redis
+from app.utils.timing import start_timer, stop_timer, current_timer
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY_PREFIX = 'telemetry:metrics:'
+SLOWEST_USERS_KEY = 'telemetry:sync:slowest_users'
+LARGEST_CALENDARS_KEY = 'telemetry:sync:largest_calendars'
+SYNC_DETAIL_KEY = 'telemetry:sync:last:{}'
+AGGREGATE_TTL_SECONDS = 7 * 24 * 3600
+
+QUEUE_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+RUNTIME_BUCKETS = DEFAULT_BUCKETS + (30.0, 60.0, 300.0, 900.0)
+
+_current_telemetry: ContextVar[Optional['TaskTelemetry']] = ContextVar('task_telemetry', default=None)
+
+
+class SharedHistogram:
+    """
+    Histogram whose state lives in a Redis hash.
+    Observations from every worker process are merged and rendered by the API's /metrics.
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str],
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self.key = f'{METRICS_KEY_PREFIX}{name}'
+
+    def observe(self, pipe, value: float, **labels) -> None:
+        """Queue an observation on a Redis pipeline"""
+        label_key = json.dumps([str(labels.get(name, '')) for name in self.label_names])
+        index = bisect.bisect_left(self.buckets, value)
+        pipe.hincrby(self.key, f'{label_key}|b{index}', 1)
+        pipe.hincrbyfloat(self.key, f'{label_key}|sum', value)
+        pipe.hincrby(self.key, f'{label_key}|count', 1)
+
+    def render(self, fields: Dict[str, str]) -> List[str]:
+        series: Dict[str, Dict[str, float]] = {}
+        for field, value in fields.items():
+            label_key, _, suffix = field.rpartition('|')
+            series.setdefault(label_key, {})[suffix] = float(value)
+
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        for label_key, values in series.items():
+            label_values = tuple(json.loads(label_key))
+            cumulative = 0
+            for index, bound in enumerate(self.buckets + (float('inf'),)):
+                cumulative += int(values.get(f'b{index}', 0))
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                labels = format_labels(self.label_names, label_values, f'le="{le}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.label_names, label_values)
+            lines.append(f'{self.name}_sum{labels} {values.get("sum", 0.0)}')
+            lines.append(f'{self.name}_count{labels} {int(values.get("count", 0))}')
+        return lines
+
+
+class SharedCounter:
+    """Counter whose state lives in a Redis hash"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.key = f'{METRICS_KEY_PREFIX}{name}'
+
+    def inc(self, pipe, amount: float = 1, **labels) -> None:
+        label_key = json.dumps([str(labels.get(name, '')) for name in self.label_names])
+        pipe.hincrbyfloat(self.key, label_key, amount)
+
+    def render(self, fields: Dict[str, str]) -> List[str]:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} counter',
+        ]
+        for label_key, value in fields.items():
+            labels = format_labels(self.label_names, tuple(json.loads(label_key)))
+            lines.append(f'{self.name}{labels} {float(value)}')
+        return lines
+
+
+TASK_QUEUE_SECONDS = SharedHistogram(
+    'celery_task_queue_seconds', 'Time tasks waited in the queue', ('task',), QUEUE_BUCKETS
+)
+TASK_RUNTIME_SECONDS = SharedHistogram(
+    'celery_task_runtime_seconds', 'Task execution time', ('task', 'state'), RUNTIME_BUCKETS
+)
+TASK_STAGE_SECONDS = SharedHistogram(
+    'celery_task_stage_seconds', 'Time spent in named task stages', ('task', 'stage'), RUNTIME_BUCKETS
+)
+TASK_DB_QUERIES = SharedHistogram(
+    'celery_task_db_queries', 'SQL statements executed per task', ('task',), COUNT_BUCKETS
+)
+TASK_RETRIES = SharedCounter('celery_task_retries_total', 'Task retries scheduled', ('task',))
+TASK_EVENTS_PROCESSED = SharedCounter(
+    'celery_task_events_processed_total', 'Calendar events processed by tasks', ('task',)
+)
+SHARED_METRICS = (
+    TASK_QUEUE_SECONDS, TASK_RUNTIME_SECONDS, TASK_STAGE_SECONDS,
+    TASK_DB_QUERIES, TASK_RETRIES, TASK_EVENTS_PROCESSED,
+)
+
+
+class TaskTelemetry:
+    """Telemetry collected for one task execution"""
+
+    def __init__(self, task_name: str, queue_seconds: Optional[float], retries: int):
+        self.task_name = task_name
+        self.queue_seconds = queue_seconds
+        self.retries = retries
+        self.attributes: Dict = {}
+
+    def annotate(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def summary(self) -> Dict:
+        timer = current_timer()
+        data = timer.summary() if timer else {}
+        data.update({
+            'queue_ms': round(self.queue_seconds * 1000, 2) if self.queue_seconds is not None else None,
+            'retries': self.retries,
+        })
+        data.update(self.attributes)
+        return data
+
+
+def current_telemetry() -> Optional[TaskTelemetry]:
+    """Get telemetry of the running task, if any"""
+    return _current_telemetry.get()
+
+
+def annotate(**attributes) -> None:
+    """Attach attributes (e.g. events_processed) to the running task's telemetry"""
+    telemetry = _current_telemetry.get()
+    if telemetry is not None:
+        telemetry.annotate(**attributes)
+
+
+@before_task_publish.connect
+def _stamp_sent_at(headers=None, **kwargs):
+    """Record the publish time so workers can measure queue latency"""
+    if headers is not None:
+        # Overwrite: retries republish with the original headers, and their wait
+        # starts now, not when the first attempt was sent
+        headers['sent_at'] = time.time()
+
+
+def _queue_latency(request) -> Optional[float]:
+    sent_at = getattr(request, 'sent_at', None)
+    if sent_at is None:
+        return None
+    # Scheduled retries and countdowns are not queue wait
+    ready_at = float(sent_at)
+    eta = getattr(request, 'eta', None)
+    if eta:
+        try:
+            from dateutil import parser
+            ready_at = max(ready_at, parser.isoparse(eta).timestamp())
+        except (TypeError, ValueError):
+            pass
+    return max(time.time() - ready_at, 0.0)
+
+
+class TelemetryTask(Task):
+    """
+    Base class for all tasks.
+    Times every execution and attaches the telemetry summary to dict results.
+    """
+
+    def __call__(self, *args, **kwargs):
+        telemetry = TaskTelemetry(self.name, _queue_latency(self.request), self.request.retries or 0)
+        timer_token = start_timer()
+        telemetry_token = _current_telemetry.set(telemetry)
+        config = get_config()
+        query_log, query_token = (None, None)
+        if config.QUERY_BUDGET_MODE != 'off':
+            query_log, query_token = start_log(self.name)
+        state = 'success'
+        try:
+            result = super().__call__(*args, **kwargs)
+            if isinstance(result, dict):
+                if result.get('status') == 'error':
+                    state = 'error'
+                result['telemetry'] = telemetry.summary()
+            return result
+        except Retry:
+            state = 'retry'
+            raise
+        except Exception:
+            state = 'failure'
+            raise
+        finally:
+            try:
+                _record(telemetry, state)
+                if query_log is not None:
+                    # Tasks loop over users by design, so only flag repeated statement shapes
+                    for violation in check_budget(query_log, max_repeats=config.QUERY_TASK_REPEAT_THRESHOLD):
+                        logger.warning(violation)
+            finally:
+                if query_token is not None:
+                    stop_log(query_token)
+                _current_telemetry.reset(telemetry_token)
+                stop_timer(timer_token)
+
+
+def _record(telemetry: TaskTelemetry, state: str) -> None:
+    """Push one task's telemetry to the shared aggregates"""
+    timer = current_timer()
+    if timer is None:
+        return
+
+    task = telemetry.task_name
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        if telemetry.queue_seconds is not None:
+            TASK_QUEUE_SECONDS.observe(pipe, telemetry.queue_seconds, task=task)
+        TASK_RUNTIME_SECONDS.observe(pipe, timer.elapsed, task=task, state=state)
+        for stage, seconds in timer.stages.items():
+            TASK_STAGE_SECONDS.observe(pipe, seconds, task=task, stage=stage)
+        TASK_DB_QUERIES.observe(pipe, timer.db_queries, task=task)
+        if state == 'retry':
+            TASK_RETRIES.inc(pipe, task=task)
+        events = telemetry.attributes.get('events_processed')
+        if events:
+            TASK_EVENTS_PROCESSED.inc(pipe, events, task=task)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to record telemetry for task {task}: {e}")
+
+    logger.info(json.dumps({'event': 'task_telemetry', 'task': task, 'state': state, **telemetry.summary()},
+                           default=str))
+
+
+def record_sync_cost(user_id, calendar_id: Optional[str], summary: Dict) -> None:
+    """
+    Track per-user and per-calendar sync cost.
+    Sorted sets keep the latest sync of each user so the slowest ones can be listed.
+    """
+    try:
+        total_ms = summary.get('total_ms') or 0
+        events = summary.get('events_processed') or 0
+        calendar_key = f'{user_id}:{calendar_id or "primary"}'
+
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.zadd(SLOWEST_USERS_KEY, {str(user_id): total_ms})
+        pipe.zadd(LARGEST_CALENDARS_KEY, {calendar_key: events})
+        pipe.set(SYNC_DETAIL_KEY.format(user_id), json.dumps(summary, default=str), ex=AGGREGATE_TTL_SECONDS)
+        pipe.expire(SLOWEST_USERS_KEY, AGGREGATE_TTL_SECONDS)
+        pipe.expire(LARGEST_CALENDARS_KEY, AGGREGATE_TTL_SECONDS)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to record sync cost for user {user_id}: {e}")
+
+
+def get_slowest_syncs(limit: int = 20) -> List[Dict]:
+    """Users whose latest sync took the longest, with their stage breakdown"""
+    client = get_redis()
+    ranked = client.zrevrange(SLOWEST_USERS_KEY, 0, limit - 1, withscores=True)
+    details = client.mget([SYNC_DETAIL_KEY.format(user_id) for user_id, _ in ranked]) if ranked else []
+    return [
+        {'user_id': user_id, 'total_ms': total_ms, 'detail': json.loads(detail) if detail else None}
+        for (user_id, total_ms), detail in zip(ranked, details)
+    ]
+
+
+def get_largest_calendars(limit: int = 20) -> List[Dict]:
+    """Calendars with the most events processed in their latest sync"""
+    ranked = get_redis().zrevrange(LARGEST_CALENDARS_KEY, 0, limit - 1, withscores=True)
+    results = []
+    for member, events in ranked:
+        user_id, _, calendar_id = member.partition(':')
+        results.append({'user_id': user_id, 'calendar_id': calendar_id, 'events': int(events)})
+    return results
+
+
+def render_shared_metrics() -> List[str]:
+    """Metrics collector rendering the worker aggregates stored in Redis"""
+    pipe = get_redis().pipeline(transaction=False)
+    for metric in SHARED_METRICS:
+        pipe.hgetall(metric.key)
+    lines = []
+    for metric, fields in zip(SHARED_METRICS, pipe.execute()):
+        if fields:
+            lines.extend(metric.render(fields))
+    return lines
+
+
+registry.add_collector(render_shared_metrics)
@@ -2,10 +2,12 @@ from flask import jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from . import users_bp
 from app.models.user import User
+from app.utils.db_routing import read_replica
 
 
 @users_bp.route('/me', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_current_user():
     """Get current user profile"""
     try:
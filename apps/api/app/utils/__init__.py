@@ -0,0 +1 @@
+"""Shared infrastructure helpers (metrics, timing, database utilities)."""
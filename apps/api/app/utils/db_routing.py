@@ -0,0 +1,185 @@
+"""
+Read-replica routing and connection pool sizing.
+Read-only views and reporting reads go to replica binds; writes, flushes and
+users who wrote within the last few seconds stay on the primary.
+"""
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List
+
+import redis
+from flask import Flask, current_app, g, has_request_context
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.metrics import registry
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND_PREFIX = 'replica_'
+STICKY_KEY_PREFIX = 'db:sticky:'
+
+_use_replica: ContextVar[bool] = ContextVar('use_replica', default=False)
+
+# Engines of the most recently initialized app, by bind name, for pool metrics
+_engines: Dict[str, Engine] = {}
+_collector_installed = False
+
+DB_POOL_IN_USE = registry.gauge(
+    'db_pool_connections_in_use', 'Connections checked out of the pool', ('bind',)
+)
+DB_POOL_IDLE = registry.gauge(
+    'db_pool_connections_idle', 'Connections idle in the pool', ('bind',)
+)
+DB_POOL_SATURATION = registry.gauge(
+    'db_pool_saturation', 'Checked-out connections over pool_size + max_overflow', ('bind',)
+)
+DB_ROUTED_READS = registry.counter(
+    'db_routed_reads_total', 'Read-only units of work by target', ('target',)
+)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends statements to a replica while a replica scope is active.
+    Flushes and DML always use the primary, so an accidental write inside a
+    replica scope can't reach a read-only server.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _use_replica.get() and not self._flushing and not getattr(clause, 'is_dml', False):
+            replicas = replica_engines(self._db.engines)
+            if replicas:
+                return random.choice(replicas)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _note_flush(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _note_execute(orm_execute_state):
+    # Bulk DML and textual SQL bypass the flush
+    if has_request_context() and not orm_execute_state.is_select:
+        g.db_wrote = True
+
+
+def replica_engines(engines) -> List[Engine]:
+    return [engine for key, engine in engines.items() if key and key.startswith(REPLICA_BIND_PREFIX)]
+
+
+def replicas_configured() -> bool:
+    return any(key.startswith(REPLICA_BIND_PREFIX) for key in _engines)
+
+
+@contextmanager
+def use_replica():
+    """
+    Route reads in this block to a replica.
+    Only for reads that tolerate replication lag, e.g. reporting scans.
+    """
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def mark_recent_write(user_id) -> None:
+    """Pin the user to the primary long enough for replicas to catch up"""
+    if not user_id or not replicas_configured():
+        return
+    try:
+        get_redis().set(f'{STICKY_KEY_PREFIX}{user_id}', 1, ex=current_app.config.get('REPLICA_STICKY_SECONDS', 10))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to mark recent write for user {user_id}: {e}")
+
+
+def has_recent_write(user_id) -> bool:
+    try:
+        return bool(get_redis().exists(f'{STICKY_KEY_PREFIX}{user_id}'))
+    except redis.RedisError as e:
+        # Without the marker we can't rule out a stale read
+        logger.warning(f"Failed to check recent writes for user {user_id}: {e}")
+        return True
+
+
+def read_replica(view):
+    """
+    Serve a read-only view from a replica unless the caller wrote recently.
+    Apply below @jwt_required() so the identity is available.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not replicas_configured() or has_recent_write(get_jwt_identity()):
+            DB_ROUTED_READS.inc(target='primary')
+            return view(*args, **kwargs)
+        DB_ROUTED_READS.inc(target='replica')
+        with use_replica():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def configure_engines(app: Flask) -> None:
+    """
+    Size pools for the process role and register replica binds.
+    Must run before db.init_app.
+    """
+    worker = app.config.get('PROCESS_ROLE') == 'worker'
+    pool_options = {
+        'pool_size': app.config['WORKER_DB_POOL_SIZE' if worker else 'DB_POOL_SIZE'],
+        'max_overflow': app.config['WORKER_DB_MAX_OVERFLOW' if worker else 'DB_MAX_OVERFLOW'],
+    }
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}), **pool_options}
+
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    for index, url in enumerate(app.config.get('DATABASE_REPLICA_URLS') or []):
+        # Bind options don't inherit SQLALCHEMY_ENGINE_OPTIONS
+        binds[f'{REPLICA_BIND_PREFIX}{index}'] = {'url': url, **app.config['SQLALCHEMY_ENGINE_OPTIONS']}
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+
+def _collect_pool_metrics():
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        if not hasattr(pool, 'checkedout'):
+            continue
+        in_use = pool.checkedout()
+        capacity = pool.size() + max(getattr(pool, '_max_overflow', 0), 0)
+        DB_POOL_IN_USE.set(in_use, bind=name)
+        DB_POOL_IDLE.set(pool.checkedin(), bind=name)
+        DB_POOL_SATURATION.set(round(in_use / capacity, 3) if capacity else 0, bind=name)
+
+
+def init_app(app: Flask) -> None:
+    """Track the app's engines for pool metrics and pin users after their writes"""
+    from app import db
+
+    global _collector_installed
+    with app.app_context():
+        engines = db.engines
+    _engines.clear()
+    _engines.update({key or 'primary': engine for key, engine in engines.items()})
+
+    if not _collector_installed:
+        registry.add_collector(_collect_pool_metrics)
+        _collector_installed = True
+
+    @app.after_request
+    def _pin_writer_to_primary(response):
+        if g.pop('db_wrote', False) and replicas_configured():
+            try:
+                user_id = get_jwt_identity()
+            except RuntimeError:
+                user_id = None
+            mark_recent_write(user_id)
+        return response
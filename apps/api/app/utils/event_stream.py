@@ -0,0 +1,156 @@
+"""
+Per-user server-sent events over Redis pub/sub.
+Producers publish to a user's channel from any process; each API process keeps
+one pub/sub connection and fans messages out to its open streams.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, Optional, Set
+
+from redis.exceptions import RedisError
+
+from app.utils.metrics import registry
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'events:user:'
+# Events buffered per stream before a slow client starts losing them
+STREAM_QUEUE_SIZE = 100
+
+EVENTS_PUBLISHED = registry.counter('user_events_published_total', 'Events published to user streams', ('event',))
+EVENTS_DROPPED = registry.counter('user_events_dropped_total', 'Events dropped because a stream fell behind')
+STREAMS_OPEN = registry.gauge('user_event_streams_open', 'Open event streams in this process')
+
+
+def _channel(user_id) -> str:
+    return f'{CHANNEL_PREFIX}{user_id}'
+
+
+def publish_user_event(user_id, event: str, data: Optional[Dict] = None) -> None:
+    """
+    Notify the user's open streams. Best effort: call after committing, and
+    clients refetch state on reconnect, so a lost event only delays an update.
+    """
+    message = json.dumps({'id': uuid.uuid4().hex, 'event': event, 'data': data or {}}, default=str)
+    try:
+        get_redis().publish(_channel(user_id), message)
+        EVENTS_PUBLISHED.inc(event=event)
+    except RedisError as e:
+        logger.warning(f"Failed to publish {event} for user {user_id}: {e}")
+
+
+def format_sse(message: Dict) -> str:
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+class EventHub:
+    """
+    Routes pub/sub messages to local stream queues.
+    A single listener thread owns the pub/sub connection and subscribes only to
+    channels of users with an open stream in this process; other threads just
+    register queues, so the connection is never shared across threads.
+    """
+
+    def __init__(self, client_factory=get_redis, poll_seconds: float = 1.0):
+        self._client_factory = client_factory
+        self._poll_seconds = poll_seconds
+        self._streams: Dict[str, Set[queue.Queue]] = {}
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+
+    def subscribe(self, user_id) -> queue.Queue:
+        stream = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        with self._lock:
+            self._streams.setdefault(_channel(user_id), set()).add(stream)
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='event-hub', daemon=True)
+                self._listener.start()
+        return stream
+
+    def unsubscribe(self, user_id, stream: queue.Queue) -> None:
+        with self._lock:
+            streams = self._streams.get(_channel(user_id))
+            if streams is not None:
+                streams.discard(stream)
+                if not streams:
+                    del self._streams[_channel(user_id)]
+
+    def open_streams(self) -> int:
+        with self._lock:
+            return sum(len(streams) for streams in self._streams.values())
+
+    def dispatch(self, channel: str, raw: str) -> None:
+        """Deliver one pub/sub message to every local stream of its channel"""
+        message = json.loads(raw)
+        with self._lock:
+            streams = list(self._streams.get(channel, ()))
+        for stream in streams:
+            try:
+                stream.put_nowait(message)
+            except queue.Full:
+                EVENTS_DROPPED.inc()
+
+    def _sync_channels(self, pubsub, subscribed: Set[str]) -> None:
+        with self._lock:
+            wanted = set(self._streams)
+        if wanted - subscribed:
+            pubsub.subscribe(*(wanted - subscribed))
+        # Unsubscribing with no arguments would drop every channel
+        if subscribed - wanted:
+            pubsub.unsubscribe(*(subscribed - wanted))
+        subscribed.clear()
+        subscribed.update(wanted)
+
+    def _listen(self) -> None:
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._client_factory().pubsub(ignore_subscribe_messages=True)
+                subscribed: Set[str] = set()
+                while True:
+                    self._sync_channels(pubsub, subscribed)
+                    message = pubsub.get_message(timeout=self._poll_seconds)
+                    if message and message['type'] == 'message':
+                        try:
+                            self.dispatch(message['channel'], message['data'])
+                        except ValueError:
+                            logger.warning(f"Dropped malformed event on {message['channel']}")
+            except RedisError as e:
+                logger.warning(f"Event hub lost its Redis subscription, reconnecting: {e}")
+            except Exception as e:
+                logger.error(f"Event hub listener failed, restarting: {e}")
+            finally:
+                if pubsub is not None:
+                    pubsub.close()
+            time.sleep(self._poll_seconds)
+
+    def stream(self, user_id, until: float, keepalive_seconds: float = 15) -> Iterator[str]:
+        """
+        SSE frames for one client until `until` (epoch seconds), e.g. token expiry.
+        Comment frames keep proxies from closing an idle connection.
+        """
+        events = self.subscribe(user_id)
+        try:
+            # Reconnect quickly after the server ends the stream
+            yield 'retry: 3000\n\n'
+            while True:
+                remaining = until - time.time()
+                if remaining <= 0:
+                    return
+                try:
+                    message = events.get(timeout=min(keepalive_seconds, remaining))
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_sse(message)
+        finally:
+            self.unsubscribe(user_id, events)
+
+
+event_hub = EventHub()
+registry.add_collector(lambda: STREAMS_OPEN.set(event_hub.open_streams()))
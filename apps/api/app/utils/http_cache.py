@@ -0,0 +1,62 @@
+"""
+Conditional and precompressed JSON responses.
+Bodies are encoded and gzipped once, then served with strong ETags.
+"""
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+
+from flask import Request, Response
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """A JSON payload encoded once in both identity and gzip form"""
+    raw: bytes
+    gzipped: bytes
+    etag: str  # Quoted strong validator of the identity encoding
+
+
+def encode_body(payload) -> EncodedBody:
+    raw = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str).encode()
+    digest = hashlib.sha256(raw).hexdigest()[:32]
+    # mtime=0 keeps the gzip bytes identical across processes
+    return EncodedBody(raw, gzip.compress(raw, compresslevel=9, mtime=0), f'"{digest}"')
+
+
+def _gzip_etag(etag: str) -> str:
+    # Each encoding is its own representation, so it needs its own strong ETag
+    return f'{etag[:-1]}-gzip"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when If-None-Match names this body in any encoding"""
+    header = request.headers.get('If-None-Match', '')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return etag in candidates or _gzip_etag(etag) in candidates
+
+
+def cached_json_response(request: Request, body: EncodedBody, max_age: int) -> Response:
+    """
+    Serve a precompressed body, or 304 when the client already has it.
+    Responses are public: only use for data that is the same for every user.
+    """
+    use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    etag = _gzip_etag(body.etag) if use_gzip else body.etag
+
+    if etag_matches(request, body.etag):
+        response = Response(status=304)
+    else:
+        response = Response(body.gzipped if use_gzip else body.raw, mimetype='application/json')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
@@ -0,0 +1,91 @@
+"""
+Bounded execution of outbound HTTP calls made while serving a request.
+A slow upstream costs at most the request's deadline and one of a fixed number
+of executor slots; once the slots are taken, callers fail fast instead of queueing.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Optional
+
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+OUTBOUND_SECONDS = registry.histogram(
+    'outbound_call_seconds', 'Outbound calls made from request handlers, by upstream and outcome', ('upstream', 'outcome')
+)
+OUTBOUND_REJECTED = registry.counter(
+    'outbound_calls_rejected_total', 'Outbound calls refused because every executor slot was taken', ('upstream',)
+)
+
+
+class UpstreamUnavailable(Exception):
+    """The upstream couldn't answer within the request's budget"""
+
+
+class UpstreamTimeout(UpstreamUnavailable):
+    pass
+
+
+class UpstreamBusy(UpstreamUnavailable):
+    pass
+
+
+class Deadline:
+    """Remaining time of a request-wide budget shared by several calls"""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+class BoundedExecutor:
+    """
+    Thread pool for blocking upstream calls with a cap on calls in flight.
+    Submitted functions must not touch the database session or request
+    context: they run on pool threads.
+    """
+
+    def __init__(self, upstream: str, max_workers: int, max_pending: int = 0):
+        self.upstream = upstream
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'outbound-{upstream}')
+        # A call holds its slot until it really finishes, even after the caller gave up
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    def call(self, fn: Callable, *args, deadline: Optional[Deadline] = None, timeout: float = 10, **kwargs):
+        """
+        Run fn and wait at most the deadline's remaining time (or `timeout`).
+        Raises UpstreamBusy when no slot is free and UpstreamTimeout when time runs out.
+        """
+        wait = min(timeout, deadline.remaining()) if deadline else timeout
+        if wait <= 0:
+            raise UpstreamTimeout(f"No time left to call {self.upstream}")
+
+        if not self._slots.acquire(blocking=False):
+            OUTBOUND_REJECTED.inc(upstream=self.upstream)
+            raise UpstreamBusy(f"Too many calls to {self.upstream} in flight")
+
+        started = time.monotonic()
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result = future.result(timeout=wait)
+        except FutureTimeout:
+            future.cancel()
+            OUTBOUND_SECONDS.observe(time.monotonic() - started, upstream=self.upstream, outcome='timeout')
+            raise UpstreamTimeout(f"{self.upstream} did not answer within {wait:.1f}s")
+        except Exception:
+            OUTBOUND_SECONDS.observe(time.monotonic() - started, upstream=self.upstream, outcome='error')
+            raise
+
+        OUTBOUND_SECONDS.observe(time.monotonic() - started, upstream=self.upstream, outcome='ok')
+        return result
@@ -0,0 +1,205 @@
+"""
+Query budgets and N+1 detection.
+Counts SQL statements per request, task or block and flags statement shapes
+that repeat, which is the signature of queries issued inside loops.
+"""
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+from typing import List, Optional, Tuple
+
+from flask import Flask, current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+_active_logs: ContextVar[Tuple['QueryLog', ...]] = ContextVar('query_logs', default=())
+_hooks_installed = False
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_NAMED_PARAM = re.compile(r'%\(\w+\)s|:\w+|%s')
+
+BUDGET_VIOLATIONS = registry.counter(
+    'query_budget_violations_total', 'Requests or tasks that exceeded their query budget', ('scope', 'kind')
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block issues more statements than its budget allows"""
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a statement so queries differing only in parameters compare equal.
+    """
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _NAMED_PARAM.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _IN_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryLog:
+    """Statements executed while the log is active"""
+
+    def __init__(self, name: str = 'block'):
+        self.name = name
+        self.count = 0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str) -> None:
+        self.count += 1
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def report(self) -> str:
+        lines = [f"{self.name}: {self.count} statements"]
+        for shape, count in self.shapes.most_common(5):
+            lines.append(f"  {count}x {shape[:200]}")
+        return '\n'.join(lines)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for log in _active_logs.get():
+        log.record(statement)
+
+
+def install_hooks() -> None:
+    """Attach the statement counter to every engine (idempotent)"""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    _hooks_installed = True
+
+
+def start_log(name: str = 'block'):
+    """Activate a QueryLog in the current context; returns (log, reset token)"""
+    install_hooks()
+    log = QueryLog(name)
+    token = _active_logs.set(_active_logs.get() + (log,))
+    return log, token
+
+
+def stop_log(token) -> None:
+    _active_logs.reset(token)
+
+
+def check_budget(log: QueryLog, max_queries: Optional[int] = None,
+                 max_repeats: Optional[int] = None) -> List[str]:
+    """Return human-readable violations of the budget for a finished log"""
+    violations = []
+    if max_queries is not None and log.count > max_queries:
+        violations.append(f"{log.name} issued {log.count} statements (budget {max_queries})")
+        BUDGET_VIOLATIONS.inc(scope=log.name, kind='count')
+    if max_repeats is not None:
+        for shape, count in log.repeated(max_repeats + 1):
+            violations.append(f"{log.name} repeated a statement {count}x (limit {max_repeats}): {shape[:200]}")
+            BUDGET_VIOLATIONS.inc(scope=log.name, kind='repeat')
+    return violations
+
+
+class query_budget:
+    """
+    Declare a maximum number of statements for a block or function.
+    Fails with QueryBudgetExceeded when the budget is exceeded; intended for tests.
+
+        with query_budget(3, max_repeats=1) as log:
+            client.get('/api/v1/recommendations/history')
+    """
+
+    def __init__(self, max_queries: Optional[int] = None, max_repeats: Optional[int] = None,
+                 name: Optional[str] = None):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.name = name
+        self.log: Optional[QueryLog] = None
+        self._token = None
+
+    def __enter__(self) -> QueryLog:
+        self.log, self._token = start_log(self.name or 'block')
+        return self.log
+
+    def __exit__(self, exc_type, exc, tb):
+        stop_log(self._token)
+        if exc_type is not None:
+            return False
+        violations = check_budget(self.log, self.max_queries, self.max_repeats)
+        if violations:
+            raise QueryBudgetExceeded('\n'.join(violations) + '\n' + self.log.report())
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with query_budget(self.max_queries, self.max_repeats, self.name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def endpoint_budget(max_queries: int, max_repeats: Optional[int] = None):
+    """
+    Declare the query budget of a view function.
+    Enforced per request by the guard installed with init_app.
+    """
+    def decorator(view):
+        view.query_budget = (max_queries, max_repeats)
+        return view
+    return decorator
+
+
+def _view_budget() -> Tuple[Optional[int], Optional[int]]:
+    view = current_app.view_functions.get(request.endpoint) if request.endpoint else None
+    max_queries, max_repeats = getattr(view, 'query_budget', (None, None))
+    if max_queries is None:
+        max_queries = current_app.config.get('QUERY_BUDGET_DEFAULT')
+    if max_repeats is None:
+        max_repeats = current_app.config.get('QUERY_REPEAT_THRESHOLD')
+    return max_queries, max_repeats
+
+
+def init_app(app: Flask) -> None:
+    """
+    Install the per-request guard.
+    QUERY_BUDGET_MODE: 'off', 'warn' (log and count violations) or 'raise' (fail the request).
+    """
+    mode = app.config.get('QUERY_BUDGET_MODE', 'off')
+    if mode == 'off':
+        return
+
+    install_hooks()
+
+    @app.before_request
+    def _start_query_log():
+        g.query_log, g.query_log_token = start_log(request.endpoint or 'unmatched')
+
+    @app.after_request
+    def _check_query_log(response):
+        log = g.get('query_log')
+        if log is None:
+            return response
+        max_queries, max_repeats = _view_budget()
+        violations = check_budget(log, max_queries, max_repeats)
+        if violations:
+            message = '\n'.join(violations) + '\n' + log.report()
+            if mode == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    @app.teardown_request
+    def _stop_query_log(exc):
+        token = g.pop('query_log_token', None)
+        if token is not None:
+            stop_log(token)
@@ -0,0 +1,25 @@
+"""
+Shared Redis client.
+One connection pool per process, created lazily from REDIS_URL.
+"""
+from typing import Optional
+
+import redis
+
+from config import get_config
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Get the process-wide Redis client"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            get_config().REDIS_URL,
+            decode_responses=True,
+            socket_timeout=2,
+            socket_connect_timeout=2,
+            health_check_interval=30,
+        )
+    return _client
@@ -0,0 +1,168 @@
+"""
+Request-scoped stage timing.
+Collects named spans and SQL statistics for the current request or task and
+reports them through the Server-Timing header and the metrics registry.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from flask import Flask, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.metrics import registry, COUNT_BUCKETS
+
+_current_timer: ContextVar[Optional['StageTimer']] = ContextVar('stage_timer', default=None)
+_sql_hooks_installed = False
+
+REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds', 'Total request latency', ('endpoint', 'method', 'status')
+)
+REQUEST_STAGE_DURATION = registry.histogram(
+    'http_request_stage_seconds', 'Time spent in named request stages', ('endpoint', 'stage')
+)
+REQUEST_DB_QUERIES = registry.histogram(
+    'http_request_db_queries', 'SQL statements executed per request', ('endpoint',),
+    buckets=COUNT_BUCKETS
+)
+REQUEST_DB_DURATION = registry.histogram(
+    'http_request_db_seconds', 'Time spent executing SQL per request', ('endpoint',)
+)
+
+
+class StageTimer:
+    """
+    Accumulates stage durations for one unit of work (a request or a task).
+    Repeated spans with the same name are summed.
+    """
+    __slots__ = ('started_at', 'stages', 'db_queries', 'db_seconds')
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def record_query(self, seconds: float) -> None:
+        self.db_queries += 1
+        self.db_seconds += seconds
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def summary(self) -> Dict:
+        """Serializable breakdown in milliseconds"""
+        return {
+            'total_ms': round(self.elapsed * 1000, 2),
+            'stages': {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()},
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_seconds * 1000, 2),
+        }
+
+    def server_timing_header(self) -> str:
+        """Format the timer as a Server-Timing header value"""
+        entries = [f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.stages.items()]
+        entries.append(f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"')
+        entries.append(f'total;dur={self.elapsed * 1000:.1f}')
+        return ', '.join(entries)
+
+
+def current_timer() -> Optional[StageTimer]:
+    """Get the timer of the current request or task, if any"""
+    return _current_timer.get()
+
+
+def start_timer():
+    """Activate a new timer in the current context and return its reset token"""
+    return _current_timer.set(StageTimer())
+
+
+def stop_timer(token) -> None:
+    """Deactivate the timer started with the given token"""
+    _current_timer.reset(token)
+
+
+@contextmanager
+def span(name: str):
+    """
+    Time a stage of the current request or task.
+    A no-op when no timer is active, so services can be instrumented unconditionally.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_timer.get() is not None:
+        conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timer = _current_timer.get()
+    if timer is None:
+        return
+    started = conn.info.get('query_started_at')
+    if started:
+        timer.record_query(time.perf_counter() - started.pop())
+
+
+def install_sql_hooks() -> None:
+    """Attach SQL timing listeners to every engine (idempotent)"""
+    global _sql_hooks_installed
+    if _sql_hooks_installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _sql_hooks_installed = True
+
+
+def init_app(app: Flask) -> None:
+    """Register request timing hooks on the application"""
+    if not app.config.get('REQUEST_TIMING_ENABLED', True):
+        return
+
+    install_sql_hooks()
+    emit_header = app.config.get('SERVER_TIMING_HEADER', True)
+
+    @app.before_request
+    def _start_request_timer():
+        g.stage_timer_token = start_timer()
+
+    @app.after_request
+    def _record_request_timer(response):
+        timer = current_timer()
+        if timer is None:
+            return response
+
+        endpoint = request.endpoint or 'unmatched'
+        REQUEST_DURATION.observe(
+            timer.elapsed, endpoint=endpoint, method=request.method, status=response.status_code
+        )
+        for stage, seconds in timer.stages.items():
+            REQUEST_STAGE_DURATION.observe(seconds, endpoint=endpoint, stage=stage)
+        REQUEST_DB_QUERIES.observe(timer.db_queries, endpoint=endpoint)
+        REQUEST_DB_DURATION.observe(timer.db_seconds, endpoint=endpoint)
+
+        if emit_header:
+            response.headers['Server-Timing'] = timer.server_timing_header()
+        return response
+
+    @app.teardown_request
+    def _stop_request_timer(exc):
+        token = g.pop('stage_timer_token', None)
+        if token is not None:
+            stop_timer(token)
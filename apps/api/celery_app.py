@@ -1,6 +1,11 @@
 """
 Celery application configuration for background tasks.
 """
+import os
+
+# Worker processes size their database pools separately from the web tier
+os.environ.setdefault('PROCESS_ROLE', 'worker')
+
 from celery import Celery
 from config import get_config
 
@@ -11,8 +16,12 @@ celery = Celery(
     'takeabreak',
     broker=config.REDIS_URL,
     backend=config.REDIS_URL,
+    task_cls='app.tasks.telemetry:TelemetryTask',  # Queue latency, stage and retry telemetry
     include=[
         'app.tasks.calendar_tasks',
+        'app.tasks.analytics_tasks',
+        'app.tasks.progress_tasks',
+        'app.tasks.maintenance_tasks',
     ]
 )
 
@@ -48,6 +57,26 @@ celery.conf.beat_schedule = {
         'task': 'refresh_expired_tokens',
         'schedule': 1800.0,  # Every 30 minutes
     },
+    'rollup-company-analytics': {
+        'task': 'rollup_company_analytics',
+        'schedule': 900.0,  # Every 15 minutes
+    },
+    'reconcile-user-streaks': {
+        'task': 'reconcile_user_streaks',
+        'schedule': 86400.0,  # Nightly
+    },
+    'maintain-partitions': {
+        'task': 'maintain_partitions',
+        'schedule': 86400.0,  # Daily; creates partitions months ahead
+    },
+    'expire-recommendations': {
+        'task': 'expire_recommendations',
+        'schedule': 300.0,  # Every 5 minutes
+    },
+    'flush-break-buffer': {
+        'task': 'flush_break_buffer',
+        'schedule': 5.0,  # Bounds how stale completed_breaks can be
+    },
 }
 
 celery.conf.timezone = 'UTC'
@@ -0,0 +1,19 @@
+"""
+Gunicorn settings for the API.
+Cooperative gevent workers let each process hold thousands of idle event
+streams; blocking calls in views yield instead of pinning a worker.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+worker_class = 'gevent'
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 2000))  # Concurrent requests per worker
+timeout = 120
+keepalive = 5
+
+
+def post_fork(server, worker):
+    # psycopg2 blocks the whole worker in C code unless it waits through gevent
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
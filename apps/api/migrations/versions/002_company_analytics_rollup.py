@@ -0,0 +1,32 @@
+"""Company analytics rollup watermarks
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Watermarks for incremental rollup jobs
+    op.create_table('rollup_watermarks',
+        sa.Column('name', sa.String(100), primary_key=True),
+        sa.Column('watermark', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()')),
+    )
+
+    # Finds breaks completed since the last watermark
+    op.create_index('idx_completed_breaks_completed_at', 'completed_breaks', ['completed_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_completed_breaks_completed_at', table_name='completed_breaks')
+    op.drop_table('rollup_watermarks')
@@ -0,0 +1,35 @@
+"""Per-user daily activity rollup
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per user per local day, maintained on break completion
+    op.create_table('user_daily_activity',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('uuid_generate_v4()')),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('break_count', sa.Integer(), server_default='0'),
+        sa.Column('total_seconds', sa.Integer(), server_default='0'),
+        sa.Column('category_counts', sa.JSON(), server_default=sa.text("'{}'::json")),
+        sa.Column('hour_counts', sa.JSON(), server_default=sa.text("'[]'::json")),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()')),
+        sa.UniqueConstraint('user_id', 'date', name='_user_activity_date_uc'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_daily_activity')
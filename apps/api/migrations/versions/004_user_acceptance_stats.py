@@ -0,0 +1,39 @@
+"""Per-user recommendation acceptance statistics
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Outcome counts by hour-of-week, gap type and category
+    op.create_table('user_acceptance_stats',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('uuid_generate_v4()')),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), unique=True, nullable=False),
+        sa.Column('hour_accepted', sa.JSON()),
+        sa.Column('hour_dismissed', sa.JSON()),
+        sa.Column('gap_accepted', sa.JSON()),
+        sa.Column('gap_dismissed', sa.JSON()),
+        sa.Column('category_accepted', sa.JSON()),
+        sa.Column('category_dismissed', sa.JSON()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()')),
+    )
+
+    # Gap type the recommendation was generated for, used as a stats dimension
+    op.add_column('break_recommendations', sa.Column('gap_type', sa.String(20)))
+
+
+def downgrade() -> None:
+    op.drop_column('break_recommendations', 'gap_type')
+    op.drop_table('user_acceptance_stats')
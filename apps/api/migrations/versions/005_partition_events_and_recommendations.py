@@ -0,0 +1,156 @@
+"""Range-partition calendar_events and break_recommendations by month
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+# Monthly partitions created ahead of today; the maintenance task keeps this topped up
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(table: str, key: str) -> None:
+    """One partition per month from the oldest existing row through MONTHS_AHEAD, plus a default"""
+    oldest = op.get_bind().execute(sa.text(f'SELECT MIN({key}) FROM {table}_legacy')).scalar()
+    current = date.today().replace(day=1)
+    month = min(oldest.date().replace(day=1), current) if oldest else current
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{_add_months(month, 1).isoformat()} 00:00:00+00')"
+        )
+        month = _add_months(month, 1)
+
+    # Rows outside every monthly range (far-future events, clock skew) land here instead of failing
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def upgrade() -> None:
+    # Partitions can't be referenced by foreign keys, and retention drops them wholesale
+    op.drop_constraint('completed_breaks_recommendation_id_fkey', 'completed_breaks', type_='foreignkey')
+
+    op.rename_table('calendar_events', 'calendar_events_legacy')
+    op.rename_table('break_recommendations', 'break_recommendations_legacy')
+
+    op.create_table('calendar_events',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('uuid_generate_v4()'), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('external_id', sa.String(255), nullable=False),
+        sa.Column('title', sa.String(500)),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('end_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('attendee_count', sa.Integer(), server_default='1'),
+        sa.Column('is_recurring', sa.Boolean(), server_default='false'),
+        sa.Column('meeting_type', sa.String(50)),
+        sa.Column('intensity_score', sa.Integer(), server_default='5'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()')),
+        postgresql_partition_by='RANGE (start_time)',
+    )
+    op.create_table('break_recommendations',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('uuid_generate_v4()'), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('session_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('recommended_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('reason', sa.Text()),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(20), server_default='pending'),
+        sa.Column('gap_type', sa.String(20)),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()')),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        postgresql_partition_by='RANGE (recommended_time)',
+    )
+
+    _create_partitions('calendar_events', 'start_time')
+    _create_partitions('break_recommendations', 'recommended_time')
+
+    op.execute('INSERT INTO calendar_events SELECT * FROM calendar_events_legacy')
+    op.execute("""
+        INSERT INTO break_recommendations
+            (id, user_id, session_id, recommended_time, reason, score, status, gap_type, created_at, expires_at)
+        SELECT id, user_id, session_id, recommended_time, reason, score, status, gap_type, created_at, expires_at
+        FROM break_recommendations_legacy
+    """)
+
+    # Legacy tables still own the original constraint and index names
+    op.drop_table('calendar_events_legacy')
+    op.drop_table('break_recommendations_legacy')
+
+    # Keys must include the partition key; indexes on the parent are created per partition
+    op.create_primary_key('calendar_events_pkey', 'calendar_events', ['id', 'start_time'])
+    op.create_unique_constraint('_user_event_uc', 'calendar_events', ['user_id', 'external_id', 'start_time'])
+    op.create_foreign_key('calendar_events_user_id_fkey', 'calendar_events', 'users',
+                          ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_index('idx_events_user_time', 'calendar_events', ['user_id', 'start_time', 'end_time'])
+
+    op.create_primary_key('break_recommendations_pkey', 'break_recommendations', ['id', 'recommended_time'])
+    op.create_foreign_key('break_recommendations_user_id_fkey', 'break_recommendations', 'users',
+                          ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('break_recommendations_session_id_fkey', 'break_recommendations', 'break_sessions',
+                          ['session_id'], ['id'])
+    op.create_index('idx_recommendations_user_time', 'break_recommendations', ['user_id', 'recommended_time'])
+    op.create_index('idx_recommendations_status', 'break_recommendations', ['user_id', 'status'])
+    op.create_index('idx_recommendations_expired', 'break_recommendations', ['expires_at'],
+                    postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    # Back to plain tables; rows in partitions dropped by retention are not restored
+    op.rename_table('calendar_events', 'calendar_events_partitioned')
+    op.rename_table('break_recommendations', 'break_recommendations_partitioned')
+    op.execute('ALTER TABLE calendar_events_partitioned RENAME CONSTRAINT calendar_events_pkey TO calendar_events_partitioned_pkey')
+    op.execute('ALTER TABLE calendar_events_partitioned RENAME CONSTRAINT _user_event_uc TO _user_event_partitioned_uc')
+    op.execute('ALTER TABLE break_recommendations_partitioned RENAME CONSTRAINT break_recommendations_pkey TO break_recommendations_partitioned_pkey')
+    for index in ('idx_events_user_time', 'idx_recommendations_user_time',
+                  'idx_recommendations_status', 'idx_recommendations_expired'):
+        op.execute(f'DROP INDEX {index}')
+
+    op.execute('CREATE TABLE calendar_events (LIKE calendar_events_partitioned INCLUDING DEFAULTS)')
+    op.execute('CREATE TABLE break_recommendations (LIKE break_recommendations_partitioned INCLUDING DEFAULTS)')
+    op.execute('INSERT INTO calendar_events SELECT * FROM calendar_events_partitioned')
+    op.execute('INSERT INTO break_recommendations SELECT * FROM break_recommendations_partitioned')
+    op.drop_table('calendar_events_partitioned')
+    op.drop_table('break_recommendations_partitioned')
+
+    op.create_primary_key('calendar_events_pkey', 'calendar_events', ['id'])
+    op.create_unique_constraint('_user_event_uc', 'calendar_events', ['user_id', 'external_id'])
+    op.create_foreign_key('calendar_events_user_id_fkey', 'calendar_events', 'users',
+                          ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_index('idx_events_user_time', 'calendar_events', ['user_id', 'start_time', 'end_time'])
+
+    op.create_primary_key('break_recommendations_pkey', 'break_recommendations', ['id'])
+    op.create_foreign_key('break_recommendations_user_id_fkey', 'break_recommendations', 'users',
+                          ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('break_recommendations_session_id_fkey', 'break_recommendations', 'break_sessions',
+                          ['session_id'], ['id'])
+    op.create_index('idx_recommendations_user_time', 'break_recommendations', ['user_id', 'recommended_time'])
+    op.create_index('idx_recommendations_status', 'break_recommendations', ['user_id', 'status'])
+    op.create_index('idx_recommendations_expired', 'break_recommendations', ['expires_at'],
+                    postgresql_where=sa.text("status = 'pending'"))
+
+    # Recommendations dropped by retention may still be referenced
+    op.execute("""
+        UPDATE completed_breaks SET recommendation_id = NULL
+        WHERE recommendation_id IS NOT NULL
+          AND recommendation_id NOT IN (SELECT id FROM break_recommendations)
+    """)
+    op.create_foreign_key('completed_breaks_recommendation_id_fkey', 'completed_breaks', 'break_recommendations',
+                          ['recommendation_id'], ['id'])
@@ -0,0 +1,44 @@
+"""Recommendation expiry counters and live pending index
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('user_acceptance_stats', sa.Column('acted_count', sa.Integer(), server_default='0'))
+    op.add_column('user_acceptance_stats', sa.Column('expired_count', sa.Integer(), server_default='0'))
+
+    # Every outcome so far was counted once in the hour-of-week arrays
+    op.execute("""
+        UPDATE user_acceptance_stats SET acted_count = (
+            SELECT COALESCE(SUM(value::int), 0) FROM json_array_elements_text(COALESCE(hour_accepted, '[]'::json))
+        ) + (
+            SELECT COALESCE(SUM(value::int), 0) FROM json_array_elements_text(COALESCE(hour_dismissed, '[]'::json))
+        )
+    """)
+
+    # /recommendations/today only reads live pending rows
+    op.create_index('idx_recommendations_pending_user_time', 'break_recommendations',
+                    ['user_id', 'recommended_time'], postgresql_where=sa.text("status = 'pending'"))
+
+    # The expired_recommendations retention rule walks expired rows by expires_at
+    op.create_index('idx_recommendations_expired_done', 'break_recommendations',
+                    ['expires_at'], postgresql_where=sa.text("status = 'expired'"))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_recommendations_expired_done', table_name='break_recommendations')
+    op.drop_index('idx_recommendations_pending_user_time', table_name='break_recommendations')
+    op.drop_column('user_acceptance_stats', 'expired_count')
+    op.drop_column('user_acceptance_stats', 'acted_count')
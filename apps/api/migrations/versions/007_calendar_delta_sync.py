@@ -0,0 +1,25 @@
+"""Delta sync state on calendar connections
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('calendar_connections', sa.Column('delta_token', sa.Text(), nullable=True))
+    op.add_column('calendar_connections', sa.Column('delta_window_end', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('calendar_connections', 'delta_window_end')
+    op.drop_column('calendar_connections', 'delta_token')
@@ -0,0 +1,39 @@
+"""Recurring series stored once with their recurrence rules
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('recurring_series',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('uuid_generate_v4()')),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('external_id', sa.String(255), nullable=False),
+        sa.Column('title', sa.String(500)),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('duration_minutes', sa.Integer(), nullable=False),
+        sa.Column('timezone', sa.String(64), nullable=False),
+        sa.Column('recurrence', sa.Text(), nullable=False),
+        sa.Column('excluded_starts', sa.JSON()),
+        sa.Column('attendee_count', sa.Integer(), server_default='1'),
+        sa.Column('meeting_type', sa.String(50)),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()')),
+    )
+    op.create_unique_constraint('_user_series_uc', 'recurring_series', ['user_id', 'external_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('recurring_series')
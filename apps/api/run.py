@@ -12,7 +12,7 @@ def make_shell_context():
     from app.models import (
         User, CalendarConnection, CalendarEvent,
         BreakSession, BreakRecommendation, CompletedBreak,
-        UserStreak, CompanyAnalytics
+        UserStreak, CompanyAnalytics, RollupWatermark
     )
     return {
         'db': db,
@@ -24,8 +24,23 @@ def make_shell_context():
         'CompletedBreak': CompletedBreak,
         'UserStreak': UserStreak,
         'CompanyAnalytics': CompanyAnalytics,
+        'RollupWatermark': RollupWatermark,
     }
 
+@app.cli.command('sync-report')
+def sync_report():
+    """Show the slowest calendar syncs and largest calendars"""
+    from app.tasks.telemetry import get_slowest_syncs, get_largest_calendars
+    
+    print('Slowest users (latest sync):')
+    for row in get_slowest_syncs():
+        stages = (row['detail'] or {}).get('stages', {})
+        print(f"  {row['user_id']}: {row['total_ms']:.0f} ms {stages}")
+    
+    print('Largest calendars (events in latest sync):')
+    for row in get_largest_calendars():
+        print(f"  {row['user_id']} / {row['calendar_id']}: {row['events']} events")
+
 if __name__ == '__main__':
     # Run the development server
     app.run(
@@ -0,0 +1,50 @@
+"""
+Shared fixtures for tests running against in-memory SQLite.
+"""
+import pytest
+from flask import Flask
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+
+from app import db, jwt
+
+
+@compiles(UUID, 'sqlite')
+def _compile_uuid_for_sqlite(type_, compiler, **kw):
+    """Models use the PostgreSQL UUID type; store it as text on SQLite"""
+    return 'CHAR(32)'
+
+
+@pytest.fixture
+def make_app():
+    """
+    Factory for a minimal app on in-memory SQLite with the given blueprints.
+    The full application factory configures a pooled PostgreSQL engine.
+    """
+    contexts = []
+
+    def factory(*blueprints, **config):
+        app = Flask(__name__)
+        app.config.update(
+            TESTING=True,
+            SQLALCHEMY_DATABASE_URI='sqlite://',
+            JWT_SECRET_KEY='test-secret-key-used-only-for-signing-in-tests',
+            **config
+        )
+        db.init_app(app)
+        jwt.init_app(app)
+        for blueprint, url_prefix in blueprints:
+            app.register_blueprint(blueprint, url_prefix=url_prefix)
+
+        context = app.app_context()
+        context.push()
+        contexts.append(context)
+        db.create_all()
+        return app
+
+    yield factory
+
+    for context in reversed(contexts):
+        db.session.remove()
+        db.drop_all()
+        context.pop()
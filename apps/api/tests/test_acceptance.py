@@ -0,0 +1,117 @@
+"""
+Tests for the per-user acceptance model.
+"""
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+import pytz
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models import User, BreakSession, BreakRecommendation, UserAcceptanceStats
+from app.recommendations import recommendations_bp
+from app.services.acceptance_service import (
+    AcceptanceService, acceptance_adjustment, empty_stats, hour_of_week, preference,
+)
+from app.services.calendar_analyzer import CalendarAnalyzer
+
+
+@pytest.fixture
+def app(make_app):
+    """Minimal app with the recommendations blueprint"""
+    return make_app((recommendations_bp, '/api/v1/recommendations'))
+
+
+class TestAcceptanceModel:
+    """Test bucket indexing and score adjustments"""
+
+    def test_hour_of_week_uses_local_time(self):
+        """Monday 09:00 in New York is bucket 9"""
+        moment = pytz.utc.localize(datetime(2024, 1, 1, 14, 0))
+        assert hour_of_week(moment, 'America/New_York') == 9
+
+    def test_preference_is_neutral_without_evidence(self):
+        """Empty buckets neither help nor hurt"""
+        assert preference(0, 0) == 0
+        assert preference(10, 0) > preference(1, 0) > 0 > preference(0, 3)
+
+    def test_history_shifts_opportunity_score(self):
+        """Gaps at hours the user accepts outrank identical gaps they dismiss"""
+        analyzer = CalendarAnalyzer()
+        user = User(timezone='UTC')
+        liked = pytz.utc.localize(datetime(2024, 1, 1, 10, 0))
+        disliked = liked + timedelta(days=1)
+
+        stats = empty_stats()
+        stats.hour_accepted[hour_of_week(liked)] = 5
+        stats.hour_dismissed[hour_of_week(disliked)] = 5
+
+        def opportunity(start):
+            return {'start_time': start, 'duration_minutes': 15, 'gap_type': 'between_meetings',
+                    'preceding_meeting': None, 'following_meeting': None}
+
+        assert acceptance_adjustment(None, liked, 'between_meetings') == 0
+        assert (analyzer.calculate_opportunity_score(opportunity(liked), user, [], stats)
+                > analyzer.calculate_opportunity_score(opportunity(liked), user, [])
+                > analyzer.calculate_opportunity_score(opportunity(disliked), user, [], stats))
+
+
+class TestAcceptEndpoint:
+    """Test incremental updates from the API"""
+
+    def test_accept_updates_stats_once(self, app):
+        """Accepting counts the hour, gap and category buckets once"""
+        user = User(id=uuid.uuid4(), email='accept@example.com', timezone='UTC')
+        session = BreakSession(title='Stretch', category='movement',
+                               duration_minutes=10, content_url='https://example.com')
+        db.session.add_all([user, session])
+        db.session.flush()
+        recommended_time = datetime(2024, 1, 2, 15, 0)
+        recommendation = BreakRecommendation(
+            user_id=user.id, session_id=session.id, score=0.5, gap_type='after_last',
+            recommended_time=recommended_time, expires_at=recommended_time + timedelta(hours=8),
+        )
+        db.session.add(recommendation)
+        db.session.commit()
+
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+        with patch('app.recommendations.routes.get_jwt_identity', return_value=user.id):
+            for _ in range(2):
+                response = client.post(f'/api/v1/recommendations/{recommendation.id}/accept', headers=headers)
+                assert response.status_code == 200
+
+            # Dismissing after accepting doesn't count the recommendation a second time
+            with patch('app.recommendations.routes.RecommendationService') as service:
+                service.return_value.generate_and_store_recommendations.return_value = []
+                response = client.post(f'/api/v1/recommendations/{recommendation.id}/dismiss', headers=headers)
+                assert response.status_code == 200
+
+        stats = UserAcceptanceStats.query.filter_by(user_id=user.id).one()
+        assert len(stats.hour_accepted) == 168
+        assert stats.hour_accepted[1 * 24 + 15] == 1
+        assert stats.gap_accepted == [0, 0, 1, 0]
+        assert stats.category_accepted == [0, 1, 0, 0]
+        assert sum(stats.hour_dismissed) == 0
+        assert sum(stats.gap_dismissed) == 0
+        assert stats.acted_count == 1
+
+    def test_outcome_joins_stats_created_by_another_outcome(self, app):
+        """An outcome that loses the race for the user's first stats row updates the winner's row"""
+        user = User(id=uuid.uuid4(), email='racing-outcome@example.com', timezone='UTC')
+        stats = empty_stats(user.id)
+        stats.acted_count = 1
+        db.session.add_all([user, stats])
+        db.session.commit()
+        user_id = user.id
+        db.session.expunge_all()
+
+        AcceptanceService().record_outcome(user_id, True, datetime(2024, 1, 2, 15, 0), 'after_last', 'movement')
+        db.session.commit()
+
+        stats = UserAcceptanceStats.query.filter_by(user_id=user_id).one()
+        assert stats.acted_count == 2
+        assert stats.gap_accepted == [0, 0, 1, 0]
@@ -0,0 +1,109 @@
+"""
+Tests for the company analytics rollup.
+"""
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytz
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from app.models import BreakSession, CompanyAnalytics, CompletedBreak, RollupWatermark, User
+from app.services.analytics_service import WATERMARK_NAME, AnalyticsRollupService, date_batches
+
+NOW = pytz.utc.localize(datetime(2026, 10, 19, 12, 0))
+DAY = date(2026, 10, 18)
+
+
+@pytest.fixture
+def pg_app():
+    """The rollup SQL is PostgreSQL-only, so it runs against the testing database"""
+    app = create_app('testing')
+    with app.app_context():
+        try:
+            db.session.execute(text('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"'))
+            db.session.commit()
+        except OperationalError as e:
+            pytest.skip(f"PostgreSQL testing database unavailable: {e.orig}")
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def add_break(user, session, started_at, completed_at):
+    db.session.add(CompletedBreak(user_id=user.id, session_id=session.id,
+                                  started_at=started_at, completed_at=completed_at))
+
+
+class TestBackfillBatching:
+    """Test bounded backfill ranges"""
+
+    def test_batches_cover_range_without_overlap(self):
+        """Batches are contiguous, half-open and bounded"""
+        batches = list(date_batches(date(2024, 1, 1), date(2024, 1, 20), 7))
+
+        assert batches == [
+            (date(2024, 1, 1), date(2024, 1, 8)),
+            (date(2024, 1, 8), date(2024, 1, 15)),
+            (date(2024, 1, 15), date(2024, 1, 20)),
+        ]
+
+    def test_empty_range(self):
+        """No batches when start is not before end"""
+        assert list(date_batches(date(2024, 1, 1), date(2024, 1, 1), 7)) == []
+
+    def test_invalid_batch_size(self):
+        """Batch size must be positive"""
+        with pytest.raises(ValueError):
+            list(date_batches(date(2024, 1, 1), date(2024, 2, 1), 0))
+
+
+class TestRollup:
+    """Test the watermark rollup against PostgreSQL"""
+
+    def test_rollup_upserts_company_days_and_reruns_idempotently(self, pg_app):
+        utc_user = User(id=uuid.uuid4(), email='utc@acme.com', company_domain='acme.com', timezone='UTC')
+        ny_user = User(id=uuid.uuid4(), email='ny@acme.com', company_domain='acme.com', timezone='America/New_York')
+        idle_user = User(id=uuid.uuid4(), email='idle@acme.com', company_domain='acme.com')
+        mindfulness = BreakSession(id=uuid.uuid4(), title='Breathe', category='mindfulness', duration_minutes=5,
+                                   content_url='https://example.com/breathe')
+        movement = BreakSession(id=uuid.uuid4(), title='Stretch', category='movement', duration_minutes=5,
+                                content_url='https://example.com/stretch')
+        db.session.add_all([utc_user, ny_user, idle_user, mindfulness, movement])
+
+        morning = pytz.utc.localize(datetime(2026, 10, 18, 9, 0))
+        # Outside the first run's window, but its day is recomputed in full
+        add_break(utc_user, mindfulness, morning, morning + timedelta(minutes=5))
+        add_break(utc_user, mindfulness, NOW - timedelta(hours=2), NOW - timedelta(hours=2) + timedelta(minutes=5))
+        # 14:00 UTC is 10:00 in New York, still a morning break
+        ny_break = pytz.utc.localize(datetime(2026, 10, 18, 14, 0))
+        add_break(ny_user, movement, ny_break, ny_break + timedelta(minutes=5))
+        add_break(ny_user, movement, ny_break, None)  # Never completed
+        db.session.commit()
+
+        service = AnalyticsRollupService()
+        service.rollup_changed(NOW)
+
+        rows = CompanyAnalytics.query.filter_by(company_domain='acme.com').order_by(CompanyAnalytics.date).all()
+        assert [(row.date, row.total_breaks) for row in rows] == [(DAY, 2), (NOW.date(), 1)]
+        day = rows[0]
+        assert (day.total_users, day.active_users, day.avg_breaks_per_user) == (3, 2, 1.0)
+        assert (day.popular_category, day.popular_time_slot) == ('mindfulness', 'morning')
+
+        # Committed after the first run but completed before it; the lookback picks it up
+        late = pytz.utc.localize(datetime(2026, 10, 18, 23, 0))
+        add_break(ny_user, movement, late, NOW - timedelta(minutes=5))
+        db.session.commit()
+
+        later = NOW + timedelta(minutes=5)
+        for _ in range(2):
+            service.rollup_changed(later)
+
+        db.session.expire_all()
+        rows = CompanyAnalytics.query.filter_by(company_domain='acme.com').order_by(CompanyAnalytics.date).all()
+        assert [(row.date, row.total_breaks) for row in rows] == [(DAY, 3), (NOW.date(), 1)]
+        assert rows[0].avg_breaks_per_user == 1.5
+        assert db.session.get(RollupWatermark, WATERMARK_NAME).watermark == later
@@ -0,0 +1,192 @@
+"""
+Tests for write-behind buffering of break progress.
+"""
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.breaks import breaks_bp
+from app.models import BreakRecommendation, BreakSession, CompletedBreak, User, UserDailyActivity
+from app.services.break_buffer import DEAD_LETTER_KEY, DIRTY_KEY, KEY_PREFIX, MAX_FLUSH_ATTEMPTS, BreakBuffer
+from app.services.catalog_service import CatalogService
+
+
+class FakePipeline:
+    """Queues calls and runs them against the fake on execute"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    """The hash and set commands the buffer uses, with decoded responses"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.sets = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def hincrby(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        values[field] = str(int(values.get(field, 0)) + amount)
+        return int(values[field])
+
+    def expire(self, key, seconds):
+        return True
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(str(m) for m in members)
+
+    def spop(self, key, count):
+        members = self.sets.get(key, set())
+        return [members.pop() for _ in range(min(count, len(members)))]
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def buffer(redis):
+    return BreakBuffer(client_factory=lambda: redis)
+
+
+@pytest.fixture
+def app(make_app, buffer, monkeypatch):
+    app = make_app((breaks_bp, '/api/v1/breaks'), BREAK_WRITE_BEHIND_ENABLED=True)
+    monkeypatch.setattr('app.breaks.routes.break_buffer', buffer)
+    monkeypatch.setattr('app.services.break_buffer.catalog_service', CatalogService(refresh_seconds=60))
+    return app
+
+
+@pytest.fixture
+def user_and_session(app):
+    user = User(id=uuid.uuid4(), email='buffer@example.com', timezone='UTC')
+    session = BreakSession(id=uuid.uuid4(), title='Stretch', category='movement',
+                           duration_minutes=5, content_url='https://example.com')
+    db.session.add_all([user, session])
+    db.session.commit()
+    return user, session
+
+
+def _complete(redis, break_id, duration_seconds=240):
+    """Apply what the completion script writes"""
+    redis.hset(f'{KEY_PREFIX}{break_id}', mapping={
+        'status': 'completed', 'completed_at': time.time(), 'duration_seconds': duration_seconds,
+        'completion_percentage': 100, 'felt_better': '1',
+    })
+    redis.sadd(DIRTY_KEY, break_id)
+
+
+class TestBreakBuffer:
+    """Test buffered starts and batched flushes"""
+
+    def test_start_is_buffered_until_flush(self, app, buffer, user_and_session):
+        user, session = user_and_session
+        token = create_access_token(identity=str(user.id))
+
+        with patch('app.breaks.routes.get_jwt_identity', return_value=str(user.id)):
+            response = app.test_client().post('/api/v1/breaks/start', json={'session_id': str(session.id)},
+                                              headers={'Authorization': f'Bearer {token}'})
+
+        assert response.status_code == 201
+        assert CompletedBreak.query.count() == 0
+
+        assert buffer.flush() == 1
+        row = CompletedBreak.query.one()
+        assert str(row.id) == response.get_json()['id']
+        assert row.completed_at is None
+
+    def test_unknown_session_is_rejected_without_buffering(self, app, buffer, redis, user_and_session):
+        user, _ = user_and_session
+
+        with pytest.raises(ValueError):
+            buffer.start(user.id, uuid.uuid4())
+        assert not redis.hashes
+
+    def test_completion_is_applied_once(self, app, buffer, redis, user_and_session):
+        user, session = user_and_session
+        state = buffer.start(user.id, session.id)
+        _complete(redis, state['id'])
+
+        assert buffer.flush() == 1
+        # A late duplicate of the same completion must not count twice
+        redis.sadd(DIRTY_KEY, state['id'])
+        assert buffer.flush() == 1
+
+        row = CompletedBreak.query.one()
+        assert row.duration_seconds == 240
+        assert row.felt_better is True
+        assert UserDailyActivity.query.filter_by(user_id=user.id).one().break_count == 1
+
+    def test_failed_flush_marks_breaks_dirty_again(self, app, buffer, redis, user_and_session):
+        user, session = user_and_session
+        state = buffer.start(user.id, session.id)
+
+        with patch.object(db.session, 'commit', side_effect=RuntimeError('database down')):
+            with pytest.raises(RuntimeError):
+                buffer.flush()
+
+        assert redis.sets[DIRTY_KEY] == {state['id']}
+        assert buffer.flush() == 1
+
+    def test_failing_break_is_isolated_then_dead_lettered(self, app, buffer, redis, user_and_session):
+        user, session = user_and_session
+        good = buffer.start(user.id, session.id)
+        poison = buffer.start(user.id, session.id)
+        redis.hset(f"{KEY_PREFIX}{poison['id']}", mapping={'duration_seconds': 'not-a-number'})
+
+        assert buffer.flush() == 1
+        assert [str(row.id) for row in CompletedBreak.query.all()] == [good['id']]
+        assert redis.sets[DIRTY_KEY] == {poison['id']}
+
+        for _ in range(MAX_FLUSH_ATTEMPTS - 1):
+            assert buffer.flush() == 0
+        assert not redis.sets[DIRTY_KEY]
+        assert poison['id'] in redis.hashes[DEAD_LETTER_KEY]
+
+    def test_buffered_break_cannot_complete_another_users_recommendation(self, app, buffer, redis, user_and_session):
+        user, session = user_and_session
+        other = User(id=uuid.uuid4(), email='other@example.com', timezone='UTC')
+        foreign = BreakRecommendation(id=uuid.uuid4(), user_id=other.id, session_id=session.id,
+                                      recommended_time=datetime(2024, 1, 1, 10), score=0.5,
+                                      expires_at=datetime(2024, 1, 1, 11))
+        db.session.add_all([other, foreign])
+        db.session.commit()
+
+        with pytest.raises(ValueError):
+            buffer.start(user.id, session.id, foreign.id)
+
+        # A state that names someone else's recommendation anyway is stored without it
+        state = buffer.start(user.id, session.id)
+        redis.hset(f"{KEY_PREFIX}{state['id']}", mapping={'recommendation_id': str(foreign.id)})
+        _complete(redis, state['id'])
+
+        assert buffer.flush() == 1
+        assert db.session.get(BreakRecommendation, foreign.id).status == 'pending'
+        assert db.session.get(CompletedBreak, uuid.UUID(state['id'])).recommendation_id is None
@@ -0,0 +1,70 @@
+"""
+Tests for spacing-constrained break selection.
+"""
+import random
+from datetime import datetime, timedelta
+from itertools import combinations
+
+from app.services.break_selection import select_spaced_breaks
+
+DAY_START = datetime(2024, 1, 1, 9, 0)
+
+
+def opportunity(offset_minutes, score, duration=15):
+    return {
+        'start_time': DAY_START + timedelta(minutes=offset_minutes),
+        'duration_minutes': duration,
+        'score': score,
+    }
+
+
+def compatible(picks, spacing):
+    ordered = sorted(picks, key=lambda o: o['start_time'])
+    return all(
+        later['start_time'] >= earlier['start_time'] + timedelta(minutes=earlier['duration_minutes'] + spacing)
+        for earlier, later in zip(ordered, ordered[1:])
+    )
+
+
+def brute_force_best(opportunities, k, spacing):
+    best = 0.0
+    for size in range(1, k + 1):
+        for picks in combinations(opportunities, size):
+            if compatible(picks, spacing):
+                best = max(best, sum(o['score'] for o in picks))
+    return best
+
+
+class TestSelectSpacedBreaks:
+    """Test the weighted interval scheduling selection"""
+
+    def test_top_scores_spread_out(self):
+        """Adjacent high scorers lose to a spread-out combination"""
+        opportunities = [opportunity(0, 9), opportunity(30, 8), opportunity(60, 8), opportunity(240, 5)]
+        selected = select_spaced_breaks(opportunities, 3, 90)
+        assert [o['score'] for o in selected] == [9, 5]
+
+    def test_single_pick_is_best_score(self):
+        """K of one keeps the previous top-1 behaviour"""
+        opportunities = [opportunity(0, 3), opportunity(200, 7), opportunity(400, 5)]
+        assert select_spaced_breaks(opportunities, 1, 90) == [opportunities[1]]
+
+    def test_empty_and_zero_limit(self):
+        """Nothing to pick returns nothing"""
+        assert select_spaced_breaks([], 3, 90) == []
+        assert select_spaced_breaks([opportunity(0, 1)], 0, 90) == []
+
+    def test_matches_brute_force(self):
+        """Selections are feasible and optimal on random days"""
+        rng = random.Random(42)
+        for _ in range(50):
+            opportunities = [
+                opportunity(rng.randrange(0, 600, 5), round(rng.uniform(1, 10), 2), rng.choice([15, 20, 30]))
+                for _ in range(rng.randint(1, 8))
+            ]
+            k = rng.randint(1, 3)
+            selected = select_spaced_breaks(opportunities, k, 60)
+
+            assert len(selected) <= k
+            assert compatible(selected, 60)
+            assert abs(sum(o['score'] for o in selected) - brute_force_best(opportunities, k, 60)) < 1e-9
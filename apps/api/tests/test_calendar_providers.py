@@ -0,0 +1,327 @@
+"""
+Tests for calendar providers, served by local HTTP stubs.
+"""
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import pytz
+import requests
+
+from app import db
+from app.models import CalendarConnection, CalendarEvent, User
+from app.services.calendar_providers import GoogleCalendarProvider, MicrosoftGraphProvider
+from app.services.calendar_service import CalendarService
+from app.utils.outbound import UpstreamUnavailable
+
+TOMORROW = (datetime.now(pytz.UTC) + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def _graph_event(event_id, hour, minutes=30, **fields):
+    return {
+        'id': event_id,
+        'subject': f'Meeting {event_id}',
+        'start': {'dateTime': f'{TOMORROW}T{hour:02d}:00:00.0000000', 'timeZone': 'UTC'},
+        'end': {'dateTime': f'{TOMORROW}T{hour:02d}:{minutes:02d}:00.0000000', 'timeZone': 'UTC'},
+        'attendees': [{'status': {'response': 'accepted'}}, {'status': {'response': 'declined'}}],
+        **fields,
+    }
+
+
+class GraphStub(BaseHTTPRequestHandler):
+    """calendarView/delta with two initial pages, one round of changes and an expired token"""
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None):
+        payload = json.dumps(body or {}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        GraphStub.requests.append((url.path, query, dict(self.headers)))
+        base = f'http://127.0.0.1:{self.server.server_port}'
+
+        if self.headers.get('Authorization') != 'Bearer good':
+            return self._send(401)
+        if url.path == '/me/calendar':
+            return self._send(200, {'id': 'calendar-1'})
+        if url.path != '/me/calendarView/delta':
+            return self._send(404)
+
+        if '$deltatoken' in query:
+            if query['$deltatoken'] == ['expired']:
+                return self._send(410)
+            return self._send(200, {
+                'value': [_graph_event('ev1', 14), {'id': 'ev2', '@removed': {'reason': 'deleted'}}],
+                '@odata.deltaLink': f'{base}/me/calendarView/delta?$deltatoken=d2',
+            })
+        if '$skiptoken' in query:
+            return self._send(200, {
+                'value': [_graph_event('ev3', 16, type='occurrence', seriesMasterId='series-1')],
+                '@odata.deltaLink': f'{base}/me/calendarView/delta?$deltatoken=d1',
+            })
+        return self._send(200, {
+            'value': [_graph_event('ev1', 9), _graph_event('ev2', 11),
+                      _graph_event('all-day', 0, isAllDay=True)],
+            '@odata.nextLink': f'{base}/me/calendarView/delta?$skiptoken=p2',
+        })
+
+
+def _google_event(event_id, ical_uid, hour):
+    return {
+        'id': event_id,
+        'iCalUID': ical_uid,
+        'summary': f'Meeting {event_id}',
+        'start': {'dateTime': f'{TOMORROW}T{hour:02d}:00:00Z'},
+        'end': {'dateTime': f'{TOMORROW}T{hour:02d}:30:00Z'},
+    }
+
+
+class GoogleStub(GraphStub):
+    """calendarList with three selected calendars, each answering slowly"""
+    DELAY = 0.5
+    CALENDARS = {
+        'me@example.com': [_google_event('a1', 'standup@x', 9), _google_event('a2', 'review@x', 11)],
+        # The team calendar holds a copy of the standup under its own event id
+        'team@group': [_google_event('t1', 'standup@x', 9), _google_event('t2', 'planning@x', 15)],
+        'shared@group': [_google_event('s1', 'offsite@x', 13)],
+    }
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        GoogleStub.requests.append((url.path, parse_qs(url.query), dict(self.headers)))
+
+        if url.path == '/users/me/calendarList':
+            return self._send(200, {'items': [
+                {'id': 'team@group', 'selected': True},
+                {'id': 'me@example.com', 'primary': True, 'selected': True},
+                {'id': 'holidays@group', 'selected': False},
+                {'id': 'shared@group', 'selected': True},
+            ]})
+        calendar_id = url.path.split('/')[2]
+        if calendar_id not in self.CALENDARS:
+            return self._send(404)
+        time.sleep(self.DELAY)
+        return self._send(200, {'items': self.CALENDARS[calendar_id]})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        GoogleStub.requests.append((url.path, body, dict(self.headers)))
+        if url.path != '/freeBusy':
+            return self._send(404)
+
+        calendars = {}
+        for item in body['items']:
+            events = self.CALENDARS.get(item['id'])
+            if events is None:
+                calendars[item['id']] = {'errors': [{'reason': 'notFound'}]}
+            else:
+                calendars[item['id']] = {'busy': [{'start': event['start']['dateTime'],
+                                                   'end': event['end']['dateTime']} for event in events]}
+        return self._send(200, {'calendars': calendars})
+
+
+def _serve(handler):
+    handler.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def graph_url():
+    server = _serve(GraphStub)
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def google():
+    server = _serve(GoogleStub)
+    provider = GoogleCalendarProvider()
+    provider.base_url = f'http://127.0.0.1:{server.server_port}'
+    yield provider
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def graph(graph_url):
+    provider = MicrosoftGraphProvider()
+    provider.base_url = graph_url
+    return provider
+
+
+def _window():
+    start = datetime.now(pytz.UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, start + timedelta(days=7)
+
+
+class TestGraphProvider:
+    """Test delta paging against the stub"""
+
+    def test_initial_fetch_streams_pages_with_select(self, graph):
+        pages = list(graph.fetch('good', None, *_window()))
+
+        assert [len(page.events) for page in pages] == [2, 1]
+        assert pages[0].delta_token is None
+        assert pages[1].delta_token.endswith('$deltatoken=d1')
+        assert not any(page.incremental for page in pages)
+
+        event = pages[1].events[0]
+        assert event.is_recurring is True
+        assert event.attendee_count == 1
+        assert event.start_time == pytz.UTC.localize(datetime.fromisoformat(f'{TOMORROW}T16:00:00'))
+
+        path, query, headers = GraphStub.requests[0]
+        assert 'subject' in query['$select'][0]
+        assert 'odata.maxpagesize=100' in headers['Prefer']
+
+    def test_delta_fetch_returns_only_changes(self, graph, graph_url):
+        pages = list(graph.fetch('good', None, *_window(), delta_token=f'{graph_url}/me/calendarView/delta?$deltatoken=d1'))
+
+        assert len(pages) == 1
+        assert pages[0].incremental is True
+        assert [event.external_id for event in pages[0].events] == ['ev1']
+        assert pages[0].removed_ids == ['ev2']
+
+    def test_expired_delta_token_falls_back_to_full_window(self, graph, graph_url):
+        pages = list(graph.fetch('good', None, *_window(),
+                                 delta_token=f'{graph_url}/me/calendarView/delta?$deltatoken=expired'))
+
+        assert sum(len(page.events) for page in pages) == 3
+        assert not pages[0].incremental
+
+
+class TestGoogleProvider:
+    """Test Google event normalization"""
+
+    def test_parse_skips_all_day_cancelled_and_short_events(self):
+        timed = {'id': 'g1', 'summary': 'Sync', 'recurringEventId': 'r',
+                 'start': {'dateTime': '2024-01-01T10:00:00Z'}, 'end': {'dateTime': '2024-01-01T11:00:00Z'}}
+
+        assert GoogleCalendarProvider.parse_event(timed).is_recurring is True
+        assert GoogleCalendarProvider.parse_event({**timed, 'status': 'cancelled'}) is None
+        assert GoogleCalendarProvider.parse_event({**timed, 'start': {'date': '2024-01-01'}}) is None
+        assert GoogleCalendarProvider.parse_event({**timed, 'end': {'dateTime': '2024-01-01T10:02:00Z'}}) is None
+
+
+    def test_lists_primary_first_and_only_selected_calendars(self, google):
+        assert google.list_calendars('good') == ['me@example.com', 'team@group', 'shared@group']
+
+    def test_fetches_calendars_concurrently_and_dedupes_by_ical_uid(self, google):
+        calendar_ids = google.list_calendars('good')
+
+        started = time.monotonic()
+        page = google.fetch_calendars('good', calendar_ids, *_window())
+        elapsed = time.monotonic() - started
+
+        assert elapsed < GoogleStub.DELAY * 2
+        assert page.fetched == 5
+        assert [event.external_id for event in page.events] == ['a1', 'a2', 's1', 't2']
+
+    def test_failing_secondary_calendar_is_skipped(self, google):
+        page = google.fetch_calendars('good', ['me@example.com', 'gone@group'], *_window())
+
+        assert [event.external_id for event in page.events] == ['a1', 'a2']
+        with pytest.raises(ValueError):
+            google.fetch_calendars('good', ['gone@group', 'me@example.com'], *_window())
+
+    def test_unreachable_secondary_calendar_is_skipped(self, google):
+        """Timeouts and connection errors on a secondary calendar don't fail the sync"""
+        fetch = google.fetch
+        errors = {'slow@group': UpstreamUnavailable('budget spent'), 'down@group': requests.ConnectionError('reset')}
+
+        def flaky_fetch(access_token, calendar_id, *args, **kwargs):
+            if calendar_id in errors:
+                raise errors[calendar_id]
+            return fetch(access_token, calendar_id, *args, **kwargs)
+
+        with patch.object(google, 'fetch', side_effect=flaky_fetch):
+            page = google.fetch_calendars('good', ['me@example.com', 'slow@group', 'down@group'], *_window())
+            assert [event.external_id for event in page.events] == ['a1', 'a2']
+
+            with pytest.raises(UpstreamUnavailable):
+                google.fetch_calendars('good', ['slow@group', 'me@example.com'], *_window())
+
+
+class TestFreeBusy:
+    """Test free/busy mode for opted-in tenants"""
+
+    def test_fetch_busy_merges_calendars_into_neutral_blocks(self, google, monkeypatch):
+        monkeypatch.setattr(GoogleCalendarProvider, 'FREE_BUSY_BATCH', 2)
+        page = google.fetch_busy('good', ['me@example.com', 'team@group', 'shared@group', 'gone@group'], *_window())
+
+        assert len([path for path, _, _ in GoogleStub.requests if path == '/freeBusy']) == 2
+        assert page.fetched == 5
+        assert [(event.start_time.hour, event.title, event.meeting_type) for event in page.events] == [
+            (9, 'Busy', 'busy'), (11, 'Busy', 'busy'), (13, 'Busy', 'busy'), (15, 'Busy', 'busy')
+        ]
+
+    def test_opted_in_domain_stores_busy_blocks_only(self, make_app, google, monkeypatch):
+        make_app()
+        user = User(id=uuid.uuid4(), email='ops@private.example', timezone='UTC', company_domain='Private.example')
+        db.session.add(user)
+        db.session.add(CalendarConnection(
+            user_id=user.id, provider='google', access_token='good', refresh_token='refresh',
+            token_expires_at=datetime.now(pytz.UTC) + timedelta(hours=1)
+        ))
+        db.session.commit()
+
+        service = CalendarService()
+        monkeypatch.setattr(service.config, 'CALENDAR_FREE_BUSY_DOMAINS', ['private.example'])
+        with patch('app.services.calendar_service.get_provider', return_value=google), \
+                patch.object(service, 'get_valid_access_token', return_value='good'):
+            assert service.sync_calendar_events(user.id) == 4
+
+        # No event bodies were requested
+        assert not any(path.endswith('/events') for path, _, _ in GoogleStub.requests)
+        events = CalendarEvent.query.filter_by(user_id=user.id).all()
+        assert {(event.title, event.meeting_type, event.attendee_count) for event in events} == {('Busy', 'busy', 1)}
+
+
+class TestDeltaSync:
+    """Test that CalendarService applies delta pages to the event store"""
+
+    def test_second_sync_applies_only_changes(self, make_app, graph):
+        make_app()
+        user = User(id=uuid.uuid4(), email='graph@example.com', timezone='UTC')
+        db.session.add(user)
+        db.session.add(CalendarConnection(
+            user_id=user.id, provider='microsoft', access_token='good', refresh_token='refresh',
+            token_expires_at=datetime.now(pytz.UTC) + timedelta(hours=1)
+        ))
+        db.session.commit()
+
+        service = CalendarService()
+        with patch('app.services.calendar_service.get_provider', return_value=graph):
+            assert service.sync_calendar_events(user.id) == 3
+            connection = CalendarConnection.query.filter_by(user_id=user.id).one()
+            assert connection.delta_token.endswith('$deltatoken=d1')
+
+            GraphStub.requests = []
+            assert service.sync_calendar_events(user.id) == 1
+
+        # The second sync only followed the delta link
+        assert [query for path, query, _ in GraphStub.requests if path.endswith('delta')] == [{'$deltatoken': ['d1']}]
+        events = {event.external_id: event for event in CalendarEvent.query.filter_by(user_id=user.id)}
+        assert sorted(events) == ['ev1', 'ev3']
+        assert events['ev1'].start_time.hour == 14
+        assert CalendarConnection.query.filter_by(user_id=user.id).one().delta_token.endswith('$deltatoken=d2')
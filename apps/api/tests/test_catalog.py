@@ -0,0 +1,100 @@
+"""
+Tests for the break session catalog API.
+"""
+import gzip
+import json
+import uuid
+
+import pytest
+
+from app import db
+from app.breaks import breaks_bp
+from app.models import BreakSession
+from app.services.catalog_service import CatalogService
+from app.services.recommendation_service import RecommendationService
+from app.utils.query_budget import query_budget
+
+
+@pytest.fixture
+def app(make_app, monkeypatch):
+    app = make_app((breaks_bp, '/api/v1/breaks'))
+    monkeypatch.setattr('app.breaks.routes.catalog_service', CatalogService(refresh_seconds=60))
+    for title, category, minutes, active in (('Box breathing', 'mindfulness', 3, True),
+                                             ('Desk stretch', 'movement', 5, True),
+                                             ('Walk', 'movement', 15, True),
+                                             ('Retired', 'rest', 10, False)):
+        db.session.add(BreakSession(id=uuid.uuid4(), title=title, category=category, duration_minutes=minutes,
+                                    content_url=f'https://example.com/{minutes}', is_active=active))
+    db.session.commit()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class TestCatalogApi:
+    """Test listing, filtering and conditional requests"""
+
+    def test_lists_active_sessions_with_filters(self, client):
+        titles = [s['title'] for s in client.get('/api/v1/breaks/sessions').get_json()['sessions']]
+        assert sorted(titles) == ['Box breathing', 'Desk stretch', 'Walk']
+
+        movement = client.get('/api/v1/breaks/sessions?category=movement&max_duration=10').get_json()
+        assert [s['title'] for s in movement['sessions']] == ['Desk stretch']
+
+    def test_session_detail_and_missing(self, client):
+        session = client.get('/api/v1/breaks/sessions').get_json()['sessions'][0]
+
+        assert client.get(f"/api/v1/breaks/sessions/{session['id']}").get_json()['title'] == session['title']
+        assert client.get(f'/api/v1/breaks/sessions/{uuid.uuid4()}').status_code == 404
+
+    def test_if_none_match_returns_304(self, client):
+        first = client.get('/api/v1/breaks/sessions')
+        assert first.headers['Cache-Control'].startswith('public')
+
+        second = client.get('/api/v1/breaks/sessions', headers={'If-None-Match': first.headers['ETag']})
+        assert second.status_code == 304
+        assert second.data == b''
+
+    def test_gzip_served_precompressed(self, client):
+        plain = client.get('/api/v1/breaks/sessions')
+        zipped = client.get('/api/v1/breaks/sessions', headers={'Accept-Encoding': 'gzip, br'})
+
+        assert zipped.headers['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(zipped.data)) == plain.get_json()
+        assert zipped.headers['ETag'] != plain.headers['ETag']
+        # A validator from either encoding revalidates
+        revalidated = client.get('/api/v1/breaks/sessions', headers={'If-None-Match': plain.headers['ETag'],
+                                                                      'Accept-Encoding': 'gzip'})
+        assert revalidated.status_code == 304
+
+    def test_snapshot_serves_without_queries(self, client):
+        client.get('/api/v1/breaks/sessions')
+
+        with query_budget(0):
+            for _ in range(5):
+                assert client.get('/api/v1/breaks/sessions?category=mindfulness').status_code == 200
+
+
+class TestCatalogSnapshot:
+    """Test versioning across reloads"""
+
+    def test_unchanged_reload_keeps_version(self, app):
+        service = CatalogService(refresh_seconds=0)
+        first = service.get_snapshot()
+
+        assert service.get_snapshot() is first
+
+        db.session.add(BreakSession(id=uuid.uuid4(), title='Nap', category='rest', duration_minutes=20,
+                                    content_url='https://example.com/nap'))
+        db.session.commit()
+        assert service.get_snapshot().version != first.version
+
+    def test_recommendations_only_pick_catalog_sessions(self, app):
+        """Recommended sessions can always be started and resolved from the catalog"""
+        sessions = RecommendationService()._load_break_sessions()
+
+        assert {str(s.id) for s in sessions} == {s['id'] for s in CatalogService().get_snapshot().sessions}
+        assert 'Retired' not in {s.title for s in sessions}
@@ -0,0 +1,130 @@
+"""
+Tests for the aggregate dashboard endpoint.
+"""
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+import pytz
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.dashboard import dashboard_bp
+from app.models import BreakRecommendation, BreakSession, User
+from app.services.catalog_service import CatalogService
+from app.services.dashboard_service import PROGRESS, greeting, invalidate_dashboard
+from app.utils.query_budget import query_budget
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def set(self, key, value, ex=None):
+        self.calls.append((key, value, ex))
+
+    def execute(self):
+        for key, value, ex in self.calls:
+            self.redis.set(key, value, ex)
+
+
+class FakeRedis:
+    """String commands the dashboard cache uses"""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr('app.services.dashboard_service.get_redis', lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def app(make_app, redis, monkeypatch):
+    app = make_app((dashboard_bp, '/api/v1/dashboard'))
+    monkeypatch.setattr('app.services.dashboard_service.catalog_service', CatalogService(refresh_seconds=60))
+    return app
+
+
+@pytest.fixture
+def user(app):
+    user = User(id=uuid.uuid4(), email='dash@example.com', full_name='Ada Lovelace', timezone='UTC')
+    session = BreakSession(id=uuid.uuid4(), title='Stretch', category='movement',
+                           duration_minutes=5, content_url='https://example.com')
+    db.session.add_all([user, session])
+    db.session.add(BreakRecommendation(
+        user_id=user.id, session_id=session.id, score=0.9, status='pending', reason='Gap after standup',
+        recommended_time=datetime.now(pytz.UTC) + timedelta(hours=1),
+        expires_at=datetime.now(pytz.UTC) + timedelta(hours=2)
+    ))
+    db.session.commit()
+    return user
+
+
+def _get(app, user_id):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    with patch('app.dashboard.routes.get_jwt_identity', return_value=str(user_id)):
+        return app.test_client().get('/api/v1/dashboard', headers=headers)
+
+
+class TestDashboard:
+    """Test section assembly and per-section caching"""
+
+    def test_greeting_by_local_hour(self):
+        assert greeting('Ada Lovelace', datetime(2024, 1, 1, 9)) == 'Good morning, Ada'
+        assert greeting(None, datetime(2024, 1, 1, 20)) == 'Good evening'
+
+    def test_assembles_all_sections(self, app, user):
+        body = _get(app, user.id).get_json()
+
+        assert body['user']['email'] == 'dash@example.com'
+        assert body['calendar']['connected'] is False
+        assert body['streak']['current'] == 0
+        assert body['stats'] == {'breaks_this_week': 0, 'mindful_minutes': 0}
+        assert len(body['recent_breaks']) == 7
+        assert body['recommendation']['session']['title'] == 'Stretch'
+        assert body['recommendation']['reason'] == 'Gap after standup'
+
+    def test_warm_dashboard_reads_only_the_user(self, app, user, redis):
+        _get(app, user.id)
+        db.session.expire_all()
+
+        with query_budget(1):
+            assert _get(app, user.id).status_code == 200
+
+    def test_recommendation_ttl_stops_at_its_time(self, app, user, redis):
+        _get(app, user.id)
+
+        ttls = {key.rsplit(':', 1)[1]: ttl for key, ttl in redis.ttls.items()}
+        assert ttls[PROGRESS] == 300
+        assert ttls['recommendation'] <= 60
+
+    def test_invalidation_rebuilds_section(self, app, user, redis):
+        _get(app, user.id)
+        invalidate_dashboard(user.id, PROGRESS)
+
+        assert not any(key.endswith(PROGRESS) for key in redis.values)
+        assert _get(app, user.id).status_code == 200
+
+    def test_unknown_user(self, app, redis):
+        assert _get(app, uuid.uuid4()).status_code == 404
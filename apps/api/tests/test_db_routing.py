@@ -0,0 +1,112 @@
+"""
+Tests for read-replica routing and pool sizing.
+"""
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+import redis
+from flask import Flask
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models import User
+from app.users import users_bp
+from app.utils import db_routing
+from app.utils.db_routing import configure_engines, use_replica
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app((users_bp, '/api/v1/users'), SQLALCHEMY_BINDS={'replica_0': 'sqlite://'})
+    db_routing.init_app(app)
+    # Replica binds own no models, so give the replica its own copy of the schema
+    db.metadata.create_all(db.engines['replica_0'])
+    yield app
+    db_routing._engines.clear()
+    # init_app registered metadata for the bind on the shared extension
+    db.metadatas.pop('replica_0', None)
+
+
+@pytest.fixture
+def user_id(app):
+    """Same user on both servers, with a different name on each"""
+    user_id = uuid.uuid4()
+    db.session.add(User(id=user_id, email='user@example.com', full_name='Primary'))
+    db.session.commit()
+    with db.engines['replica_0'].begin() as conn:
+        conn.execute(User.__table__.insert().values(id=user_id, email='user@example.com', full_name='Replica'))
+    return user_id
+
+
+def get_me(app, user_id, sticky=False):
+    client = MagicMock()
+    client.exists.return_value = int(sticky)
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    with patch('app.utils.db_routing.get_redis', return_value=client), \
+            patch('app.users.routes.get_jwt_identity', return_value=user_id):
+        return app.test_client().get('/api/v1/users/me', headers=headers)
+
+
+class TestReadReplicaRouting:
+    """Test which server read-only views use"""
+
+    def test_read_only_view_uses_replica(self, app, user_id):
+        response = get_me(app, user_id)
+
+        assert response.status_code == 200
+        assert response.get_json()['full_name'] == 'Replica'
+
+    def test_recent_writer_reads_from_primary(self, app, user_id):
+        """Read-your-writes: a sticky marker keeps the user on the primary"""
+        response = get_me(app, user_id, sticky=True)
+
+        assert response.get_json()['full_name'] == 'Primary'
+
+    def test_redis_outage_reads_from_primary(self, app, user_id):
+        client = MagicMock()
+        client.exists.side_effect = redis.ConnectionError('down')
+        with patch('app.utils.db_routing.get_redis', return_value=client):
+            assert db_routing.has_recent_write(user_id)
+
+    def test_writes_in_replica_scope_go_to_primary(self, app, user_id):
+        with use_replica():
+            user = db.session.get(User, user_id)
+            assert user.full_name == 'Replica'
+            user.full_name = 'Renamed'
+            db.session.commit()
+
+        db.session.expire_all()
+        assert db.session.get(User, user_id).full_name == 'Renamed'
+        with db.engines['replica_0'].connect() as conn:
+            assert conn.execute(User.__table__.select()).one().full_name == 'Replica'
+
+
+class TestPoolConfiguration:
+    """Test pool sizing per process role"""
+
+    def make_config(self, **overrides):
+        app = Flask(__name__)
+        app.config.update(
+            SQLALCHEMY_ENGINE_OPTIONS={'pool_pre_ping': True},
+            DB_POOL_SIZE=10, DB_MAX_OVERFLOW=5,
+            WORKER_DB_POOL_SIZE=2, WORKER_DB_MAX_OVERFLOW=1,
+            DATABASE_REPLICA_URLS=['postgresql://replica-a/db', 'postgresql://replica-b/db'],
+            **overrides
+        )
+        configure_engines(app)
+        return app.config
+
+    def test_web_and_worker_pools_sized_separately(self):
+        assert self.make_config(PROCESS_ROLE='web')['SQLALCHEMY_ENGINE_OPTIONS']['pool_size'] == 10
+        worker = self.make_config(PROCESS_ROLE='worker')['SQLALCHEMY_ENGINE_OPTIONS']
+        assert worker['pool_size'] == 2
+        assert worker['max_overflow'] == 1
+        assert worker['pool_pre_ping'] is True
+
+    def test_replica_binds_share_pool_options(self):
+        binds = self.make_config(PROCESS_ROLE='worker')['SQLALCHEMY_BINDS']
+
+        assert set(binds) == {'replica_0', 'replica_1'}
+        assert binds['replica_1']['url'] == 'postgresql://replica-b/db'
+        assert binds['replica_1']['pool_size'] == 2
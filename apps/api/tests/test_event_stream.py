@@ -0,0 +1,132 @@
+"""
+Tests for per-user server-sent event streams.
+"""
+import json
+import queue
+import time
+import uuid
+from unittest.mock import patch
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.events import events_bp
+from app.utils import event_stream
+from app.utils.event_stream import EventHub, format_sse, publish_user_event
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.channels = set()
+        self.messages = queue.Queue()
+
+    def subscribe(self, *channels):
+        self.channels.update(channels)
+        self.redis.subscribers.append(self)
+
+    def unsubscribe(self, *channels):
+        self.channels.difference_update(channels)
+
+    def get_message(self, timeout):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+class FakeRedis:
+    """Delivers PUBLISH to fake subscribers like a decoded Redis client"""
+
+    def __init__(self):
+        self.subscribers = []
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+    def publish(self, channel, message):
+        for pubsub in self.subscribers:
+            if channel in pubsub.channels:
+                pubsub.messages.put({'type': 'message', 'channel': channel, 'data': message})
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(event_stream, 'get_redis', lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def hub(redis):
+    return EventHub(client_factory=lambda: redis, poll_seconds=0.01)
+
+
+def _wait_for_subscription(redis, user_id):
+    channel = f'{event_stream.CHANNEL_PREFIX}{user_id}'
+    deadline = time.time() + 2
+    while not any(channel in pubsub.channels for pubsub in redis.subscribers):
+        assert time.time() < deadline, 'listener never subscribed'
+        time.sleep(0.01)
+
+
+class TestEventStream:
+    """Test publishing, fan-out and SSE framing"""
+
+    def test_format_sse(self):
+        frame = format_sse({'id': 'abc', 'event': 'sync_completed', 'data': {'events_synced': 3}})
+        assert frame == 'id: abc\nevent: sync_completed\ndata: {"events_synced": 3}\n\n'
+
+    def test_published_event_reaches_only_that_users_stream(self, hub, redis):
+        user_id, other_id = uuid.uuid4(), uuid.uuid4()
+        stream = hub.stream(user_id, until=time.time() + 5, keepalive_seconds=0.05)
+        assert next(stream) == 'retry: 3000\n\n'
+        _wait_for_subscription(redis, user_id)
+
+        publish_user_event(other_id, 'sync_completed', {'sync_task_id': 'other'})
+        publish_user_event(user_id, 'sync_completed', {'sync_task_id': 'task-1'})
+
+        frame = next(stream)
+        while frame.startswith(':'):
+            frame = next(stream)
+        assert 'event: sync_completed' in frame
+        assert json.loads(frame.split('data: ')[1]) == {'sync_task_id': 'task-1'}
+
+        stream.close()
+        assert hub.open_streams() == 0
+
+    def test_stream_ends_at_deadline(self, hub):
+        frames = list(hub.stream(uuid.uuid4(), until=time.time() + 0.1, keepalive_seconds=0.02))
+
+        assert frames[0].startswith('retry:')
+        assert all(frame == ': keepalive\n\n' for frame in frames[1:])
+        assert hub.open_streams() == 0
+
+    def test_slow_stream_drops_instead_of_blocking(self, hub):
+        user_id = uuid.uuid4()
+        events = hub.subscribe(user_id)
+        message = json.dumps({'id': '1', 'event': 'recommendations_updated', 'data': {}})
+
+        for _ in range(event_stream.STREAM_QUEUE_SIZE + 5):
+            hub.dispatch(f'{event_stream.CHANNEL_PREFIX}{user_id}', message)
+
+        assert events.qsize() == event_stream.STREAM_QUEUE_SIZE
+        hub.unsubscribe(user_id, events)
+
+    def test_stream_accepts_token_in_query_string(self, make_app, hub, monkeypatch):
+        app = make_app((events_bp, '/api/v1/events'))
+        monkeypatch.setattr('app.events.routes.event_hub', hub)
+        user_id = str(uuid.uuid4())
+        token = create_access_token(identity=user_id)
+
+        with patch.object(hub, 'stream', return_value=iter(['retry: 3000\n\n'])) as stream:
+            response = app.test_client().get(f'/api/v1/events/stream?jwt={token}')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        assert stream.call_args[0][0] == user_id
+        assert app.test_client().get('/api/v1/events/stream').status_code == 401
@@ -0,0 +1,70 @@
+"""
+Tests for bounded outbound calls from request handlers.
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.services.calendar_providers import GoogleCalendarProvider
+from app.utils.outbound import BoundedExecutor, Deadline, UpstreamBusy, UpstreamTimeout
+
+
+class TestBoundedExecutor:
+    """Test deadlines and admission control"""
+
+    def test_returns_result_and_propagates_errors(self):
+        executor = BoundedExecutor('test', max_workers=2)
+
+        assert executor.call(lambda x: x * 2, 21) == 42
+        with pytest.raises(KeyError):
+            executor.call({}.__getitem__, 'missing')
+
+    def test_deadline_bounds_the_wait(self):
+        executor = BoundedExecutor('test', max_workers=1)
+        release = threading.Event()
+
+        started = time.monotonic()
+        with pytest.raises(UpstreamTimeout):
+            executor.call(release.wait, 5, deadline=Deadline(0.05))
+        assert time.monotonic() - started < 1
+        release.set()
+
+    def test_full_executor_fails_fast(self):
+        executor = BoundedExecutor('test', max_workers=1, max_pending=0)
+        release = threading.Event()
+
+        with pytest.raises(UpstreamTimeout):
+            executor.call(release.wait, 5, timeout=0.01)
+        # The abandoned call still holds the only slot until it finishes
+        with pytest.raises(UpstreamBusy):
+            executor.call(lambda: None)
+
+        release.set()
+        time.sleep(0.05)
+        assert executor.call(lambda: 'ok') == 'ok'
+
+    def test_expired_deadline_skips_the_call(self):
+        called = []
+        with pytest.raises(UpstreamTimeout):
+            BoundedExecutor('test', max_workers=1).call(called.append, 1, deadline=Deadline(0))
+        assert not called
+
+
+class TestProviderDeadline:
+    """Test that provider calls honor a request deadline"""
+
+    def test_slow_provider_raises_within_deadline(self):
+        provider = GoogleCalendarProvider()
+        release = threading.Event()
+
+        with patch.object(provider.session, 'request', side_effect=lambda *a, **kw: release.wait(5)) as request:
+            started = time.monotonic()
+            with pytest.raises(UpstreamTimeout):
+                provider.request('GET', 'https://example.com', deadline=Deadline(0.1), timeout=30)
+
+        assert time.monotonic() - started < 1
+        # The socket timeout is capped to the remaining budget
+        assert request.call_args.kwargs['timeout'] <= 0.1
+        release.set()
@@ -0,0 +1,81 @@
+"""
+Tests for monthly partition maintenance.
+"""
+from datetime import date, datetime
+from unittest.mock import patch
+
+from app.services.partition_service import (
+    PartitionService, add_months, create_partition_sql, expired_partitions, months_to_create,
+    parse_partition_month,
+)
+
+
+class TestPartitionMath:
+    """Test month arithmetic and partition naming"""
+
+    def test_add_months_crosses_years(self):
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_months_to_create_starts_at_current_month(self):
+        assert months_to_create(date(2026, 12, 15), 2) == [
+            date(2026, 12, 1), date(2027, 1, 1), date(2027, 2, 1)
+        ]
+
+    def test_partition_bounds_are_utc_month_edges(self):
+        create, move, attach = create_partition_sql('calendar_events', 'start_time', date(2026, 12, 1))
+
+        assert create.startswith('CREATE TABLE IF NOT EXISTS calendar_events_p202612')
+        assert 'ATTACH PARTITION calendar_events_p202612' in attach
+        assert "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')" in attach
+
+    def test_new_partition_takes_its_rows_from_the_default(self):
+        """Rows that landed in the default partition move before the range is attached"""
+        _, move, _ = create_partition_sql('break_recommendations', 'recommended_time', date(2027, 3, 1))
+
+        assert move.startswith('WITH moved AS (DELETE FROM break_recommendations_default')
+        assert "recommended_time >= '2027-03-01 00:00:00+00' AND recommended_time < '2027-04-01 00:00:00+00'" in move
+        assert move.endswith('INSERT INTO break_recommendations_p202703 SELECT * FROM moved')
+
+    def test_foreign_partition_names_are_ignored(self):
+        assert parse_partition_month('calendar_events', 'calendar_events_p202610') == date(2026, 10, 1)
+        assert parse_partition_month('calendar_events', 'break_recommendations_p202610') is None
+        assert parse_partition_month('calendar_events', 'calendar_events_archive') is None
+        assert parse_partition_month('calendar_events', 'calendar_events_default') is None
+
+
+class TestRetention:
+    """Test which partitions retention drops"""
+
+    def test_only_fully_expired_partitions_drop(self):
+        """A partition is dropped once its upper bound is before the cutoff"""
+        names = ['calendar_events_p202609', 'calendar_events_p202607', 'calendar_events_p202608',
+                 'calendar_events_p202610']
+
+        # Cutoff inside September keeps September's partition
+        assert expired_partitions('calendar_events', names, datetime(2026, 9, 19)) == [
+            'calendar_events_p202607', 'calendar_events_p202608'
+        ]
+
+    def test_maintenance_detaches_and_drops_together(self):
+        service = PartitionService()
+        with patch.object(service, 'list_partitions', return_value=['break_recommendations_p202605']), \
+                patch.object(service, '_run_ddl', return_value=True) as run_ddl:
+            dropped = service.drop_expired_partitions('break_recommendations', 90, datetime(2026, 10, 19))
+
+        assert dropped == ['break_recommendations_p202605']
+        run_ddl.assert_called_once_with(
+            'ALTER TABLE break_recommendations DETACH PARTITION break_recommendations_p202605',
+            'DROP TABLE break_recommendations_p202605'
+        )
+
+    def test_existing_partitions_not_recreated(self):
+        service = PartitionService()
+        with patch.object(service.config, 'PARTITION_MONTHS_AHEAD', 1), \
+                patch.object(service, 'list_partitions', return_value=['calendar_events_p202610']), \
+                patch.object(service, '_run_ddl', return_value=True) as run_ddl:
+            created = service.ensure_future_partitions('calendar_events', date(2026, 10, 19))
+
+        assert created == ['calendar_events_p202611']
+        assert run_ddl.call_count == 1
+        assert run_ddl.call_args.args == tuple(create_partition_sql('calendar_events', 'start_time', date(2026, 11, 1)))
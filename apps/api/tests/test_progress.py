@@ -0,0 +1,102 @@
+"""
+Tests for daily activity rollups and the progress dashboard.
+"""
+import uuid
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models import User, BreakSession, UserDailyActivity, UserStreak
+from app.breaks import breaks_bp
+from app.progress import progress_bp
+from app.services.progress_service import ProgressService, wellness_score, count_workdays
+from app.services.streak_service import StreakService
+
+
+@pytest.fixture
+def app(make_app):
+    """Minimal app with the breaks and progress blueprints"""
+    return make_app((breaks_bp, '/api/v1/breaks'), (progress_bp, '/api/v1/progress'))
+
+
+class TestWellnessScore:
+    """Test the composite score"""
+
+    def test_count_workdays_skips_weekends(self):
+        """Monday through Sunday has five workdays"""
+        assert count_workdays(date(2024, 1, 1), date(2024, 1, 7)) == 5
+
+    def test_empty_window_scores_zero(self):
+        """No activity means no score"""
+        assert wellness_score([], date(2024, 1, 1), date(2024, 1, 7))['score'] == 0
+
+    def test_full_marks(self):
+        """Target breaks every workday across all categories with a week-long streak"""
+        activities = [
+            UserDailyActivity(date=date(2024, 1, day), break_count=3,
+                              category_counts={'mindfulness': 1, 'movement': 1, 'rest': 1})
+            for day in range(1, 6)
+        ]
+        result = wellness_score(activities, date(2024, 1, 1), date(2024, 1, 7),
+                                current_streak=7, breaks_per_day=3)
+        assert result['score'] == 100
+
+
+class TestProgressOverview:
+    """Test incremental rollups through the API"""
+
+    def test_completions_roll_up_into_overview(self, app):
+        """Completed breaks appear in today's rollup row and the overview"""
+        user = User(id=uuid.uuid4(), email='progress@example.com', timezone='UTC')
+        sessions = [
+            BreakSession(title=f'{category} break', category=category,
+                         duration_minutes=5, content_url='https://example.com')
+            for category in ('mindfulness', 'movement')
+        ]
+        db.session.add_all([user, *sessions])
+        db.session.commit()
+
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+        with patch('app.breaks.routes.get_jwt_identity', return_value=user.id), \
+                patch('app.progress.routes.get_jwt_identity', return_value=user.id):
+            for session in sessions:
+                started = client.post('/api/v1/breaks/start', json={'session_id': str(session.id)}, headers=headers)
+                client.post(f"/api/v1/breaks/{started.get_json()['id']}/complete", headers=headers)
+
+            response = client.get('/api/v1/progress/overview', headers=headers)
+
+        assert UserDailyActivity.query.filter_by(user_id=user.id).count() == 1
+
+        body = response.get_json()
+        assert body['total_breaks'] == 2
+        assert body['category_breakdown'] == {'mindfulness': 1, 'movement': 1}
+        assert body['current_streak'] == 1
+        assert len(body['trend']) == 30
+        assert body['trend'][-1]['break_count'] == 2
+        assert 0 < body['wellness']['score'] <= 100
+
+    def test_record_break_joins_rows_created_by_another_completion(self, app):
+        """A completion that loses the race for the day's first row updates the winner's row"""
+        user = User(id=uuid.uuid4(), email='racing@example.com', timezone='UTC')
+        db.session.add(user)
+        db.session.add(UserDailyActivity(user_id=user.id, date=date(2024, 1, 1), break_count=1,
+                                         total_seconds=60, category_counts={'movement': 1}, hour_counts=[0] * 24))
+        db.session.add(UserStreak(user_id=user.id, current_streak=1, longest_streak=1,
+                                  last_break_date=date(2024, 1, 1)))
+        db.session.commit()
+        user_id = user.id
+        db.session.expunge_all()
+
+        ProgressService().record_break(user_id, date(2024, 1, 1), 9, 'movement', 120)
+        StreakService().record_break(user_id, datetime(2024, 1, 2, 9))
+        db.session.commit()
+
+        activity = UserDailyActivity.query.filter_by(user_id=user_id).one()
+        assert (activity.break_count, activity.total_seconds) == (2, 180)
+        assert activity.category_counts == {'movement': 2}
+        assert UserStreak.query.filter_by(user_id=user_id).one().current_streak == 2
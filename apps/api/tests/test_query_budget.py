@@ -0,0 +1,97 @@
+"""
+Tests for query budgets and N+1 detection.
+"""
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine, text
+
+from app import db
+from app.models import User, BreakSession, BreakRecommendation
+from app.recommendations import recommendations_bp
+from app.utils.query_budget import query_budget, statement_shape, QueryBudgetExceeded
+
+
+@pytest.fixture
+def app(make_app):
+    """Minimal app with the recommendations blueprint"""
+    return make_app((recommendations_bp, '/api/v1/recommendations'))
+
+
+@pytest.fixture
+def user_with_history(app):
+    """User with ten past recommendations, each for a different session"""
+    user = User(id=uuid.uuid4(), email='budget@example.com', timezone='UTC')
+    db.session.add(user)
+    now = datetime.utcnow()
+    for i in range(10):
+        session = BreakSession(title=f'Session {i}', category='mindfulness',
+                               duration_minutes=10, content_url='https://example.com')
+        db.session.add(session)
+        db.session.flush()
+        db.session.add(BreakRecommendation(
+            user_id=user.id, session_id=session.id, score=0.5,
+            recommended_time=now - timedelta(hours=i), expires_at=now + timedelta(hours=1),
+        ))
+    db.session.commit()
+    return user
+
+
+class TestStatementShape:
+    """Test statement normalization"""
+
+    def test_parameters_and_literals_collapse(self):
+        """Statements differing only in values share a shape"""
+        first = statement_shape("SELECT * FROM users WHERE id = %(id_1)s AND name = 'a'")
+        second = statement_shape("SELECT  *  FROM users WHERE id = %(id_1)s AND name = 'bob'")
+        assert first == second
+
+    def test_in_lists_collapse(self):
+        """IN lists of different lengths share a shape"""
+        assert statement_shape('SELECT 1 WHERE id IN (?, ?)') == statement_shape('SELECT 1 WHERE id IN (?, ?, ?)')
+
+
+class TestQueryBudget:
+    """Test budget enforcement"""
+
+    def test_budget_exceeded_fails(self):
+        """Exceeding the declared budget raises"""
+        engine = create_engine('sqlite://')
+        with pytest.raises(QueryBudgetExceeded):
+            with query_budget(2):
+                with engine.connect() as conn:
+                    for _ in range(3):
+                        conn.execute(text('SELECT 1'))
+
+    def test_repeated_shapes_flagged(self):
+        """Loops issuing the same statement are reported as N+1"""
+        engine = create_engine('sqlite://')
+        with pytest.raises(QueryBudgetExceeded, match='repeated a statement'):
+            with query_budget(max_repeats=2):
+                with engine.connect() as conn:
+                    for i in range(5):
+                        conn.execute(text('SELECT :value'), {'value': i})
+
+    def test_within_budget_passes(self):
+        """Blocks within budget expose their statement log"""
+        engine = create_engine('sqlite://')
+        with query_budget(5) as log:
+            with engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+        assert log.count == 1
+
+    def test_history_endpoint_has_no_n_plus_one(self, app, user_with_history):
+        """History loads sessions with the recommendations, not per row"""
+        client = app.test_client()
+        token = create_access_token(identity=str(user_with_history.id))
+
+        with patch('app.recommendations.routes.get_jwt_identity', return_value=user_with_history.id):
+            with query_budget(2, max_repeats=1):
+                response = client.get('/api/v1/recommendations/history',
+                                      headers={'Authorization': f'Bearer {token}'})
+
+        assert response.status_code == 200
+        assert len(response.get_json()['recommendations']) == 10
@@ -0,0 +1,136 @@
+"""
+Tests for the pending recommendation expiry sweeper.
+"""
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models import User, BreakSession, BreakRecommendation, UserAcceptanceStats
+from app.recommendations import recommendations_bp
+from app.services.acceptance_service import AcceptanceService
+from app.services.break_service import BreakService
+from app.services.recommendation_expiry import RecommendationExpiryService
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app((recommendations_bp, '/api/v1/recommendations'))
+
+
+@pytest.fixture
+def session(app):
+    session = BreakSession(id=uuid.uuid4(), title='Breathe', category='mindfulness', duration_minutes=3,
+                           content_url='https://example.com/breathe', content_type='audio')
+    db.session.add(session)
+    db.session.commit()
+    return session
+
+
+def add_user(email):
+    user = User(id=uuid.uuid4(), email=email)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def add_recommendation(user, session, expires_in_minutes, status='pending'):
+    rec = BreakRecommendation(
+        user_id=user.id, session_id=session.id, score=0.7, status=status,
+        recommended_time=NOW + timedelta(minutes=expires_in_minutes - 30),
+        expires_at=NOW + timedelta(minutes=expires_in_minutes)
+    )
+    db.session.add(rec)
+    db.session.commit()
+    return rec
+
+
+class TestRecommendationExpiry:
+    """Test batched expiry and per-user counters"""
+
+    def test_only_stale_pending_rows_expire(self, session):
+        user = add_user('expiry@example.com')
+        stale = [add_recommendation(user, session, -60) for _ in range(3)]
+        live = add_recommendation(user, session, 60)
+        accepted = add_recommendation(user, session, -60, status='accepted')
+
+        service = RecommendationExpiryService()
+        with patch.object(service.config, 'EXPIRY_BATCH_SIZE', 2):
+            assert service.expire_pending(NOW) == 3
+
+        db.session.expire_all()
+        assert {db.session.get(BreakRecommendation, rec.id).status for rec in stale} == {'expired'}
+        assert db.session.get(BreakRecommendation, live.id).status == 'pending'
+        assert db.session.get(BreakRecommendation, accepted.id).status == 'accepted'
+        assert UserAcceptanceStats.query.filter_by(user_id=user.id).one().expired_count == 3
+
+    def test_counters_add_to_existing_stats(self, session):
+        """Expired counts accumulate next to acted counts from user outcomes"""
+        user = add_user('counted@example.com')
+        AcceptanceService().record_outcome(user.id, True, NOW, 'between_meetings', 'mindfulness')
+        db.session.commit()
+        other = add_user('other@example.com')
+        add_recommendation(user, session, -5)
+        add_recommendation(other, session, -5)
+
+        assert RecommendationExpiryService().expire_pending(NOW) == 2
+
+        db.session.expire_all()
+        stats = UserAcceptanceStats.query.filter_by(user_id=user.id).one()
+        assert (stats.acted_count, stats.expired_count) == (1, 1)
+        assert UserAcceptanceStats.query.filter_by(user_id=other.id).one().expired_count == 1
+
+    def test_rerun_is_a_no_op(self, session):
+        user = add_user('rerun@example.com')
+        add_recommendation(user, session, -5)
+        service = RecommendationExpiryService()
+
+        assert service.expire_pending(NOW) == 1
+        assert service.expire_pending(NOW) == 0
+
+    def test_completing_an_expired_recommendation_is_not_counted_again(self, session):
+        """A break finished after expiry doesn't add an accepted outcome on top of the expired one"""
+        user = add_user('late@example.com')
+        rec = add_recommendation(user, session, -5)
+        assert RecommendationExpiryService().expire_pending(NOW) == 1
+
+        service = BreakService()
+        started = service.start_break(user.id, session.id, recommendation_id=rec.id)
+        service.complete_break(user.id, started.id)
+
+        db.session.expire_all()
+        stats = UserAcceptanceStats.query.filter_by(user_id=user.id).one()
+        assert (stats.acted_count, stats.expired_count) == (0, 1)
+        assert db.session.get(BreakRecommendation, rec.id).status == 'completed'
+
+    def test_accepting_an_expired_recommendation_is_not_counted(self, app, session):
+        user = add_user('too-late@example.com')
+        rec = add_recommendation(user, session, -5)
+        assert RecommendationExpiryService().expire_pending(NOW) == 1
+
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        with patch('app.recommendations.routes.get_jwt_identity', return_value=user.id):
+            response = app.test_client().post(f'/api/v1/recommendations/{rec.id}/accept', headers=headers)
+
+        assert response.get_json()['status'] == 'expired'
+        stats = UserAcceptanceStats.query.filter_by(user_id=user.id).one()
+        assert (stats.acted_count, stats.expired_count) == (0, 1)
+
+    def test_expired_counts_upsert_new_and_existing_stats(self, session):
+        """One batch creates missing stats rows and increments existing ones"""
+        first, second = add_user('first@example.com'), add_user('second@example.com')
+        add_recommendation(first, session, -5)
+        add_recommendation(second, session, -5)
+        AcceptanceService().record_outcome(second.id, False, NOW, None, None)
+        db.session.commit()
+
+        assert RecommendationExpiryService().expire_pending(NOW) == 2
+
+        db.session.expire_all()
+        counts = {stats.user_id: (stats.acted_count, stats.expired_count) for stats in UserAcceptanceStats.query}
+        assert counts == {first.id: (0, 1), second.id: (1, 1)}
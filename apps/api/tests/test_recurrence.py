@@ -0,0 +1,114 @@
+"""
+Tests for recurring series storage and local expansion.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytz
+
+from app import db
+from app.models import CalendarEvent, RecurringSeries, User
+from app.services import recurrence
+from app.services.calendar_providers import EventPage, GoogleCalendarProvider, merge_series
+from app.services.recurrence import events_between, expand
+
+NEW_YORK = pytz.timezone('America/New_York')
+STANDUP_START = NEW_YORK.localize(datetime(2026, 10, 26, 9, 0))  # A Monday, a week before DST ends
+WEEKDAYS = 'RRULE:FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR'
+
+
+def _window(day, days=1):
+    start = NEW_YORK.localize(day)
+    return start, start + timedelta(days=days)
+
+
+class TestExpand:
+    """Test RRULE expansion"""
+
+    def test_keeps_wall_time_across_dst(self):
+        occurrences = expand(WEEKDAYS, STANDUP_START, 'America/New_York', 15, [], *_window(datetime(2026, 10, 26), 14))
+
+        assert len(occurrences) == 10
+        assert {start.astimezone(NEW_YORK).hour for start, _ in occurrences} == {9}
+        assert {start.utcoffset() for start, _ in occurrences} == {timedelta(hours=-4), timedelta(hours=-5)}
+        assert occurrences[0][1] - occurrences[0][0] == timedelta(minutes=15)
+
+    def test_skips_excluded_and_exdate_instances(self):
+        rules = WEEKDAYS + '\nEXDATE;TZID=America/New_York:20261028T090000'
+        moved = pytz.utc.localize(datetime(2026, 10, 27, 13, 0))
+
+        occurrences = expand(rules, STANDUP_START, 'America/New_York', 15, [moved], *_window(datetime(2026, 10, 26), 5))
+
+        assert [start.day for start, _ in occurrences] == [26, 29, 30]
+
+    def test_date_only_until(self):
+        occurrences = expand('RRULE:FREQ=DAILY;UNTIL=20261028', STANDUP_START, 'America/New_York', 15, [],
+                             *_window(datetime(2026, 10, 26), 7))
+
+        assert [start.day for start, _ in occurrences] == [26, 27, 28]
+
+    def test_window_expansion_is_cached(self):
+        recurrence._expand.cache_clear()
+        window = _window(datetime(2026, 11, 2))
+
+        for _ in range(3):
+            expand(WEEKDAYS, STANDUP_START, 'America/New_York', 15, [], *window)
+
+        info = recurrence._expand.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
+
+
+class TestGoogleSeries:
+    """Test parsing a singleEvents=false listing"""
+
+    def test_series_with_cancelled_and_moved_instances(self):
+        provider = GoogleCalendarProvider()
+        page = EventPage([])
+        items = [
+            {'id': 'standup', 'iCalUID': 'standup@x', 'summary': 'Standup', 'recurrence': [WEEKDAYS],
+             'start': {'dateTime': '2026-10-26T09:00:00-04:00', 'timeZone': 'America/New_York'},
+             'end': {'dateTime': '2026-10-26T09:15:00-04:00', 'timeZone': 'America/New_York'}},
+            {'id': 'standup_20261027T130000Z', 'status': 'cancelled', 'recurringEventId': 'standup',
+             'originalStartTime': {'dateTime': '2026-10-27T09:00:00-04:00'}},
+            {'id': 'standup_20261028T130000Z', 'iCalUID': 'standup@x', 'summary': 'Standup', 'recurringEventId': 'standup',
+             'originalStartTime': {'dateTime': '2026-10-28T09:00:00-04:00'},
+             'start': {'dateTime': '2026-10-28T11:00:00-04:00'}, 'end': {'dateTime': '2026-10-28T11:15:00-04:00'}},
+        ]
+        for item in items:
+            provider._add_item(page, item)
+
+        assert len(page.series) == 1
+        assert [event.external_id for event in page.events] == ['standup_20261028T130000Z']
+
+        page.series = merge_series([page])
+        events = page.expanded_events(*_window(datetime(2026, 10, 26), 3))
+        assert [event.start_time.astimezone(NEW_YORK).strftime('%d %H:%M') for event in events] == ['26 09:00', '28 11:00']
+
+
+class TestEventsBetween:
+    """Test reading stored events together with expanded series"""
+
+    def test_merges_one_off_events_and_series_instances(self, make_app):
+        make_app()
+        user = User(id=uuid.uuid4(), email='series@example.com', timezone='America/New_York')
+        db.session.add(user)
+        db.session.add(RecurringSeries(
+            user_id=user.id, external_id='standup', title='Standup', start_time=STANDUP_START.astimezone(pytz.utc),
+            duration_minutes=15, timezone='America/New_York', recurrence=WEEKDAYS,
+            excluded_starts=[NEW_YORK.localize(datetime(2026, 11, 3, 9, 0)).isoformat()]
+        ))
+        db.session.add(CalendarEvent(
+            user_id=user.id, external_id='review', title='Review',
+            start_time=pytz.utc.localize(datetime(2026, 11, 2, 19, 0)),
+            end_time=pytz.utc.localize(datetime(2026, 11, 2, 20, 0))
+        ))
+        db.session.commit()
+
+        monday = events_between(user.id, *_window(datetime(2026, 11, 2)))
+        assert [(event.title, event.is_recurring) for event in monday] == [('Standup', True), ('Review', False)]
+        assert monday[0].start_time.hour == 9
+        assert monday[0].duration_minutes == 15
+        assert monday[0] not in db.session
+
+        # The excluded Tuesday instance is gone
+        assert events_between(user.id, *_window(datetime(2026, 11, 3))) == []
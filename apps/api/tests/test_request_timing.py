@@ -0,0 +1,97 @@
+"""
+Tests for request stage timing and the metrics registry.
+"""
+import pytest
+
+from app import create_app
+from app.utils.metrics import MetricsRegistry
+from app.utils.timing import span, start_timer, stop_timer, current_timer
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = create_app()
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+class TestMetricsRegistry:
+    """Test Prometheus text rendering"""
+
+    def test_counter_and_histogram_rendering(self):
+        """Counters and histograms render with labels and cumulative buckets"""
+        registry = MetricsRegistry()
+        counter = registry.counter('jobs_total', 'Jobs run', ('queue',))
+        histogram = registry.histogram('job_seconds', 'Job runtime', ('queue',), buckets=(0.1, 1.0))
+
+        counter.inc(queue='default')
+        counter.inc(2, queue='default')
+        histogram.observe(0.05, queue='default')
+        histogram.observe(0.5, queue='default')
+        histogram.observe(5, queue='default')
+
+        output = registry.render()
+
+        assert '# TYPE jobs_total counter' in output
+        assert 'jobs_total{queue="default"} 3' in output
+        assert 'job_seconds_bucket{queue="default",le="0.1"} 1' in output
+        assert 'job_seconds_bucket{queue="default",le="1.0"} 2' in output
+        assert 'job_seconds_bucket{queue="default",le="+Inf"} 3' in output
+        assert 'job_seconds_count{queue="default"} 3' in output
+
+    def test_label_values_are_escaped(self):
+        """Quotes in label values must not break the exposition format"""
+        registry = MetricsRegistry()
+        registry.counter('odd_total', 'Odd labels', ('name',)).inc(name='say "hi"')
+
+        assert 'odd_total{name="say \\"hi\\""} 1' in registry.render()
+
+
+class TestStageTimer:
+    """Test span collection"""
+
+    def test_span_without_active_timer_is_noop(self):
+        """Spans outside a request or task must not fail"""
+        assert current_timer() is None
+        with span('anything'):
+            pass
+
+    def test_spans_accumulate_by_name(self):
+        """Repeated spans with the same name are summed"""
+        token = start_timer()
+        try:
+            with span('score'):
+                pass
+            with span('score'):
+                pass
+            timer = current_timer()
+            assert list(timer.stages) == ['score']
+            assert 'score;dur=' in timer.server_timing_header()
+            assert 'total;dur=' in timer.server_timing_header()
+        finally:
+            stop_timer(token)
+
+        assert current_timer() is None
+
+
+class TestTimingHooks:
+    """Test Flask integration"""
+
+    def test_server_timing_header_emitted(self, client):
+        """Every response carries a Server-Timing header"""
+        response = client.get('/health')
+
+        assert response.status_code == 200
+        assert 'total;dur=' in response.headers['Server-Timing']
+        assert 'db;dur=' in response.headers['Server-Timing']
+
+    def test_metrics_endpoint_exports_request_histograms(self, client):
+        """Request latencies are exported at /metrics"""
+        client.get('/health')
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        body = response.get_data(as_text=True)
+        assert 'http_request_duration_seconds_count{endpoint="health_check",method="GET",status="200"}' in body
@@ -0,0 +1,118 @@
+"""
+Tests for the batched retention sweeper.
+"""
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app import db
+from app.models import User, BreakSession, BreakRecommendation, CalendarEvent
+from app.services.retention_service import RETENTION_RULES, RetentionSweeper
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def user(app):
+    user = User(id=uuid.uuid4(), email='retention@example.com')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def add_events(user, days_ago):
+    for index, days in enumerate(days_ago):
+        start = NOW - timedelta(days=days)
+        db.session.add(CalendarEvent(
+            user_id=user.id, external_id=f'event-{index}', title='Meeting',
+            start_time=start, end_time=start + timedelta(hours=1)
+        ))
+    db.session.commit()
+
+
+def rule(name):
+    return next(r for r in RETENTION_RULES if r.name == name)
+
+
+@pytest.fixture
+def sweeper():
+    sleeps = []
+    sweeper = RetentionSweeper(sleep=sleeps.append)
+    sweeper.sleeps = sleeps
+    with patch.object(sweeper.config, 'RETENTION_BATCH_SIZE', 2), \
+            patch.object(sweeper.config, 'RETENTION_MAX_ROWS_PER_SECOND', 10), \
+            patch.object(sweeper.config, 'CALENDAR_EVENT_RETENTION_DAYS', 30):
+        yield sweeper
+
+
+class TestRetentionSweeper:
+    """Test batched deletion"""
+
+    def test_deletes_only_expired_rows_in_batches(self, sweeper, user):
+        add_events(user, [90, 80, 70, 60, 45, 31, 29, 1])
+
+        deleted = sweeper.sweep(rule('calendar_events'), NOW)
+
+        assert deleted == 6
+        remaining = sorted(e.external_id for e in CalendarEvent.query.all())
+        assert remaining == ['event-6', 'event-7']
+        # Three full batches of two, each followed by a throttle pause, then an empty batch
+        assert len(sweeper.sleeps) == 3
+        assert all(pause <= 0.2 for pause in sweeper.sleeps)
+
+    def test_deadline_stops_sweep(self, user):
+        add_events(user, [90, 80, 70, 60])
+        sweeper = RetentionSweeper(sleep=lambda seconds: None)
+        with patch.object(sweeper.config, 'RETENTION_BATCH_SIZE', 2):
+            deleted = sweeper.sweep(rule('calendar_events'), NOW, deadline=0)
+
+        assert deleted == 0
+        assert CalendarEvent.query.count() == 4
+
+    def test_expired_recommendations_removed(self, sweeper, user):
+        session = BreakSession(id=uuid.uuid4(), title='Stretch', category='movement', duration_minutes=5,
+                               content_url='https://example.com/stretch', content_type='video')
+        db.session.add(session)
+        for status, expired_days_ago in (('expired', 10), ('expired', 1), ('accepted', 10)):
+            db.session.add(BreakRecommendation(
+                user_id=user.id, session_id=session.id, score=0.5, status=status,
+                recommended_time=NOW - timedelta(days=expired_days_ago, hours=1),
+                expires_at=NOW - timedelta(days=expired_days_ago)
+            ))
+        db.session.commit()
+
+        with patch.object(sweeper.config, 'EXPIRED_RECOMMENDATION_RETENTION_DAYS', 7):
+            assert sweeper.sweep(rule('expired_recommendations'), NOW) == 1
+
+        assert sorted(r.status for r in BreakRecommendation.query.all()) == ['accepted', 'expired']
+
+    def test_zero_retention_keeps_everything(self, sweeper, user):
+        add_events(user, [400])
+        with patch.object(sweeper.config, 'CALENDAR_EVENT_RETENTION_DAYS', 0):
+            assert sweeper.sweep(rule('calendar_events'), NOW) == 0
+
+    def test_rules_share_the_time_budget(self, user):
+        """A rule that uses its whole share leaves the rest for the rules after it"""
+        clock = [0.0]
+        deadlines = []
+
+        def sweep(rule, now, deadline):
+            deadlines.append(deadline)
+            # The first rule has a backlog and runs until its deadline; the others finish at once
+            if rule is RETENTION_RULES[0]:
+                clock[0] = deadline
+            return 0
+
+        sweeper = RetentionSweeper(sleep=lambda seconds: None, clock=lambda: clock[0])
+        with patch.object(sweeper.config, 'RETENTION_MAX_SECONDS', 100), \
+                patch.object(sweeper, 'sweep', side_effect=sweep):
+            sweeper.sweep_all(RETENTION_RULES, NOW)
+
+        assert deadlines == [25, 50, 62.5, 100]
@@ -0,0 +1,129 @@
+"""
+Tests for incremental streak maintenance.
+"""
+import uuid
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models import User, UserStreak, BreakSession, BreakRecommendation
+from app.breaks import breaks_bp
+from app.progress import progress_bp
+from app.services.streak_service import advance_streak, effective_current_streak
+
+
+@pytest.fixture
+def app(make_app):
+    """Minimal app with the breaks and progress blueprints"""
+    return make_app((breaks_bp, '/api/v1/breaks'), (progress_bp, '/api/v1/progress'))
+
+
+class TestAdvanceStreak:
+    """Test the O(1) streak transition"""
+
+    def test_first_break_starts_streak(self):
+        """A first break starts a one-day streak"""
+        streak = advance_streak(UserStreak(current_streak=0, longest_streak=0), date(2024, 1, 1))
+        assert (streak.current_streak, streak.longest_streak) == (1, 1)
+        assert streak.streak_started_at == date(2024, 1, 1)
+
+    def test_consecutive_days_extend(self):
+        """Consecutive days extend the streak; same-day breaks don't"""
+        streak = UserStreak(current_streak=0, longest_streak=0)
+        for day in (1, 2, 2, 3):
+            advance_streak(streak, date(2024, 1, day))
+        assert (streak.current_streak, streak.longest_streak) == (3, 3)
+
+    def test_gap_restarts_and_keeps_longest(self):
+        """A missed day restarts the streak without losing the record"""
+        streak = UserStreak(current_streak=4, longest_streak=4, last_break_date=date(2024, 1, 4))
+        advance_streak(streak, date(2024, 1, 7))
+        assert (streak.current_streak, streak.longest_streak) == (1, 4)
+        assert streak.streak_started_at == date(2024, 1, 7)
+
+    def test_out_of_order_day_ignored(self):
+        """Late days are left to the reconciler"""
+        streak = UserStreak(current_streak=2, longest_streak=2, last_break_date=date(2024, 1, 5))
+        advance_streak(streak, date(2024, 1, 1))
+        assert (streak.current_streak, streak.last_break_date) == (2, date(2024, 1, 5))
+
+    def test_effective_streak_breaks_after_missed_day(self):
+        """A streak is only current through the day after its last break"""
+        streak = UserStreak(current_streak=3, last_break_date=date(2024, 1, 5))
+        assert effective_current_streak(streak, date(2024, 1, 6)) == 3
+        assert effective_current_streak(streak, date(2024, 1, 7)) == 0
+
+
+class TestStreakEndpoints:
+    """Test completion updates and streak reads"""
+
+    def test_completion_updates_streak(self, app):
+        """Completing a break is reflected by /progress/streak"""
+        user = User(id=uuid.uuid4(), email='streak@example.com', timezone='UTC')
+        session = BreakSession(title='Breathe', category='mindfulness',
+                               duration_minutes=5, content_url='https://example.com')
+        db.session.add_all([user, session])
+        db.session.commit()
+
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+        with patch('app.breaks.routes.get_jwt_identity', return_value=user.id), \
+                patch('app.progress.routes.get_jwt_identity', return_value=user.id):
+            started = client.post('/api/v1/breaks/start', json={'session_id': str(session.id)}, headers=headers)
+            assert started.status_code == 201
+
+            completed = client.post(f"/api/v1/breaks/{started.get_json()['id']}/complete",
+                                    json={'felt_better': True}, headers=headers)
+            assert completed.status_code == 200
+
+            response = client.get('/api/v1/progress/streak', headers=headers)
+
+        body = response.get_json()
+        assert body['current_streak'] == 1
+        assert body['longest_streak'] == 1
+
+    def test_rejects_foreign_recommendation_and_bad_percentage(self, app):
+        """Breaks can't claim another user's recommendation or send a non-numeric percentage"""
+        user = User(id=uuid.uuid4(), email='mine@example.com', timezone='UTC')
+        other = User(id=uuid.uuid4(), email='theirs@example.com', timezone='UTC')
+        session = BreakSession(id=uuid.uuid4(), title='Breathe', category='mindfulness',
+                               duration_minutes=5, content_url='https://example.com')
+        foreign = BreakRecommendation(id=uuid.uuid4(), user_id=other.id, session_id=session.id,
+                                      recommended_time=datetime(2024, 1, 1, 10), score=0.5,
+                                      expires_at=datetime(2024, 1, 1, 11))
+        db.session.add_all([user, other, session, foreign])
+        db.session.commit()
+
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+        with patch('app.breaks.routes.get_jwt_identity', return_value=user.id):
+            rejected = client.post('/api/v1/breaks/start', headers=headers, json={
+                'session_id': str(session.id), 'recommendation_id': str(foreign.id)
+            })
+            assert rejected.status_code == 404
+
+            started = client.post('/api/v1/breaks/start', json={'session_id': str(session.id)}, headers=headers)
+            completed = client.post(f"/api/v1/breaks/{started.get_json()['id']}/complete",
+                                    json={'completion_percentage': 'most'}, headers=headers)
+            assert completed.status_code == 400
+
+        assert db.session.get(BreakRecommendation, foreign.id).status == 'pending'
+
+    def test_missing_streak_reads_zero(self, app):
+        """Users without breaks get an empty streak"""
+        user = User(id=uuid.uuid4(), email='nostreak@example.com', timezone='UTC')
+        db.session.add(user)
+        db.session.commit()
+
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+        with patch('app.progress.routes.get_jwt_identity', return_value=user.id):
+            response = client.get('/api/v1/progress/streak', headers=headers)
+
+        assert response.get_json()['current_streak'] == 0
@@ -0,0 +1,134 @@
+"""
+Tests for per-user calendar sync deduplication.
+"""
+import uuid
+from unittest.mock import patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services import sync_coordinator as coordinator_module
+from app.services.sync_coordinator import SyncCoordinator
+
+
+class FakeRedis:
+    """Runs the coordinator's Lua scripts as their Python equivalents"""
+
+    def __init__(self):
+        self.values = {}
+
+    def register_script(self, script):
+        handlers = {
+            coordinator_module._REQUEST_SCRIPT: self._request,
+            coordinator_module._ACQUIRE_SCRIPT: self._acquire,
+            coordinator_module._RELEASE_SCRIPT: self._release,
+        }
+        handler = handlers[script]
+        return lambda keys, args, client: handler(keys, args)
+
+    def delete(self, key):
+        return int(self.values.pop(key, None) is not None)
+
+    def _request(self, keys, args):
+        queued, lease, followup = keys
+        if lease in self.values:
+            self.values[followup] = '1'
+            return ['coalesced', self.values[lease]]
+        if queued not in self.values:
+            self.values[queued] = args[0]
+            return ['enqueued', args[0]]
+        return ['queued', self.values[queued]]
+
+    def _acquire(self, keys, args):
+        lease, queued, followup = keys
+        if self.values.get(queued) == args[0]:
+            del self.values[queued]
+        if self.values.get(lease, args[0]) != args[0]:
+            self.values[followup] = '1'
+            return 0
+        self.values[lease] = args[0]
+        self.values.pop(followup, None)
+        return 1
+
+    def _release(self, keys, args):
+        lease, followup = keys
+        if self.values.get(lease) != args[0]:
+            return 0
+        del self.values[lease]
+        return self.delete(followup)
+
+
+class DownRedis:
+    def register_script(self, script):
+        def run(keys, args, client):
+            raise RedisConnectionError('down')
+        return run
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def coordinator(redis):
+    return SyncCoordinator(client_factory=lambda: redis)
+
+
+@pytest.fixture
+def apply_async():
+    with patch('app.tasks.calendar_tasks.sync_user_calendar.apply_async') as apply_async:
+        yield apply_async
+
+
+class TestSyncCoordinator:
+    """Test enqueue dedupe, the lease and follow-up coalescing"""
+
+    def test_requests_share_the_queued_sync(self, coordinator, apply_async):
+        user_id = str(uuid.uuid4())
+
+        task_ids = {coordinator.request_sync(user_id) for _ in range(5)}
+
+        assert len(task_ids) == 1
+        apply_async.assert_called_once_with(args=[user_id], task_id=task_ids.pop())
+
+    def test_requests_during_a_run_coalesce_into_one_follow_up(self, coordinator, apply_async):
+        user_id = str(uuid.uuid4())
+        first = coordinator.request_sync(user_id)
+        assert coordinator.acquire(user_id, first)
+
+        # Connect, manual sync and the hourly fan-out while the first sync runs
+        assert {coordinator.request_sync(user_id) for _ in range(3)} == {first}
+        assert apply_async.call_count == 1
+
+        assert coordinator.release(user_id, first) is True
+        follow_up = coordinator.request_sync(user_id)
+        assert follow_up != first
+        assert apply_async.call_count == 2
+
+        assert coordinator.acquire(user_id, follow_up)
+        assert coordinator.release(user_id, follow_up) is False
+
+    def test_duplicate_task_does_not_run_alongside_the_holder(self, coordinator, redis, apply_async):
+        user_id = str(uuid.uuid4())
+        assert coordinator.acquire(user_id, 'task-a')
+
+        assert coordinator.acquire(user_id, 'task-b') is False
+        # Only the holder can release, and the loser's visit asks for a follow-up
+        assert coordinator.release(user_id, 'task-b') is False
+        assert f'{coordinator_module.LEASE_PREFIX}{user_id}' in redis.values
+        assert coordinator.release(user_id, 'task-a') is True
+
+    def test_retry_keeps_its_lease(self, coordinator):
+        user_id = str(uuid.uuid4())
+        assert coordinator.acquire(user_id, 'task-a')
+        assert coordinator.acquire(user_id, 'task-a')
+
+    def test_enqueues_directly_when_redis_is_down(self, apply_async):
+        coordinator = SyncCoordinator(client_factory=DownRedis)
+        user_id = str(uuid.uuid4())
+
+        assert coordinator.request_sync(user_id) == apply_async.return_value.id
+        apply_async.assert_called_once_with(args=[user_id])
+        assert coordinator.acquire(user_id, 'task-a') is True
+        assert coordinator.release(user_id, 'task-a') is False
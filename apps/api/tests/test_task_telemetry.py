@@ -0,0 +1,99 @@
+"""
+Tests for Celery task telemetry.
+"""
+from collections import defaultdict
+from unittest.mock import MagicMock, patch
+
+import pytest
+from celery import Celery
+
+from app.tasks.telemetry import TelemetryTask, SharedHistogram, SharedCounter, _stamp_sent_at, annotate
+from app.utils.timing import span
+
+
+class FakePipeline:
+    """Minimal in-memory stand-in for a Redis pipeline's hash commands"""
+
+    def __init__(self):
+        self.hashes = defaultdict(dict)
+
+    def hincrby(self, key, field, amount):
+        self.hashes[key][field] = int(self.hashes[key].get(field, 0)) + amount
+
+    def hincrbyfloat(self, key, field, amount):
+        self.hashes[key][field] = float(self.hashes[key].get(field, 0)) + amount
+
+
+@pytest.fixture
+def celery_app():
+    """Eager Celery app using the telemetry task base"""
+    app = Celery('test', task_cls=TelemetryTask)
+    app.conf.task_always_eager = True
+    return app
+
+
+class TestTelemetryTask:
+    """Test telemetry attached to task results"""
+
+    def test_republished_retry_is_stamped_again(self):
+        """A retry carries its first attempt's headers but queues from its own publish"""
+        headers = {'sent_at': 1.0}
+        _stamp_sent_at(headers=headers)
+        assert headers['sent_at'] > 1.0
+
+    def test_result_includes_stage_breakdown(self, celery_app):
+        """Dict results carry runtime, stages and annotations"""
+        @celery_app.task
+        def sample_task():
+            with span('google_fetch'):
+                pass
+            annotate(events_processed=42)
+            return {'status': 'success'}
+
+        with patch('app.tasks.telemetry.get_redis', return_value=MagicMock()):
+            result = sample_task.apply().get()
+
+        telemetry = result['telemetry']
+        assert 'google_fetch' in telemetry['stages']
+        assert telemetry['events_processed'] == 42
+        assert telemetry['retries'] == 0
+        assert telemetry['total_ms'] >= 0
+
+    def test_redis_failure_does_not_fail_task(self, celery_app):
+        """Telemetry is best-effort"""
+        @celery_app.task
+        def sample_task():
+            return {'status': 'success'}
+
+        with patch('app.tasks.telemetry.get_redis', side_effect=ConnectionError('down')):
+            result = sample_task.apply().get()
+
+        assert result['status'] == 'success'
+
+
+class TestSharedMetrics:
+    """Test Redis-backed metric rendering"""
+
+    def test_histogram_merges_observations(self):
+        """Observations from several processes render as one cumulative histogram"""
+        histogram = SharedHistogram('task_seconds', 'Task runtime', ('task',), buckets=(1.0, 10.0))
+        pipe = FakePipeline()
+        histogram.observe(pipe, 0.5, task='sync')
+        histogram.observe(pipe, 5.0, task='sync')
+        histogram.observe(pipe, 50.0, task='sync')
+
+        lines = histogram.render(pipe.hashes[histogram.key])
+
+        assert 'task_seconds_bucket{task="sync",le="1.0"} 1' in lines
+        assert 'task_seconds_bucket{task="sync",le="10.0"} 2' in lines
+        assert 'task_seconds_bucket{task="sync",le="+Inf"} 3' in lines
+        assert 'task_seconds_count{task="sync"} 3' in lines
+
+    def test_counter_render(self):
+        """Shared counters render per label set"""
+        counter = SharedCounter('task_retries_total', 'Retries', ('task',))
+        pipe = FakePipeline()
+        counter.inc(pipe, task='sync')
+        counter.inc(pipe, task='sync')
+
+        assert 'task_retries_total{task="sync"} 2.0' in counter.render(pipe.hashes[counter.key])
@@ -0,0 +1,86 @@
+"""
+Tests for the request-scoped user context.
+"""
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+import pytz
+from flask import g
+
+from app import db
+from app.models import User, CalendarConnection
+from app.services.user_context import get_user_context, invalidate_user_context
+from app.utils.query_budget import query_budget
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def user(app):
+    user = User(id=uuid.uuid4(), email='context@example.com', timezone='Europe/London')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+class TestUserContext:
+    """Test loading and memoization"""
+
+    def test_loaded_once_per_scope(self, user):
+        """Repeated lookups, by UUID or string id, share one query"""
+        user_id = user.id
+        with query_budget(1):
+            first = get_user_context(user_id)
+            second = get_user_context(str(user_id))
+
+        assert first is second
+        assert first.tz == pytz.timezone('Europe/London')
+        assert first.connection is None
+
+    def test_invalidate_reloads_connection(self, user):
+        """A new connection is visible after invalidation"""
+        assert get_user_context(user.id).connection is None
+
+        db.session.add(CalendarConnection(
+            user_id=user.id, provider='google', access_token='token', refresh_token='refresh',
+            token_expires_at=datetime.utcnow() + timedelta(hours=1)
+        ))
+        db.session.commit()
+        invalidate_user_context(user.id)
+
+        assert get_user_context(user.id).connection is not None
+
+    def test_missing_user_raises(self, app):
+        """Unknown users raise ValueError like the services did"""
+        with pytest.raises(ValueError):
+            get_user_context(uuid.uuid4())
+
+    def test_fan_out_task_keeps_one_user_at_a_time(self, app):
+        """Daily generation doesn't accumulate every user's context in its app context"""
+        from app.tasks.calendar_tasks import generate_daily_recommendations
+
+        for index in range(3):
+            user = User(id=uuid.uuid4(), email=f'fan-out-{index}@example.com')
+            db.session.add_all([user, CalendarConnection(
+                user_id=user.id, provider='google', access_token='token', refresh_token='refresh',
+                token_expires_at=datetime.utcnow() + timedelta(hours=1)
+            )])
+        db.session.commit()
+
+        memo_sizes = []
+
+        def generate(user_id):
+            get_user_context(user_id)
+            memo_sizes.append(len(g.user_contexts))
+
+        with patch('app.tasks.calendar_tasks.create_app', return_value=app), \
+                patch('app.tasks.calendar_tasks.RecommendationService') as service:
+            service.return_value.generate_and_store_recommendations.side_effect = generate
+            assert generate_daily_recommendations.run()['recommendations_generated'] == 3
+
+        assert memo_sizes == [1, 1, 1]